@@ -0,0 +1,41 @@
+"""Admin endpoints for diagnosing live workers"""
+import os
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from starlette.concurrency import run_in_threadpool
+
+from app.sampling import collapsed, profiler
+
+# Bearer token for the admin endpoints; empty disables them
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+router = APIRouter()
+
+
+def require_admin(authorization: Optional[str] = Header(None)) -> None:
+    """Admin endpoints answer 404 unless ADMIN_TOKEN is set, and 401 without it"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token",
+                            headers={"WWW-Authenticate": "Bearer"})
+
+
+@router.post("/profile", dependencies=[Depends(require_admin)], include_in_schema=False)
+async def capture_profile(
+    seconds: float = Query(10.0, gt=0, le=60),
+    interval_ms: float = Query(10.0, ge=1, le=1000),
+):
+    """
+    Sample this worker's CPU stacks for `seconds` and return them collapsed,
+    one line per stack prefixed with the route. Feed the output to
+    flamegraph.pl, inferno or speedscope. Only one capture runs at a time.
+    """
+    try:
+        stacks = await run_in_threadpool(profiler.capture, seconds, interval_ms / 1000)
+    except RuntimeError as error:
+        raise HTTPException(status_code=409, detail=str(error))
+    return Response(collapsed(stacks), media_type="text/plain")
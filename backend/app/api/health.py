@@ -1,13 +1,16 @@
 """Health check endpoints"""
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+from app.cache import ResponseCache, get_cache
+from app.readiness import ReadinessProbe, get_readiness_probe, startup_state
 
 router = APIRouter()
 
 @router.get("/health", status_code=status.HTTP_200_OK)
 def health_check():
     """
-    Health check endpoint
-    Returns the status of the API
+    Health check endpoint (liveness)
+    Returns the status of the API process without touching dependencies
     """
     return {
         "status": "healthy",
@@ -15,13 +18,41 @@ def health_check():
         "version": "1.0.0"
     }
 
+@router.get("/startup", status_code=status.HTTP_200_OK)
+def startup_check():
+    """
+    Startup check endpoint
+    Returns 503 until application startup has completed
+    """
+    if not startup_state.started:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"started": False, "message": "API is starting"},
+        )
+    return {"started": True, "message": "API has started"}
+
 @router.get("/readiness", status_code=status.HTTP_200_OK)
-def readiness_check():
+async def readiness_check(probe: ReadinessProbe = Depends(get_readiness_probe)):
     """
     Readiness check endpoint
-    Returns the readiness status of the API
+    Returns the readiness status of the API, 503 when the database is unreachable.
+    The database result is cached for READINESS_CACHE_SECONDS.
     """
+    ready, message = await probe.check()
+    if not ready:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"ready": False, "message": message},
+        )
     return {
         "ready": True,
-        "message": "API is ready to receive requests"
+        "message": message
     }
+
+@router.get("/cache/stats", status_code=status.HTTP_200_OK)
+def cache_stats(cache: ResponseCache = Depends(get_cache)):
+    """
+    Response cache counters
+    Returns hits, misses and evictions for sizing the cache
+    """
+    return cache.stats()
@@ -0,0 +1,14 @@
+"""Metrics endpoint"""
+from fastapi import APIRouter, Response
+from app.metrics import CONTENT_TYPE, REGISTRY
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Prometheus scrape endpoint
+    Returns request, SQL, pool and cache metrics in text exposition format
+    """
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -1,39 +1,65 @@
 """Product endpoints with database integration"""
-from fastapi import APIRouter, status, Depends, HTTPException
-from sqlmodel import Session, select
-from app.models.models import Product, ProductCreate, ProductRead
-from app.database import get_session
-from typing import List
+from fastapi import APIRouter, status, Depends, Header, HTTPException, Query, Request
+from sqlmodel import Session
+from app.models.models import (
+    BatchGet, ChangeFeed, Product, ProductBatch, ProductCreate, ProductRead, ProductSearchHit,
+    BulkResult
+)
+from app.batch import dump_batch, fetch_many, missing_headers, parse_ids
+from app.changes import (
+    CHANGES_MAX_PAGE_SIZE, CHANGES_PAGE_SIZE, fetch_changes, stream_changes
+)
+from app.bulk import (
+    BULK_BATCH_SIZE, BULK_MAX_BATCH_SIZE, bulk_import, iter_bulk_items
+)
+from app.cache import ResponseCache, get_cache, pack_entry, unpack_entry, product_key
+from app.database import AnySession, get_session, run_db
+from app.etag import etag_matches, if_match_versions, not_modified, row_etag
+from app.export import EXPORT_FORMAT_PATTERN, stream_export
+from app.search import SearchIndex, get_search_index
+from app.writes import delete_row, update_row
+from app.serialization import dump_model, dump_rows, dumps, json_response, row_dict
+from app.replicas import get_read_session, reads_replica
+from app.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, ListQuery, fetch_page, list_query, page_headers
+)
+from typing import List, Optional
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[ProductRead])
-def list_products(session: Session = Depends(get_session)):
-    """
-    Get all products from database
-    """
-    statement = select(Product)
-    products = session.exec(statement).all()
-    return products
+PRODUCT_SORT_KEYS = ("id", "name", "price", "created_at", "updated_at")
+product_list_query = list_query(PRODUCT_SORT_KEYS, list(ProductRead.model_fields))
 
 
-@router.get("/{product_id}", response_model=ProductRead)
-def get_product(product_id: int, session: Session = Depends(get_session)):
-    """
-    Get a specific product by ID from database
-    """
+def product_filters(
+    in_stock: Optional[bool] = None,
+    price_min: Optional[float] = Query(None, ge=0),
+    price_max: Optional[float] = Query(None, ge=0),
+    name: Optional[str] = Query(None, min_length=1, description="Name prefix"),
+):
+    """Collect product filters into a function that applies them to a select"""
+    def apply(statement):
+        if in_stock is not None:
+            statement = statement.where(Product.in_stock == in_stock)
+        if price_min is not None:
+            statement = statement.where(Product.price >= price_min)
+        if price_max is not None:
+            statement = statement.where(Product.price <= price_max)
+        if name:
+            statement = statement.where(Product.name.startswith(name, autoescape=True))
+        return statement
+    return apply
+
+
+def _get_product(session: Session, product_id: int) -> Product:
     product = session.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
 
 
-@router.post("/", response_model=ProductRead, status_code=status.HTTP_201_CREATED)
-def create_product(product: ProductCreate, session: Session = Depends(get_session)):
-    """
-    Create a new product in database
-    """
+def _create_product(session: Session, product: ProductCreate) -> Product:
     db_product = Product(
         name=product.name,
         description=product.description,
@@ -45,33 +71,197 @@ def create_product(product: ProductCreate, session: Session = Depends(get_sessio
     return db_product
 
 
+def _update_product(session: Session, product_id: int, product: ProductCreate,
+                    if_match: Optional[str] = None):
+    values = {"name": product.name, "description": product.description, "price": product.price}
+    return update_row(session, Product, product_id, values,
+                      if_match_versions(if_match, product_id), "Product not found")
+
+
+def _delete_product(session: Session, product_id: int, if_match: Optional[str] = None) -> None:
+    delete_row(session, Product, product_id, if_match_versions(if_match, product_id), "Product not found")
+
+
+@router.get("/", response_model=List[ProductRead])
+async def list_products(
+    ids: Optional[str] = Query(
+        None, description="Comma-separated ids to fetch in request order instead of a page"
+    ),
+    query: ListQuery = Depends(product_list_query),
+    apply_filters=Depends(product_filters),
+    if_none_match: Optional[str] = Header(None),
+    session: AnySession = Depends(get_read_session),
+):
+    """
+    Get one page of products from database, filtered and sorted server-side.
+    The token for the next page is returned in the X-Next-Cursor header;
+    `fields` limits both the selected columns and the returned keys.
+    With `ids`, returns exactly those products instead, and lists unknown ids in X-Missing-Ids.
+    """
+    if ids is not None:
+        rows, missing = await run_db(session, fetch_many, Product, parse_ids(ids))
+        return json_response(dump_rows(ProductRead, rows), headers=missing_headers(missing))
+    products, next_cursor, etag = await run_db(
+        session, fetch_page, Product, query, apply_filters, if_none_match
+    )
+    if products is None:
+        return not_modified(etag)
+    # Rows already match ProductRead, so they are rendered without re-validation
+    body = dumps(products) if query.fields else dump_rows(ProductRead, products)
+    return json_response(body, headers=page_headers(next_cursor, ETag=etag))
+
+
+@router.get("/export")
+async def export_products(
+    format: str = Query("ndjson", pattern=EXPORT_FORMAT_PATTERN),
+    session: AnySession = Depends(get_read_session),
+):
+    """
+    Stream every product as NDJSON or CSV.
+    Rows are read in batches through a server-side cursor, so memory stays flat.
+    """
+    return stream_export(session, Product, ProductRead, format)
+
+
+@router.get("/search", response_model=List[ProductSearchHit])
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session: AnySession = Depends(get_read_session),
+    index: SearchIndex = Depends(get_search_index),
+):
+    """
+    Full-text search over product names and descriptions, most relevant first.
+    Name matches outrank description matches; page with X-Next-Cursor.
+    """
+    hits, next_cursor = await run_db(session, index.search, q, limit, cursor)
+    body = dumps([{**row_dict(ProductRead, product), "rank": rank} for product, rank in hits])
+    return json_response(body, headers=page_headers(next_cursor))
+
+
+@router.get("/changes", response_model=ChangeFeed)
+async def product_changes(
+    since: Optional[str] = Query(None, description="Cursor from the previous page; omit to start"),
+    limit: int = Query(CHANGES_PAGE_SIZE, ge=1, le=CHANGES_MAX_PAGE_SIZE),
+    session: AnySession = Depends(get_session),
+):
+    """
+    Products created, updated or deleted after `since`, oldest first.
+    Keep the returned cursor and poll again with it; has_more means call again now.
+    Reads the primary, since a lagging replica could skip past unreplicated rows.
+    """
+    changes, cursor, has_more = await run_db(
+        session, fetch_changes, Product, ProductRead, since, limit
+    )
+    return json_response(dumps({"changes": changes, "cursor": cursor, "has_more": has_more}))
+
+
+@router.get("/changes/stream")
+async def stream_product_changes(
+    since: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None),
+    session: AnySession = Depends(get_session),
+):
+    """
+    The product change feed as Server-Sent Events, one event per batch of changes.
+    Reconnecting clients resume from Last-Event-ID.
+    """
+    return stream_changes(session, Product, ProductRead, last_event_id or since)
+
+
+@router.post("/batch-get", response_model=ProductBatch)
+async def batch_get_products(
+    request: BatchGet,
+    session: AnySession = Depends(get_read_session),
+):
+    """
+    Fetch many products by id with one query, in request order.
+    Ids that do not exist are listed in `missing`; at most BATCH_MAX_IDS per call.
+    """
+    rows, missing = await run_db(session, fetch_many, Product, request.ids)
+    return json_response(dump_batch(ProductRead, rows, missing))
+
+
+@router.get("/{product_id}", response_model=ProductRead)
+async def get_product(
+    product_id: int,
+    if_none_match: Optional[str] = Header(None),
+    session: AnySession = Depends(get_read_session),
+    cache: ResponseCache = Depends(get_cache),
+):
+    """
+    Get a specific product by ID, served from the response cache when possible.
+    Answers 304 Not Modified when If-None-Match carries the current ETag.
+    """
+    key = product_key(product_id)
+    entry = await cache.get(key)
+    if entry is None:
+        db_product = await run_db(session, _get_product, product_id)
+        etag = row_etag(db_product.id, db_product.updated_at)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        body = dump_model(ProductRead, db_product)
+        if not reads_replica(session):
+            await cache.set(key, pack_entry(etag, body))
+    else:
+        etag, body = unpack_entry(entry)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    return json_response(body, headers={"ETag": etag})
+
+
+@router.post("/", response_model=ProductRead, status_code=status.HTTP_201_CREATED)
+async def create_product(product: ProductCreate, session: AnySession = Depends(get_session)):
+    """
+    Create a new product in database
+    """
+    db_product = await run_db(session, _create_product, product)
+    return json_response(dump_model(ProductRead, db_product), status_code=status.HTTP_201_CREATED)
+
+
+@router.post("/bulk", response_model=BulkResult)
+async def bulk_create_products(
+    request: Request,
+    batch_size: int = Query(BULK_BATCH_SIZE, ge=1, le=BULK_MAX_BATCH_SIZE),
+    session: AnySession = Depends(get_session),
+):
+    """
+    Create many products from a JSON array or an NDJSON stream.
+    Invalid rows are reported by index and do not abort the rest of the import.
+    """
+    return await bulk_import(session, iter_bulk_items(request), ProductCreate, Product, batch_size)
+
+
 @router.put("/{product_id}", response_model=ProductRead)
-def update_product(product_id: int, product: ProductCreate, session: Session = Depends(get_session)):
+async def update_product(
+    product_id: int,
+    product: ProductCreate,
+    if_match: Optional[str] = Header(None),
+    session: AnySession = Depends(get_session),
+    cache: ResponseCache = Depends(get_cache),
+):
     """
-    Update a product in database
+    Update a product in database with a single UPDATE ... RETURNING.
+    With If-Match, the update only applies while the product still has that ETag (412 otherwise).
     """
-    db_product = session.get(Product, product_id)
-    if not db_product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    
-    db_product.name = product.name
-    db_product.description = product.description
-    db_product.price = product.price
-    session.add(db_product)
-    session.commit()
-    session.refresh(db_product)
-    return db_product
+    row = await run_db(session, _update_product, product_id, product, if_match)
+    await cache.delete(product_key(product_id))
+    return json_response(dump_model(ProductRead, row),
+                         headers={"ETag": row_etag(row.id, row.updated_at)})
 
 
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_product(product_id: int, session: Session = Depends(get_session)):
+async def delete_product(
+    product_id: int,
+    if_match: Optional[str] = Header(None),
+    session: AnySession = Depends(get_session),
+    cache: ResponseCache = Depends(get_cache),
+):
     """
-    Delete a product from database
+    Delete a product from database with a single DELETE ... RETURNING id.
+    If-Match makes the delete conditional on the current ETag.
     """
-    db_product = session.get(Product, product_id)
-    if not db_product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    
-    session.delete(db_product)
-    session.commit()
+    await run_db(session, _delete_product, product_id, if_match)
+    await cache.delete(product_key(product_id))
     return None
@@ -1,78 +1,259 @@
 """User endpoints with database integration"""
-from fastapi import APIRouter, status, Depends, HTTPException
-from sqlmodel import Session, select
-from app.models.models import User, UserCreate, UserRead
-from app.database import get_session
-from typing import List
+from fastapi import APIRouter, status, Depends, Header, HTTPException, Query, Request
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+from app.models.models import (
+    BatchGet, ChangeFeed, User, UserBatch, UserCreate, UserRead, BulkResult
+)
+from app.batch import dump_batch, fetch_many, missing_headers, parse_ids
+from app.changes import (
+    CHANGES_MAX_PAGE_SIZE, CHANGES_PAGE_SIZE, fetch_changes, stream_changes
+)
+from app.bulk import (
+    BULK_BATCH_SIZE, BULK_MAX_BATCH_SIZE, bulk_import, iter_bulk_items
+)
+from app.cache import ResponseCache, get_cache, pack_entry, unpack_entry, user_key
+from app.database import AnySession, get_session, run_db
+from app.etag import etag_matches, if_match_versions, not_modified, row_etag
+from app.export import EXPORT_FORMAT_PATTERN, stream_export
+from app.writes import delete_row, update_row
+from app.serialization import dump_model, dump_rows, dumps, json_response
+from app.replicas import get_read_session, reads_replica
+from app.pagination import (
+    ListQuery, fetch_page, list_query, page_headers
+)
+from typing import List, Optional
 
 router = APIRouter()
 
 
+USER_SORT_KEYS = ("id", "name", "email", "created_at", "updated_at")
+user_list_query = list_query(USER_SORT_KEYS, list(UserRead.model_fields))
+
+
+def user_filters(
+    active: Optional[bool] = None,
+    name: Optional[str] = Query(None, min_length=1, description="Name prefix"),
+):
+    """Collect user filters into a function that applies them to a select"""
+    def apply(statement):
+        if active is not None:
+            statement = statement.where(User.active == active)
+        if name:
+            statement = statement.where(User.name.startswith(name, autoescape=True))
+        return statement
+    return apply
+
+
+def _get_user(session: Session, user_id: int) -> User:
+    user = session.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+
+def _email_taken(session: Session) -> HTTPException:
+    # The unique index on users.email settles concurrent signups; the loser lands here
+    session.rollback()
+    return HTTPException(status_code=400, detail="Email already registered")
+
+
+def _create_user(session: Session, user: UserCreate) -> User:
+    db_user = User(name=user.name, email=user.email)
+    session.add(db_user)
+    try:
+        session.commit()
+    except IntegrityError:
+        raise _email_taken(session)
+    session.refresh(db_user)
+    return db_user
+
+
+def _update_user(session: Session, user_id: int, user: UserCreate,
+                 if_match: Optional[str] = None):
+    values = {"name": user.name, "email": user.email}
+    try:
+        return update_row(session, User, user_id, values,
+                          if_match_versions(if_match, user_id), "User not found")
+    except IntegrityError:
+        raise _email_taken(session)
+
+
+def _delete_user(session: Session, user_id: int, if_match: Optional[str] = None) -> None:
+    delete_row(session, User, user_id, if_match_versions(if_match, user_id), "User not found")
+
+
 @router.get("/", response_model=List[UserRead])
-def list_users(session: Session = Depends(get_session)):
+async def list_users(
+    ids: Optional[str] = Query(
+        None, description="Comma-separated ids to fetch in request order instead of a page"
+    ),
+    query: ListQuery = Depends(user_list_query),
+    apply_filters=Depends(user_filters),
+    if_none_match: Optional[str] = Header(None),
+    session: AnySession = Depends(get_read_session),
+):
     """
-    Get all users from database
+    Get one page of users from database, filtered and sorted server-side.
+    The token for the next page is returned in the X-Next-Cursor header;
+    `fields` limits both the selected columns and the returned keys.
+    With `ids`, returns exactly those users instead, and lists unknown ids in X-Missing-Ids.
     """
-    statement = select(User)
-    users = session.exec(statement).all()
-    return users
+    if ids is not None:
+        rows, missing = await run_db(session, fetch_many, User, parse_ids(ids))
+        return json_response(dump_rows(UserRead, rows), headers=missing_headers(missing))
+    users, next_cursor, etag = await run_db(
+        session, fetch_page, User, query, apply_filters, if_none_match
+    )
+    if users is None:
+        return not_modified(etag)
+    # Rows already match UserRead, so they are rendered without re-validation
+    body = dumps(users) if query.fields else dump_rows(UserRead, users)
+    return json_response(body, headers=page_headers(next_cursor, ETag=etag))
+
+
+@router.get("/export")
+async def export_users(
+    format: str = Query("ndjson", pattern=EXPORT_FORMAT_PATTERN),
+    session: AnySession = Depends(get_read_session),
+):
+    """
+    Stream every user as NDJSON or CSV.
+    Rows are read in batches through a server-side cursor, so memory stays flat.
+    """
+    return stream_export(session, User, UserRead, format)
+
+
+@router.get("/changes", response_model=ChangeFeed)
+async def user_changes(
+    since: Optional[str] = Query(None, description="Cursor from the previous page; omit to start"),
+    limit: int = Query(CHANGES_PAGE_SIZE, ge=1, le=CHANGES_MAX_PAGE_SIZE),
+    session: AnySession = Depends(get_session),
+):
+    """
+    Users created, updated or deleted after `since`, oldest first.
+    Keep the returned cursor and poll again with it; has_more means call again now.
+    Reads the primary, since a lagging replica could skip past unreplicated rows.
+    """
+    changes, cursor, has_more = await run_db(
+        session, fetch_changes, User, UserRead, since, limit
+    )
+    return json_response(dumps({"changes": changes, "cursor": cursor, "has_more": has_more}))
+
+
+@router.get("/changes/stream")
+async def stream_user_changes(
+    since: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None),
+    session: AnySession = Depends(get_session),
+):
+    """
+    The user change feed as Server-Sent Events, one event per batch of changes.
+    Reconnecting clients resume from Last-Event-ID.
+    """
+    return stream_changes(session, User, UserRead, last_event_id or since)
+
+
+@router.post("/batch-get", response_model=UserBatch)
+async def batch_get_users(
+    request: BatchGet,
+    session: AnySession = Depends(get_read_session),
+):
+    """
+    Fetch many users by id with one query, in request order.
+    Ids that do not exist are listed in `missing`; at most BATCH_MAX_IDS per call.
+    """
+    rows, missing = await run_db(session, fetch_many, User, request.ids)
+    return json_response(dump_batch(UserRead, rows, missing))
 
 
 @router.get("/{user_id}", response_model=UserRead)
-def get_user(user_id: int, session: Session = Depends(get_session)):
+async def get_user(
+    user_id: int,
+    if_none_match: Optional[str] = Header(None),
+    session: AnySession = Depends(get_read_session),
+    cache: ResponseCache = Depends(get_cache),
+):
     """
-    Get a specific user by ID from database
+    Get a specific user by ID, served from the response cache when possible.
+    Answers 304 Not Modified when If-None-Match carries the current ETag.
     """
-    user = session.get(User, user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    return user
+    key = user_key(user_id)
+    entry = await cache.get(key)
+    if entry is None:
+        db_user = await run_db(session, _get_user, user_id)
+        etag = row_etag(db_user.id, db_user.updated_at)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        body = dump_model(UserRead, db_user)
+        if not reads_replica(session):
+            await cache.set(key, pack_entry(etag, body))
+    else:
+        etag, body = unpack_entry(entry)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    return json_response(body, headers={"ETag": etag})
 
 
 @router.post("/", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def create_user(user: UserCreate, session: Session = Depends(get_session)):
+async def create_user(user: UserCreate, session: AnySession = Depends(get_session)):
     """
     Create a new user in database
     """
-    # Check if email already exists
-    statement = select(User).where(User.email == user.email)
-    existing = session.exec(statement).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
-    db_user = User(name=user.name, email=user.email)
-    session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
-    return db_user
+    db_user = await run_db(session, _create_user, user)
+    return json_response(dump_model(UserRead, db_user), status_code=status.HTTP_201_CREATED)
+
+
+@router.post("/bulk", response_model=BulkResult)
+async def bulk_create_users(
+    request: Request,
+    batch_size: int = Query(BULK_BATCH_SIZE, ge=1, le=BULK_MAX_BATCH_SIZE),
+    session: AnySession = Depends(get_session),
+    cache: ResponseCache = Depends(get_cache),
+):
+    """
+    Create or update many users, matched by email, from a JSON array or an NDJSON stream.
+    Invalid rows are reported by index and do not abort the rest of the import.
+    """
+    written_ids = []
+    result = await bulk_import(
+        session, iter_bulk_items(request), UserCreate, User, batch_size,
+        conflict_column="email", update_columns=("name", "updated_at"),
+        written_ids=written_ids,
+    )
+    await cache.delete(*(user_key(user_id) for user_id in written_ids))
+    return result
 
 
 @router.put("/{user_id}", response_model=UserRead)
-def update_user(user_id: int, user: UserCreate, session: Session = Depends(get_session)):
+async def update_user(
+    user_id: int,
+    user: UserCreate,
+    if_match: Optional[str] = Header(None),
+    session: AnySession = Depends(get_session),
+    cache: ResponseCache = Depends(get_cache),
+):
     """
-    Update a user in database
+    Update a user in database with a single UPDATE ... RETURNING.
+    With If-Match, the update only applies while the user still has that ETag (412 otherwise).
     """
-    db_user = session.get(User, user_id)
-    if not db_user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    db_user.name = user.name
-    db_user.email = user.email
-    session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
-    return db_user
+    row = await run_db(session, _update_user, user_id, user, if_match)
+    await cache.delete(user_key(user_id))
+    return json_response(dump_model(UserRead, row),
+                         headers={"ETag": row_etag(row.id, row.updated_at)})
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(user_id: int, session: Session = Depends(get_session)):
+async def delete_user(
+    user_id: int,
+    if_match: Optional[str] = Header(None),
+    session: AnySession = Depends(get_session),
+    cache: ResponseCache = Depends(get_cache),
+):
     """
-    Delete a user from database
+    Delete a user from database with a single DELETE ... RETURNING id.
+    If-Match makes the delete conditional on the current ETag.
     """
-    db_user = session.get(User, user_id)
-    if not db_user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    session.delete(db_user)
-    session.commit()
+    await run_db(session, _delete_user, user_id, if_match)
+    await cache.delete(user_key(user_id))
     return None
@@ -0,0 +1,233 @@
+"""Bulk create/upsert helpers using multi-row INSERT ... ON CONFLICT"""
+import json
+import os
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import Session
+
+from app.database import AnySession, run_db
+from app.models.models import BulkError, BulkResult
+
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "500"))
+BULK_MAX_BATCH_SIZE = int(os.getenv("BULK_MAX_BATCH_SIZE", "5000"))
+# JSON arrays must be buffered to be parsed; larger imports have to use NDJSON
+BULK_MAX_BODY_BYTES = int(os.getenv("BULK_MAX_BODY_BYTES", str(32 * 1024 * 1024)))
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+class _InvalidLine:
+    """Placeholder for an NDJSON line that is not valid JSON"""
+
+
+async def _ndjson_items(request: Request, max_line_bytes: int) -> AsyncIterator[Any]:
+    buffer = b""
+    async for chunk in request.stream():
+        lines = (buffer + chunk).split(b"\n")
+        buffer = lines.pop()
+        if len(buffer) > max_line_bytes:
+            raise HTTPException(status_code=413,
+                                detail=f"NDJSON lines are limited to {max_line_bytes} bytes")
+        for line in lines:
+            if line.strip():
+                yield _parse_line(line)
+    if buffer.strip():
+        yield _parse_line(buffer)
+
+
+def _parse_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError:
+        return _InvalidLine()
+
+
+async def _json_array_items(request: Request, max_bytes: int) -> AsyncIterator[Any]:
+    if int(request.headers.get("content-length") or 0) > max_bytes:
+        raise HTTPException(status_code=413, detail=_too_large(max_bytes))
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise HTTPException(status_code=413, detail=_too_large(max_bytes))
+    try:
+        items = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body must be valid JSON")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Request body must be a JSON array")
+    for item in items:
+        yield item
+
+
+def _too_large(max_bytes: int) -> str:
+    return (f"JSON array bodies are limited to {max_bytes} bytes; "
+            "send larger imports as NDJSON")
+
+
+def iter_bulk_items(request: Request, max_bytes: Optional[int] = None) -> AsyncIterator[Any]:
+    """
+    Items of a bulk request body, either a JSON array or an NDJSON stream.
+    NDJSON is parsed line by line as it arrives, so imports of any length run
+    in bounded memory; a JSON array has to be buffered whole and is capped at
+    `max_bytes`. Unparseable NDJSON lines are kept so they can be reported per row.
+    """
+    max_bytes = BULK_MAX_BODY_BYTES if max_bytes is None else max_bytes
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type in NDJSON_MEDIA_TYPES:
+        return _ndjson_items(request, max_bytes)
+    return _json_array_items(request, max_bytes)
+
+
+def validate_row(index: int, item: Any, schema) -> Tuple[Optional[Any], Optional[BulkError]]:
+    """Validate one item against `schema`: (row, None) or (None, error)"""
+    if isinstance(item, _InvalidLine):
+        return None, BulkError(index=index, detail="Invalid JSON")
+    try:
+        return schema.model_validate(item), None
+    except ValidationError as exc:
+        return None, BulkError(
+            index=index,
+            detail=exc.errors(include_url=False, include_context=False),
+        )
+
+
+def _dialect_insert(session: Session, model):
+    """Return an INSERT construct supporting ON CONFLICT when the dialect has it"""
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(model.__table__), False
+    return dialect_insert(model.__table__), True
+
+
+def _insert_statement(session: Session, model, values: List[Dict[str, Any]],
+                      conflict_column: Optional[str], update_columns: Sequence[str],
+                      returning_ids: bool = False):
+    """Build one multi-row INSERT for `values`, upserting on `conflict_column`"""
+    statement, supports_upsert = _dialect_insert(session, model)
+    statement = statement.values(values)
+    if conflict_column and supports_upsert:
+        statement = statement.on_conflict_do_update(
+            index_elements=[conflict_column],
+            set_={column: statement.excluded[column] for column in update_columns},
+        )
+    if returning_ids and supports_upsert:
+        statement = statement.returning(model.__table__.c.id)
+    return statement
+
+
+def _execute(session: Session, statement, written_ids: Optional[List[int]]) -> None:
+    result = session.execute(statement)
+    if written_ids is not None and result.returns_rows:
+        written_ids.extend(result.scalars())
+
+
+def _stamp(values: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Timestamp a row right before it is written. The change feed expects rows to
+    be stamped shortly before they commit: a stamp taken at the start of a long
+    import would land behind cursors handed out while earlier batches committed.
+    """
+    now = datetime.utcnow()
+    values["created_at"] = values["updated_at"] = now
+    return values
+
+
+def upsert_batches(
+    session: Session,
+    model,
+    rows: List[Tuple[int, Any]],
+    errors: List[BulkError],
+    batch_size: int = BULK_BATCH_SIZE,
+    conflict_column: Optional[str] = None,
+    update_columns: Sequence[str] = (),
+    written_ids: Optional[List[int]] = None,
+) -> int:
+    """
+    Write validated rows in multi-row INSERT batches, one transaction per batch,
+    and return how many were written.
+    With `conflict_column` set, existing rows are updated instead of rejected.
+    A batch the database refuses is retried row by row to pinpoint the offenders,
+    which are appended to `errors`.
+    IDs of inserted or updated rows are appended to `written_ids` when given.
+    """
+    returning_ids = written_ids is not None
+    processed = 0
+
+    for start in range(0, len(rows), batch_size):
+        batch: Dict[Any, Tuple[int, Dict[str, Any]]] = {}
+        for index, item in rows[start:start + batch_size]:
+            values = item.model_dump()
+            # ON CONFLICT cannot touch the same row twice in one statement: last one wins
+            key = values[conflict_column] if conflict_column else index
+            batch[key] = (index, values)
+
+        merged = min(batch_size, len(rows) - start) - len(batch)
+        try:
+            _execute(session, _insert_statement(
+                session, model, [_stamp(values) for _, values in batch.values()],
+                conflict_column, update_columns, returning_ids,
+            ), written_ids)
+            session.commit()
+            processed += merged + len(batch)
+        except DBAPIError:
+            session.rollback()
+            processed += merged
+            for index, values in batch.values():
+                try:
+                    _execute(session, _insert_statement(
+                        session, model, [_stamp(values)], conflict_column, update_columns,
+                        returning_ids,
+                    ), written_ids)
+                    session.commit()
+                    processed += 1
+                except DBAPIError as exc:
+                    session.rollback()
+                    errors.append(BulkError(index=index, detail=str(exc.orig)))
+
+    return processed
+
+
+async def bulk_import(
+    session: AnySession,
+    items: AsyncIterator[Any],
+    schema,
+    model,
+    batch_size: int = BULK_BATCH_SIZE,
+    **options,
+) -> BulkResult:
+    """
+    Validate items as they arrive and write every `batch_size` valid rows as soon
+    as they are collected, so at most one batch is held in memory.
+    Invalid rows are reported by index and do not abort the rest of the import.
+    `options` are passed on to upsert_batches.
+    """
+    errors: List[BulkError] = []
+    pending: List[Tuple[int, Any]] = []
+    processed = 0
+    index = 0
+    async for item in items:
+        row, error = validate_row(index, item, schema)
+        if error is None:
+            pending.append((index, row))
+        else:
+            errors.append(error)
+        index += 1
+        if len(pending) >= batch_size:
+            processed += await run_db(session, upsert_batches, model, pending, errors,
+                                      batch_size, **options)
+            pending = []
+    if pending:
+        processed += await run_db(session, upsert_batches, model, pending, errors,
+                                  batch_size, **options)
+    errors.sort(key=lambda error: error.index)
+    return BulkResult(processed=processed, failed=len(errors), errors=errors)
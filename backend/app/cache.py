@@ -0,0 +1,202 @@
+"""Read-through response cache with in-process LRU and Redis backends"""
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.metrics import REGISTRY, SampledCounter
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")  # memory | redis | none
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+def product_key(product_id: int) -> str:
+    return f"product:{product_id}"
+
+
+def user_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def pack_entry(etag: str, body: bytes) -> bytes:
+    """Store the ETag alongside the body so hits can answer conditional GETs"""
+    return etag.encode("ascii") + b"\n" + body
+
+
+def unpack_entry(entry: bytes) -> Tuple[str, bytes]:
+    etag, _, body = entry.partition(b"\n")
+    return etag.decode("ascii"), body
+
+
+class ResponseCache(ABC):
+    """
+    Base cache storing serialized response bodies by key.
+    Subclasses implement the storage; counters are kept per process.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value = await self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self._set(key, value)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._delete(*keys)
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "backend": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    @abstractmethod
+    async def _get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def _set(self, key: str, value: bytes) -> None:
+        ...
+
+    @abstractmethod
+    async def _delete(self, *keys: str) -> None:
+        ...
+
+
+class NullCache(ResponseCache):
+    """Cache that stores nothing, for CACHE_BACKEND=none"""
+
+    name = "none"
+
+    async def _get(self, key):
+        return None
+
+    async def _set(self, key, value):
+        pass
+
+    async def _delete(self, *keys):
+        pass
+
+    async def clear(self):
+        pass
+
+
+class MemoryCache(ResponseCache):
+    """In-process LRU cache with a per-entry TTL"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.evictions += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def _set(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def _delete(self, *keys):
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        return {**super().stats(), "size": len(self._entries), "max_entries": self.max_entries}
+
+
+class RedisCache(ResponseCache):
+    """
+    Cache stored in a Redis-compatible server through a redis.asyncio client.
+    Expiry is left to the server, so evictions are not counted here.
+    """
+
+    name = "redis"
+
+    def __init__(self, client, ttl: float = CACHE_TTL_SECONDS, prefix: str = "api:"):
+        super().__init__()
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def _get(self, key):
+        return await self.client.get(self.prefix + key)
+
+    async def _set(self, key, value):
+        await self.client.set(self.prefix + key, value, px=int(self.ttl * 1000))
+
+    async def _delete(self, *keys):
+        await self.client.delete(*(self.prefix + key for key in keys))
+
+    async def clear(self):
+        keys = [key async for key in self.client.scan_iter(match=self.prefix + "*")]
+        if keys:
+            await self.client.delete(*keys)
+
+
+def build_cache(backend: str = CACHE_BACKEND) -> ResponseCache:
+    """Create the cache selected by CACHE_BACKEND"""
+    if backend == "none":
+        return NullCache()
+    if backend == "redis":
+        import redis.asyncio as redis  # optional dependency
+        return RedisCache(redis.Redis.from_url(REDIS_URL))
+    return MemoryCache()
+
+
+response_cache = build_cache()
+
+CACHE_EVENTS = REGISTRY.register(SampledCounter(
+    "response_cache_events_total", "Response cache lookups and evictions", ("event",)))
+
+
+def _collect_cache_stats():
+    stats = response_cache.stats()
+    for event in ("hits", "misses", "evictions"):
+        CACHE_EVENTS.set(stats[event], event)
+
+
+REGISTRY.add_collector(_collect_cache_stats)
+
+
+def get_cache() -> ResponseCache:
+    """Get response cache dependency for FastAPI"""
+    return response_cache
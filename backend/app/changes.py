@@ -0,0 +1,207 @@
+"""Change feeds: incremental sync over (updated_at, id) plus delete tombstones"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, literal, tuple_
+from sqlmodel import Session, select
+
+from app.database import AnySession, SessionLocal, run_db
+from app.models.models import Tombstone
+from app.pagination import decode_cursor, encode_cursor
+from app.serialization import dumps, row_dict
+
+logger = logging.getLogger(__name__)
+
+CHANGES_PAGE_SIZE = int(os.getenv("CHANGES_PAGE_SIZE", "500"))
+CHANGES_MAX_PAGE_SIZE = int(os.getenv("CHANGES_MAX_PAGE_SIZE", "5000"))
+# Rows stamped in the last few seconds may belong to transactions that have not
+# committed yet; the feed waits this long before handing them out
+CHANGES_SETTLE_SECONDS = float(os.getenv("CHANGES_SETTLE_SECONDS", "2"))
+CHANGES_POLL_SECONDS = float(os.getenv("CHANGES_POLL_SECONDS", "1"))
+CHANGES_HEARTBEAT_SECONDS = float(os.getenv("CHANGES_HEARTBEAT_SECONDS", "15"))
+# Tombstones older than this are pruned (0 keeps them forever); a cursor last caught
+# up before then may have missed pruned deletes, so it is refused and the consumer resyncs
+CHANGES_TOMBSTONE_RETENTION_DAYS = float(os.getenv("CHANGES_TOMBSTONE_RETENTION_DAYS", "30"))
+CHANGES_PRUNE_INTERVAL_SECONDS = float(os.getenv("CHANGES_PRUNE_INTERVAL_SECONDS", "3600"))
+
+Position = Optional[Tuple[datetime, int]]
+
+
+def _position(value) -> Position:
+    if value is None:
+        return None
+    try:
+        stamp, row_id = value
+        if not isinstance(row_id, int) or isinstance(row_id, bool):
+            raise ValueError
+        return datetime.fromisoformat(stamp), row_id
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _synced(value, upserts: Position, deletes: Position) -> Optional[datetime]:
+    if value is None:
+        # Cursors issued before retention was tracked: the newest change they reached
+        stamps = [position[0] for position in (upserts, deletes) if position]
+        return max(stamps) if stamps else None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_since(since: Optional[str]) -> Tuple[Position, Position, Optional[datetime]]:
+    """
+    Upsert and tombstone positions from a `since` cursor, plus when its consumer was
+    last caught up; None starts from the beginning. 410 once tombstones it has not
+    read yet may have been pruned.
+    """
+    if not since:
+        return None, None, None
+    values = decode_cursor(since)
+    upserts, deletes = _position(values.get("u")), _position(values.get("d"))
+    synced = _synced(values.get("t"), upserts, deletes)
+    if (CHANGES_TOMBSTONE_RETENTION_DAYS and synced is not None
+            and synced < datetime.utcnow() - timedelta(days=CHANGES_TOMBSTONE_RETENTION_DAYS)):
+        raise HTTPException(status_code=410, detail="Cursor expired, sync again without since")
+    return upserts, deletes, synced
+
+
+def encode_since(upserts: Position, deletes: Position,
+                 synced: Optional[datetime] = None) -> str:
+    values: Dict[str, Any] = {}
+    if upserts:
+        values["u"] = [upserts[0].isoformat(), upserts[1]]
+    if deletes:
+        values["d"] = [deletes[0].isoformat(), deletes[1]]
+    if synced:
+        values["t"] = synced.isoformat()
+    return encode_cursor(values)
+
+
+def _after(statement, stamp_column, id_column, position: Position):
+    if position is None:
+        return statement
+    bound = tuple_(literal(position[0], stamp_column.type), literal(position[1]))
+    return statement.where(tuple_(stamp_column, id_column) > bound)
+
+
+def fetch_changes(session: Session, model, read_schema, since: Optional[str],
+                  limit: int = CHANGES_PAGE_SIZE,
+                  settle_seconds: Optional[float] = None) -> Tuple[List[dict], str, bool]:
+    """
+    Return (changes, cursor, has_more) for rows of `model` changed after `since`.
+    Upserts seek the (updated_at, id) index and deletes the tombstones index, each
+    with its own position in the cursor, so a page costs O(limit) whatever the table size.
+    The session's transaction is ended before returning, releasing its connection.
+    """
+    upsert_at, delete_at, synced_at = parse_since(since)
+    if settle_seconds is None:
+        settle_seconds = CHANGES_SETTLE_SECONDS
+    horizon = datetime.utcnow() - timedelta(seconds=settle_seconds)
+    if since is None:
+        # Rows deleted before a first sync starts were never handed out as upserts
+        synced_at = horizon
+
+    upserts = session.exec(
+        _after(select(model).where(model.updated_at < horizon),
+               model.updated_at, model.id, upsert_at)
+        .order_by(model.updated_at, model.id).limit(limit + 1)
+    ).all()
+    tombstones = session.exec(
+        _after(select(Tombstone).where(Tombstone.entity == model.__tablename__,
+                                       Tombstone.deleted_at < horizon),
+               Tombstone.deleted_at, Tombstone.id, delete_at)
+        .order_by(Tombstone.deleted_at, Tombstone.id).limit(limit + 1)
+    ).all()
+
+    merged = sorted(
+        [(row.updated_at, 0, row.id, row) for row in upserts]
+        + [(tombstone.deleted_at, 1, tombstone.id, tombstone) for tombstone in tombstones],
+        key=lambda item: item[:3],
+    )
+    has_more = len(merged) > limit
+    changes = []
+    for stamp, kind, key, item in merged[:limit]:
+        if kind == 0:
+            upsert_at = (stamp, key)
+            changes.append({"op": "upsert", "id": key, "at": stamp,
+                            "data": row_dict(read_schema, item)})
+        else:
+            delete_at = (stamp, key)
+            changes.append({"op": "delete", "id": item.entity_id, "at": stamp})
+    if not has_more:
+        synced_at = horizon  # every tombstone older than the horizon has been read
+    session.rollback()
+    return changes, encode_since(upsert_at, delete_at, synced_at), has_more
+
+
+def prune_tombstones(session: Session, retention_days: Optional[float] = None) -> int:
+    """Delete tombstones older than the retention period; returns how many were removed"""
+    if retention_days is None:
+        retention_days = CHANGES_TOMBSTONE_RETENTION_DAYS
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    table = Tombstone.__table__
+    result = session.execute(delete(table).where(table.c.deleted_at < cutoff))
+    session.commit()
+    return result.rowcount
+
+
+async def prune_tombstones_periodically(interval: float = CHANGES_PRUNE_INTERVAL_SECONDS):
+    """Background task pruning expired tombstones until cancelled"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            with SessionLocal() as session:
+                pruned = await run_db(session, prune_tombstones)
+        except Exception as error:  # the schema may not exist yet; try again next time
+            logger.warning("Tombstone pruning failed: %s", error)
+            continue
+        if pruned:
+            logger.info("Pruned %d expired tombstones", pruned)
+
+
+def render_event(changes: List[dict], cursor: str) -> bytes:
+    """One Server-Sent Event carrying a batch; its id resumes the feed on reconnect"""
+    return (b"id: " + cursor.encode("ascii") + b"\nevent: changes\ndata: "
+            + dumps({"changes": changes, "cursor": cursor}) + b"\n\n")
+
+
+async def change_events(session: AnySession, model, read_schema, since: Optional[str],
+                        poll_seconds: float = CHANGES_POLL_SECONDS,
+                        heartbeat_seconds: float = CHANGES_HEARTBEAT_SECONDS,
+                        limit: int = CHANGES_PAGE_SIZE) -> AsyncIterator[bytes]:
+    """
+    Poll the feed and yield each non-empty batch as an event, draining backlogs
+    without waiting. Comment lines keep idle connections from timing out.
+    """
+    cursor = since
+    quiet_since = time.monotonic()
+    while True:
+        changes, cursor, has_more = await run_db(
+            session, fetch_changes, model, read_schema, cursor, limit
+        )
+        if changes:
+            quiet_since = time.monotonic()
+            yield render_event(changes, cursor)
+        elif time.monotonic() - quiet_since >= heartbeat_seconds:
+            quiet_since = time.monotonic()
+            yield b": keepalive\n\n"
+        if not has_more:
+            await asyncio.sleep(poll_seconds)
+
+
+def stream_changes(session: AnySession, model, read_schema, since: Optional[str]):
+    """Server-Sent Events response pushing changes shortly after they commit"""
+    parse_since(since)  # refuse a bad or expired cursor before the stream starts
+    return StreamingResponse(
+        change_events(session, model, read_schema, since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
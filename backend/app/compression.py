@@ -0,0 +1,175 @@
+"""Negotiated gzip/brotli response compression that also handles streamed bodies"""
+import os
+import zlib
+from typing import List, Optional, Tuple
+
+try:
+    import brotli  # optional dependency
+except ImportError:  # pragma: no cover - exercised only without brotli installed
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+# Bodies of these types are already compressed; recompressing only burns CPU
+INCOMPRESSIBLE_PREFIXES = ("image/", "video/", "audio/", "application/zip",
+                           "application/gzip", "application/x-gzip", "font/woff")
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str, available: Optional[Tuple[str, ...]] = None) -> Optional[str]:
+    """
+    Pick the encoding to use for an Accept-Encoding header, or None for identity.
+    Highest q-value wins; ties go to the order of `available` (brotli first).
+    """
+    available = available or supported_encodings()
+    weights = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token] = q
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class StreamCompressor:
+    """Incremental encoder; flush() emits everything accepted so far"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._gz = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, flush: bool = False, finish: bool = False) -> bytes:
+        if self.encoding == "br":
+            out = self._br.process(data) if data else b""
+            if finish:
+                return out + self._br.finish()
+            return out + self._br.flush() if flush else out
+        out = self._gz.compress(data)
+        if finish:
+            return out + self._gz.flush(zlib.Z_FINISH)
+        return out + self._gz.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _compressed_start(start, encoding: str, length: Optional[int] = None):
+    """Rewrite the start message: encoding, Vary, length, and a weak ETag"""
+    headers = []
+    vary = None
+    for key, value in start.get("headers", []):
+        lower = key.lower()
+        if lower == b"content-length":
+            continue
+        if lower == b"vary":
+            vary = value
+            continue
+        if lower == b"etag" and not value.startswith(b"W/"):
+            # The encoded bytes differ from the identity representation
+            value = b"W/" + value
+        headers.append((key, value))
+    headers.append((b"content-encoding", encoding.encode("ascii")))
+    headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+    if length is not None:
+        headers.append((b"content-length", str(length).encode("ascii")))
+    return {**start, "headers": headers}
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware compressing responses with the client's preferred encoding.
+    Complete bodies below `minimum_size` are sent as is. Streamed bodies are
+    compressed and flushed chunk by chunk, so nothing is buffered. Responses that
+    already carry a Content-Encoding, have no body (HEAD, 204, 304) or hold
+    compressed media pass through unchanged.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE,
+                 gzip_level: int = COMPRESSION_GZIP_LEVEL,
+                 brotli_quality: int = COMPRESSION_BROTLI_QUALITY):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        accept = _header(scope["headers"], b"accept-encoding")
+        encoding = negotiate(accept.decode("latin-1")) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor: Optional[StreamCompressor] = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                headers = message.get("headers", [])
+                content_type = (_header(headers, b"content-type") or b"").decode("latin-1")
+                passthrough = (
+                    message["status"] in (204, 304) or message["status"] < 200
+                    or _header(headers, b"content-encoding") is not None
+                    or content_type.startswith(INCOMPRESSIBLE_PREFIXES)
+                )
+                if passthrough:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = StreamCompressor(encoding, self.gzip_level, self.brotli_quality)
+                if not more_body:
+                    compressed = compressor.compress(body, finish=True)
+                    await send(_compressed_start(start, encoding, len(compressed)))
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                await send(_compressed_start(start, encoding))
+            if more_body:
+                chunk = compressor.compress(body, flush=True)
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            else:
+                await send({"type": "http.response.body",
+                            "body": compressor.compress(body, finish=True)})
+
+        await self.app(scope, receive, send_wrapper)
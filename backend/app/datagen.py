@@ -0,0 +1,169 @@
+"""Deterministic synthetic users and products, loaded with COPY or batched executemany"""
+import csv
+import io
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from sqlalchemy import func, insert, select
+
+from app.models.models import Product, User
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+USER_COLUMNS = ("name", "email", "active", "created_at", "updated_at")
+PRODUCT_COLUMNS = ("name", "description", "price", "in_stock", "created_at", "updated_at")
+
+FIRST_NAMES = ["James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda",
+               "William", "Elizabeth", "David", "Barbara", "Richard", "Susan", "Joseph", "Jessica",
+               "Thomas", "Sarah", "Charles", "Karen", "Wei", "Aisha", "Carlos", "Yuki"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+              "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson",
+              "Thomas", "Taylor", "Moore", "Jackson", "Martin", "Chen", "Khan", "Silva", "Sato"]
+EMAIL_DOMAINS = ["example.com", "example.org", "example.net", "mail.example.com"]
+ADJECTIVES = ["Red", "Blue", "Steel", "Ceramic", "Wooden", "Compact", "Deluxe", "Vintage",
+              "Portable", "Organic", "Smart", "Classic", "Heavy-Duty", "Mini", "Pro", "Eco"]
+NOUNS = ["Kettle", "Mug", "Lamp", "Chair", "Desk", "Speaker", "Backpack", "Blender", "Jacket",
+         "Watch", "Camera", "Bottle", "Pillow", "Router", "Drill", "Teapot", "Laptop", "Monitor",
+         "Keyboard", "Mouse"]
+FEATURES = ["durable finish", "two-year warranty", "easy to clean", "lightweight design",
+            "energy efficient", "ergonomic grip", "fast charging", "water resistant",
+            "recycled materials", "compact storage", "quiet operation", "gift ready"]
+
+
+class Distribution:
+    """Knobs shaping the generated data; the defaults resemble a small storefront"""
+
+    def __init__(self, seed: int = 42, active_ratio: float = 0.8, in_stock_ratio: float = 0.9,
+                 price_median: float = 40.0, price_sigma: float = 1.0, history_days: int = 730,
+                 anchor: Optional[datetime] = None):
+        self.seed = seed
+        self.active_ratio = active_ratio
+        self.in_stock_ratio = in_stock_ratio
+        self.price_median = price_median
+        self.price_sigma = price_sigma
+        self.history_days = history_days
+        # Fixed default anchor keeps timestamps reproducible between runs
+        self.anchor = anchor or datetime(2024, 1, 1)
+
+    def rng(self, table: str, start: int) -> random.Random:
+        """Random stream determined by seed, table and first row number"""
+        return random.Random(f"{self.seed}:{table}:{start}")
+
+    def timestamps(self, rng: random.Random) -> Tuple[datetime, datetime]:
+        created = self.anchor - timedelta(seconds=rng.uniform(0, self.history_days * 86400))
+        age = (self.anchor - created).total_seconds()
+        updated = created + timedelta(seconds=rng.uniform(0, age))
+        return created.replace(microsecond=0), updated.replace(microsecond=0)
+
+
+def generate_users(count: int, start: int = 0,
+                   distribution: Optional[Distribution] = None) -> Iterator[tuple]:
+    """Yield `count` user rows in USER_COLUMNS order; e-mails are unique by row number"""
+    distribution = distribution or Distribution()
+    rng = distribution.rng("users", start)
+    for i in range(start, start + count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        email = f"{first.lower()}.{last.lower()}.{i}@{rng.choice(EMAIL_DOMAINS)}"
+        active = rng.random() < distribution.active_ratio
+        yield (f"{first} {last}", email, active, *distribution.timestamps(rng))
+
+
+def generate_products(count: int, start: int = 0,
+                      distribution: Optional[Distribution] = None) -> Iterator[tuple]:
+    """Yield `count` product rows in PRODUCT_COLUMNS order with log-normal prices"""
+    distribution = distribution or Distribution()
+    rng = distribution.rng("products", start)
+    mu = math.log(distribution.price_median)
+    for _ in range(count):
+        name = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}"
+        description = f"{name} with " + ", ".join(rng.sample(FEATURES, rng.randint(1, 3)))
+        price = max(0.01, round(rng.lognormvariate(mu, distribution.price_sigma), 2))
+        in_stock = rng.random() < distribution.in_stock_ratio
+        yield (name, description, price, in_stock, *distribution.timestamps(rng))
+
+
+def _chunks(rows: Iterable[tuple], size: int) -> Iterator[list]:
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def csv_chunk(rows: Sequence[tuple]) -> io.StringIO:
+    """Render rows as the CSV that COPY ... (FORMAT csv) expects"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for row in rows:
+        writer.writerow([value.isoformat(sep=" ") if isinstance(value, datetime) else value
+                         for value in row])
+    buffer.seek(0)
+    return buffer
+
+
+def _supports_copy(engine) -> bool:
+    return engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2"
+
+
+def load_rows(engine, table, columns: Sequence[str], rows: Iterable[tuple],
+              chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Stream rows into `table` one chunk per transaction.
+    PostgreSQL (psycopg2) uses COPY FROM STDIN; other databases use executemany.
+    """
+    loaded = 0
+    if _supports_copy(engine):
+        sql = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+        for chunk in _chunks(rows, chunk_size):
+            connection = engine.raw_connection()
+            try:
+                with connection.cursor() as cursor:
+                    cursor.copy_expert(sql, csv_chunk(chunk))
+                connection.commit()
+            finally:
+                connection.close()
+            loaded += len(chunk)
+        return loaded
+
+    statement = insert(table)
+    for chunk in _chunks(rows, chunk_size):
+        with engine.begin() as conn:
+            conn.execute(statement, [dict(zip(columns, row)) for row in chunk])
+        loaded += len(chunk)
+    return loaded
+
+
+def next_row_number(engine, model) -> int:
+    """Row number to continue from, so repeated runs append unique rows"""
+    with engine.connect() as conn:
+        return conn.execute(select(func.coalesce(func.max(model.id), 0))).scalar()
+
+
+def generate(engine, users: int = 0, products: int = 0,
+             distribution: Optional[Distribution] = None,
+             chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Dict[str, float]]:
+    """Append generated users and products and report rows, seconds and rows/sec per table"""
+    distribution = distribution or Distribution()
+    report = {}
+    for model, columns, generator, count in (
+        (User, USER_COLUMNS, generate_users, users),
+        (Product, PRODUCT_COLUMNS, generate_products, products),
+    ):
+        if not count:
+            continue
+        start = next_row_number(engine, model)
+        began = time.perf_counter()
+        loaded = load_rows(engine, model.__table__, columns,
+                           generator(count, start, distribution), chunk_size)
+        elapsed = time.perf_counter() - began
+        report[model.__tablename__] = {
+            "rows": loaded,
+            "seconds": elapsed,
+            "rows_per_sec": loaded / elapsed if elapsed else 0.0,
+        }
+    return report
@@ -0,0 +1,74 @@
+"""Strong ETags and conditional GET handling"""
+import hashlib
+from datetime import datetime, timedelta
+from typing import Any, Iterable, List, Optional
+
+from fastapi import Response
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def version_of(updated_at: datetime) -> int:
+    """Microseconds since the epoch, exact for naive UTC timestamps"""
+    return (updated_at.replace(tzinfo=None) - EPOCH) // timedelta(microseconds=1)
+
+
+def from_version(version: int) -> datetime:
+    """Inverse of version_of"""
+    return EPOCH + timedelta(microseconds=version)
+
+
+def row_etag(row_id: int, updated_at: datetime) -> str:
+    """ETag of a single row, changing whenever updated_at is bumped"""
+    return f'"{row_id}-{version_of(updated_at)}"'
+
+
+def rows_etag(rows: Iterable[Any], *extra: Any) -> str:
+    """
+    ETag of a list response, hashed from the (id, updated_at) of every row.
+    `extra` covers anything else that shapes the body, such as the selected fields.
+    """
+    digest = hashlib.sha1()
+    for value in extra:
+        digest.update(repr(value).encode("utf-8"))
+        digest.update(b"|")
+    for row in rows:
+        digest.update(f"{row.id}-{version_of(row.updated_at)};".encode("ascii"))
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate an If-None-Match header against the current ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def if_match_versions(if_match: Optional[str], row_id: int) -> Optional[List[datetime]]:
+    """
+    The updated_at values an If-Match header allows for row `row_id`.
+    None means no precondition (header absent or `*`); foreign tags allow nothing.
+    Row tags are only ever weakened by response compression, and they still name
+    one exact row version, so this server's own W/ row tags are accepted too.
+    """
+    if not if_match:
+        return None
+    candidates = [tag.strip() for tag in if_match.split(",")]
+    if "*" in candidates:
+        return None
+    versions = []
+    prefix = f'"{row_id}-'
+    for tag in candidates:
+        tag = tag.removeprefix("W/")
+        if tag.startswith(prefix) and tag.endswith('"') and tag[len(prefix):-1].isdigit():
+            versions.append(from_version(int(tag[len(prefix):-1])))
+    return versions
+
+
+def not_modified(etag: str) -> Response:
+    """304 response carrying the validator, with no body"""
+    return Response(status_code=304, headers={"ETag": etag})
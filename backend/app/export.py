@@ -0,0 +1,119 @@
+"""Streaming NDJSON / CSV export of whole tables"""
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from typing import AsyncIterator, Iterator, List
+
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import AnySession
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+EXPORT_FORMAT_PATTERN = "^(" + "|".join(EXPORT_FORMATS) + ")$"
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def _export_statement(model, fields: List[str], batch_size: int):
+    """Select plain column tuples so no ORM objects pile up in the session"""
+    return (
+        select(*[getattr(model, field) for field in fields])
+        .order_by(model.id)
+        .execution_options(stream_results=True, yield_per=batch_size)
+    )
+
+
+def render_ndjson(batch, fields: List[str]) -> str:
+    """Render a batch of rows as newline-delimited JSON objects"""
+    return "".join(
+        json.dumps(dict(zip(fields, row)), default=_json_default,
+                   ensure_ascii=False, separators=(",", ":")) + "\n"
+        for row in batch
+    )
+
+
+def render_csv(batch, fields: List[str]) -> str:
+    """Render a batch of rows as CSV lines"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_csv_value(value) for value in row] for row in batch)
+    return buffer.getvalue()
+
+
+def _csv_header(fields: List[str]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(fields)
+    return buffer.getvalue()
+
+
+def iter_export(session: Session, statement, render, fields: List[str],
+                header: str = "") -> Iterator[str]:
+    """Stream rendered batches through a server-side cursor"""
+    if header:
+        yield header
+    result = session.execute(statement)
+    try:
+        for partition in result.partitions():
+            yield render(partition, fields)
+    finally:
+        result.close()
+
+
+async def aiter_export(session: AsyncSession, statement, render, fields: List[str],
+                       header: str = "") -> AsyncIterator[str]:
+    """Async variant of iter_export for the asyncio engine"""
+    if header:
+        yield header
+    result = await session.stream(statement)
+    try:
+        async for partition in result.partitions():
+            yield render(partition, fields)
+    finally:
+        await result.close()
+
+
+def stream_export(
+    session: AnySession,
+    model,
+    read_schema,
+    export_format: str,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> StreamingResponse:
+    """
+    Build a StreamingResponse exporting every row of `model`.
+    Fields and their order follow `read_schema`, matching the regular JSON API.
+    """
+    fields = list(read_schema.model_fields)
+    statement = _export_statement(model, fields, batch_size)
+    if export_format == "csv":
+        render, header = render_csv, _csv_header(fields)
+    else:
+        render, header = render_ndjson, ""
+    iterate = aiter_export if isinstance(session, AsyncSession) else iter_export
+    chunks = iterate(session, statement, render, fields, header)
+    filename = f"{model.__tablename__}.{export_format}"
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,8 +1,13 @@
 """Database models using SQLModel"""
+from sqlalchemy import Index, func, text
+from pydantic import conint
 from sqlmodel import SQLModel, Field
-from typing import Optional
+from typing import Any, List, Optional
 from datetime import datetime
 
+# Largest id a signed 64-bit database parameter can carry
+MAX_ID = 2**63 - 1
+
 
 class UserBase(SQLModel):
     """User base model"""
@@ -14,6 +19,15 @@ class UserBase(SQLModel):
 class User(UserBase, table=True):
     """User database model"""
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset pages filtered by active, and sorted listings, seek on (key, id)
+        Index("ix_users_active_id", "active", "id"),
+        Index("ix_users_created_at_id", "created_at", "id"),
+        Index("ix_users_updated_at_id", "updated_at", "id"),
+        # Lets PostgreSQL serve name prefix (LIKE 'abc%') filters from an index
+        Index("ix_users_name_pattern", "name",
+              postgresql_ops={"name": "text_pattern_ops"}).ddl_if(dialect="postgresql"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -33,6 +47,12 @@ class UserRead(UserBase):
     updated_at: datetime
 
 
+class UserBatch(SQLModel):
+    """Batch read result: found users in request order and the ids that were not"""
+    items: List[UserRead]
+    missing: List[int] = []
+
+
 class ProductBase(SQLModel):
     """Product base model"""
     name: str = Field(index=True)
@@ -44,12 +64,34 @@ class ProductBase(SQLModel):
 class Product(ProductBase, table=True):
     """Product database model"""
     __tablename__ = "products"
+    __table_args__ = (
+        # Keyset pages filtered by in_stock, and sorted listings, seek on (key, id)
+        Index("ix_products_in_stock_id", "in_stock", "id"),
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_created_at_id", "created_at", "id"),
+        Index("ix_products_updated_at_id", "updated_at", "id"),
+        # Lets PostgreSQL serve name prefix (LIKE 'abc%') filters from an index
+        Index("ix_products_name_pattern", "name",
+              postgresql_ops={"name": "text_pattern_ops"}).ddl_if(dialect="postgresql"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+# Weighted document searched by GET /products/search: name ranks above description.
+# The text search config is inlined so queries match the expression index exactly.
+SEARCH_CONFIG = text("'english'::regconfig")
+PRODUCT_SEARCH_VECTOR = func.setweight(
+    func.to_tsvector(SEARCH_CONFIG, Product.__table__.c.name), text("'A'")
+).op("||")(
+    func.setweight(func.to_tsvector(SEARCH_CONFIG, Product.__table__.c.description), text("'B'"))
+)
+Index("ix_products_search", PRODUCT_SEARCH_VECTOR,
+      postgresql_using="gin").ddl_if(dialect="postgresql")
+
+
 class ProductCreate(SQLModel):
     """Product creation schema"""
     name: str
@@ -62,3 +104,53 @@ class ProductRead(ProductBase):
     id: int
     created_at: datetime
     updated_at: datetime
+
+
+class ProductSearchHit(ProductRead):
+    """Product search result with its relevance score"""
+    rank: float
+
+
+class ProductBatch(SQLModel):
+    """Batch read result: found products in request order and the ids that were not"""
+    items: List[ProductRead]
+    missing: List[int] = []
+
+
+class BatchGet(SQLModel):
+    """Batch read request"""
+    ids: List[conint(ge=1, le=MAX_ID)]
+
+
+class Tombstone(SQLModel, table=True):
+    """Deleted row marker read by the change feeds"""
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        # Change feeds seek on (deleted_at, id) within one entity
+        Index("ix_tombstones_entity_deleted_at_id", "entity", "deleted_at", "id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    entity: str
+    entity_id: int
+    deleted_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class ChangeFeed(SQLModel):
+    """One page of a change feed; pass `cursor` back as `since` to continue"""
+    changes: List[Any]
+    cursor: str
+    has_more: bool
+
+
+class BulkError(SQLModel):
+    """Rejected row in a bulk request"""
+    index: int
+    detail: Any
+
+
+class BulkResult(SQLModel):
+    """Bulk create/upsert report"""
+    processed: int
+    failed: int
+    errors: List[BulkError] = []
@@ -0,0 +1,190 @@
+"""Keyset (cursor) pagination, sorting and field projection for list endpoints"""
+import base64
+import binascii
+import json
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query
+from sqlalchemy import Boolean, DateTime, Integer, Numeric, String, TypeDecorator, literal, tuple_
+from sqlmodel import Session, select
+
+from app.etag import etag_matches, rows_etag
+
+DEFAULT_PAGE_SIZE = int(os.getenv("PAGE_SIZE_DEFAULT", "100"))
+MAX_PAGE_SIZE = int(os.getenv("PAGE_SIZE_MAX", "1000"))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Encode the seek position into an opaque, URL-safe token"""
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a token produced by encode_cursor, rejecting anything else"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def _cursor_value(column, value):
+    """Turn a cursor's JSON value back into the column's Python type, or reject it"""
+    column_type = column.type
+    if isinstance(column_type, TypeDecorator):  # e.g. SQLModel's AutoString
+        column_type = column_type.impl_instance
+    if isinstance(column_type, DateTime):
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    if isinstance(column_type, Boolean):
+        valid = isinstance(value, bool)
+    elif isinstance(column_type, Integer):
+        valid = isinstance(value, int) and not isinstance(value, bool)
+    elif isinstance(column_type, Numeric):
+        valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+    elif isinstance(column_type, String):
+        valid = isinstance(value, str)
+    else:
+        valid = value is not None and not isinstance(value, (dict, list))
+    if not valid:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value
+
+
+def keyset_page(statement, id_column, limit: int, cursor: Optional[str] = None,
+                sort_column=None, descending: bool = False):
+    """
+    Restrict a select to one page seeking on (sort_column, id), or on id alone.
+    One extra row is fetched so split_page can tell whether a next page exists.
+    """
+    if cursor:
+        values = decode_cursor(cursor)
+        last_id = values.get("id")
+        if not isinstance(last_id, int) or isinstance(last_id, bool):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if sort_column is None:
+            statement = statement.where(id_column < last_id if descending else id_column > last_id)
+        else:
+            if values.get("s") != sort_column.key:
+                raise HTTPException(status_code=400, detail="Cursor does not match sort order")
+            key = tuple_(sort_column, id_column)
+            bound = tuple_(literal(_cursor_value(sort_column, values.get("v")), sort_column.type),
+                           literal(last_id))
+            statement = statement.where(key < bound if descending else key > bound)
+
+    order = [id_column] if sort_column is None else [sort_column, id_column]
+    if descending:
+        order = [column.desc() for column in order]
+    return statement.order_by(*order).limit(limit + 1)
+
+
+def split_page(rows: Sequence[Any], limit: int,
+               sort_key: Optional[str] = None) -> Tuple[List[Any], Optional[str]]:
+    """Trim the look-ahead row and build the cursor for the next page"""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    values: Dict[str, Any] = {"id": last.id}
+    if sort_key:
+        value = getattr(last, sort_key)
+        values.update(s=sort_key, v=value.isoformat() if isinstance(value, datetime) else value)
+    return page, encode_cursor(values)
+
+
+def page_headers(next_cursor: Optional[str], **headers: str) -> Dict[str, str]:
+    """Response headers for a page, exposing the next page token if there is one"""
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return headers
+
+
+class ListQuery:
+    """Parsed paging, sorting and projection parameters of a list request"""
+
+    def __init__(self, limit: int, cursor: Optional[str], sort_key: str,
+                 descending: bool, fields: Optional[List[str]]):
+        self.limit = limit
+        self.cursor = cursor
+        self.sort_key = sort_key
+        self.descending = descending
+        self.fields = fields
+
+
+def list_query(sort_keys: Sequence[str], field_names: Sequence[str]) -> Callable[..., ListQuery]:
+    """
+    Build a FastAPI dependency parsing limit/cursor/sort/fields for one model.
+    Only the whitelisted sort keys and read-schema fields are accepted.
+    """
+    sort_pattern = "^-?(" + "|".join(sort_keys) + ")$"
+
+    def dependency(
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = None,
+        sort: str = Query("id", pattern=sort_pattern,
+                          description="Sort key, prefixed with - for descending order"),
+        fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    ) -> ListQuery:
+        selected = None
+        if fields:
+            requested = [name.strip() for name in fields.split(",") if name.strip()]
+            unknown = [name for name in requested if name not in field_names]
+            if unknown:
+                raise HTTPException(
+                    status_code=400, detail=f"Unknown field(s): {', '.join(unknown)}"
+                )
+            # Keep the read schema's order so projected bodies look like full ones
+            selected = [name for name in field_names if name in requested]
+        return ListQuery(limit, cursor, sort.lstrip("-"), sort.startswith("-"), selected)
+
+    return dependency
+
+
+def page_statement(model, query: ListQuery, apply_filters: Callable, columns=None):
+    """Filtered, sorted, page-limited select of `columns` (whole rows by default)"""
+    sort_column = None if query.sort_key == "id" else getattr(model, query.sort_key)
+    statement = select(*columns) if columns is not None else select(model)
+    return keyset_page(apply_filters(statement), model.id, query.limit, query.cursor,
+                       sort_column, query.descending)
+
+
+def fetch_page(session: Session, model, query: ListQuery, apply_filters: Callable,
+               if_none_match: Optional[str] = None):
+    """
+    Run a list query and return (rows, next_cursor, etag).
+    With a projection only the requested columns (plus the keys needed for the
+    cursor and ETag) are selected, so no ORM objects are hydrated.
+    When If-None-Match still matches, rows is None and nothing else is loaded.
+    """
+    sort_key = None if query.sort_key == "id" else query.sort_key
+    key_names = ["id", "updated_at"] + ([sort_key] if sort_key else [])
+    etag_extra = (query.fields,) if query.fields else ()
+
+    if if_none_match:
+        keys = page_statement(model, query, apply_filters,
+                              [getattr(model, name) for name in dict.fromkeys(key_names)])
+        etag = rows_etag(session.exec(keys).all(), *etag_extra)
+        if etag_matches(if_none_match, etag):
+            return None, None, etag
+
+    columns = None
+    if query.fields:
+        names = dict.fromkeys(query.fields + key_names)
+        columns = [getattr(model, name) for name in names]
+    rows = session.exec(page_statement(model, query, apply_filters, columns)).all()
+    etag = rows_etag(rows, *etag_extra)
+    page, next_cursor = split_page(rows, query.limit, sort_key)
+    if query.fields:
+        page = [{name: getattr(row, name) for name in query.fields} for row in page]
+    return page, next_cursor, etag
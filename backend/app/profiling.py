@@ -0,0 +1,203 @@
+"""Opt-in per-request SQL profiling: N+1 and slow query detection with Server-Timing"""
+import hmac
+import logging
+import os
+import random
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Requests sending this header with the token are profiled; without a token the header is ignored
+SQL_PROFILE_HEADER = "X-SQL-Profile"
+SQL_PROFILE_TOKEN = os.getenv("SQL_PROFILE_TOKEN", "")
+# Fraction of all requests profiled regardless of headers (0 disables sampling)
+SQL_PROFILE_SAMPLE_RATE = float(os.getenv("SQL_PROFILE_SAMPLE_RATE", "0"))
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "100"))
+# The same statement text this many times in one request is reported as N+1
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "3"))
+
+
+def _shape(parameters) -> Any:
+    """Parameter structure without values: names or positions mapped to type names"""
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+class QueryRecord:
+    __slots__ = ("statement", "parameters", "duration_ms", "rows", "plan")
+
+    def __init__(self, statement: str, parameters, duration_ms: float, rows: Optional[int]):
+        self.statement = statement
+        self.parameters = parameters
+        self.duration_ms = duration_ms
+        self.rows = rows
+        self.plan: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"statement": self.statement, "parameters": self.parameters,
+                "duration_ms": round(self.duration_ms, 3), "rows": self.rows, "plan": self.plan}
+
+
+class SqlProfile:
+    """Statements and serialization time of one profiled request"""
+
+    def __init__(self, slow_query_ms: float = SQL_SLOW_QUERY_MS,
+                 n_plus_one_threshold: int = SQL_N_PLUS_ONE_THRESHOLD):
+        self.slow_query_ms = slow_query_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.queries: List[QueryRecord] = []
+        self.serialize_ms = 0.0
+
+    @property
+    def db_ms(self) -> float:
+        return sum(query.duration_ms for query in self.queries)
+
+    def slow_queries(self) -> List[QueryRecord]:
+        return [query for query in self.queries if query.duration_ms >= self.slow_query_ms]
+
+    def n_plus_one(self) -> List[Dict[str, Any]]:
+        """Statements repeated at least n_plus_one_threshold times, most frequent first"""
+        counts = Counter(query.statement for query in self.queries)
+        return [
+            {"statement": statement, "count": count,
+             "duration_ms": round(sum(query.duration_ms for query in self.queries
+                                      if query.statement == statement), 3)}
+            for statement, count in counts.most_common()
+            if count >= self.n_plus_one_threshold
+        ]
+
+    def server_timing(self, total_ms: float) -> str:
+        return (f'db;dur={self.db_ms:.2f};desc="{len(self.queries)} queries", '
+                f"serialize;dur={self.serialize_ms:.2f}, total;dur={total_ms:.2f}")
+
+
+current_profile: ContextVar[Optional[SqlProfile]] = ContextVar("current_profile", default=None)
+
+
+def _explain(conn, statement: str, parameters) -> str:
+    """
+    Plan of `statement`, taken inside a savepoint: a failed EXPLAIN aborts the whole
+    transaction on PostgreSQL, and rolling back to the savepoint keeps it usable.
+    The statements issued here are not profiled themselves.
+    """
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    token = current_profile.set(None)
+    try:
+        with conn.begin_nested():
+            rows = conn.exec_driver_sql(prefix + statement, parameters).fetchall()
+    finally:
+        current_profile.reset(token)
+    return "\n".join(" | ".join(str(value) for value in row) for row in rows)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    if current_profile.get() is not None:
+        conn.info.setdefault("profile_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile.get()
+    starts = conn.info.get("profile_start_time")
+    if profile is None or not starts:
+        return
+    duration_ms = (time.perf_counter() - starts.pop()) * 1000
+    if executemany:
+        shape = {"rows": len(parameters), "each": _shape(parameters[0]) if parameters else None}
+    else:
+        shape = _shape(parameters)
+    rowcount = getattr(cursor, "rowcount", -1)
+    record = QueryRecord(statement, shape, duration_ms, rowcount if rowcount >= 0 else None)
+    profile.queries.append(record)
+    if duration_ms >= profile.slow_query_ms and not executemany:
+        try:
+            record.plan = _explain(conn, statement, parameters)
+        except Exception as error:  # the profiled request must never fail because of EXPLAIN
+            record.plan = f"EXPLAIN failed: {error.__class__.__name__}"
+
+
+def timed_serialization(fn):
+    """Count the wrapped renderer's time as serialization in the current profile"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        profile = current_profile.get()
+        if profile is None:
+            return fn(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.serialize_ms += (time.perf_counter() - start) * 1000
+    return wrapper
+
+
+def report(profile: SqlProfile, method: str, path: str, total_ms: float) -> None:
+    """Log the profile; N+1 patterns and slow queries as warnings"""
+    logger.info("SQL profile %s %s: %d queries, db %.2f ms, serialize %.2f ms, total %.2f ms",
+                method, path, len(profile.queries), profile.db_ms, profile.serialize_ms, total_ms)
+    for pattern in profile.n_plus_one():
+        logger.warning("Possible N+1 in %s %s: %d x %s (%.2f ms)",
+                       method, path, pattern["count"], pattern["statement"], pattern["duration_ms"])
+    for query in profile.slow_queries():
+        logger.warning("Slow query in %s %s: %.2f ms, %s rows, parameters %s\n%s\n%s",
+                       method, path, query.duration_ms, query.rows, query.parameters,
+                       query.statement, query.plan)
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware profiling requests that send X-SQL-Profile with the
+    configured token, plus a random SQL_PROFILE_SAMPLE_RATE share of the rest.
+    Profiled responses carry a Server-Timing header; others only pay for a
+    header lookup and a random draw.
+    """
+
+    def __init__(self, app, token: Optional[str] = None, sample_rate: Optional[float] = None):
+        self.app = app
+        self.token = token
+        self.sample_rate = sample_rate
+
+    def _wanted(self, scope) -> bool:
+        token = SQL_PROFILE_TOKEN if self.token is None else self.token
+        if token:
+            expected = token.encode("latin-1")
+            header = SQL_PROFILE_HEADER.lower().encode("latin-1")
+            for key, value in scope["headers"]:
+                if key == header and hmac.compare_digest(value, expected):
+                    return True
+        rate = SQL_PROFILE_SAMPLE_RATE if self.sample_rate is None else self.sample_rate
+        return rate > 0 and random.random() < rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = SqlProfile()
+        token = current_profile.set(profile)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - start) * 1000
+                timing = profile.server_timing(total_ms).encode("latin-1")
+                message = {**message, "headers": list(message.get("headers", []))
+                           + [(b"server-timing", timing)]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile.reset(token)
+            report(profile, scope["method"], scope["path"], (time.perf_counter() - start) * 1000)
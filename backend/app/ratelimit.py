@@ -0,0 +1,226 @@
+"""Per-client token-bucket rate limiting with in-process and Redis backends"""
+import logging
+import math
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from app.cache import REDIS_URL
+from app.metrics import HTTP_REJECTED
+from app.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# none | memory | redis. Off by default: behind a proxy without RATE_LIMIT_CLIENT_HEADER
+# every caller would share one bucket, and memory buckets multiply the limit by the workers
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "none")
+# Sustained requests per second per client, and how many can arrive at once
+RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", "50"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "100"))
+# Header identifying the client, e.g. X-Api-Key or X-Forwarded-For behind a trusted proxy;
+# empty keys clients by their socket address
+RATE_LIMIT_CLIENT_HEADER = os.getenv("RATE_LIMIT_CLIENT_HEADER", "")
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "100000"))
+
+# Probes, scrapes, admin calls and CORS preflights are never limited or shed
+EXEMPT_PATHS = ("/health", "/startup", "/readiness", "/metrics")
+EXEMPT_PREFIXES = ("/admin/",)
+
+
+def exempt(scope) -> bool:
+    path = scope["path"]
+    return (scope["method"] == "OPTIONS" or path in EXEMPT_PATHS
+            or path.startswith(EXEMPT_PREFIXES))
+
+
+async def reject(send, status: int, retry_after: float, detail: str) -> None:
+    """Answer straight from the middleware, without touching the app or the database"""
+    body = dumps({"detail": detail})
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode("latin-1")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class RateLimiter(ABC):
+    """
+    Base token bucket: each client holds up to `burst` tokens, refilled at `rate`
+    per second, and every request takes one. Subclasses implement the storage.
+    """
+
+    name = "base"
+
+    def __init__(self, rate: float = RATE_LIMIT_PER_SECOND, burst: float = RATE_LIMIT_BURST,
+                 clock: Callable[[], float] = time.time):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.allowed = 0
+        self.limited = 0
+
+    async def acquire(self, key: str) -> float:
+        """Take a token for `key`; returns 0 when allowed, else seconds until one is available"""
+        retry_after = await self._acquire(key)
+        if retry_after:
+            self.limited += 1
+        else:
+            self.allowed += 1
+        return retry_after
+
+    def stats(self) -> Dict[str, object]:
+        return {"backend": self.name, "rate": self.rate, "burst": self.burst,
+                "allowed": self.allowed, "limited": self.limited}
+
+    @abstractmethod
+    async def _acquire(self, key: str) -> float:
+        ...
+
+
+class NullRateLimiter(RateLimiter):
+    """Limiter that allows everything, for RATE_LIMIT_BACKEND=none"""
+
+    name = "none"
+
+    async def _acquire(self, key):
+        return 0.0
+
+
+class MemoryRateLimiter(RateLimiter):
+    """
+    Buckets kept in this process, so each worker enforces the limit on its own.
+    The least recently seen clients are forgotten past max_clients; a forgotten
+    client starts again with a full bucket.
+    """
+
+    name = "memory"
+
+    def __init__(self, *args, max_clients: int = RATE_LIMIT_MAX_CLIENTS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def _acquire(self, key):
+        now = self.clock()
+        tokens, updated = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + max(0.0, now - updated) * self.rate)
+        if tokens >= 1:
+            tokens -= 1
+            retry_after = 0.0
+        else:
+            retry_after = (1 - tokens) / self.rate
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    def stats(self):
+        return {**super().stats(), "clients": len(self._buckets)}
+
+
+# Refill and take a token in one round trip; atomic because Redis runs scripts serially
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(retry_after)
+"""
+
+
+class RedisRateLimiter(RateLimiter):
+    """
+    Buckets shared by every worker and host through a Redis-compatible server.
+    Time comes from the caller's clock, so hosts need synchronised clocks.
+    When the server cannot be reached requests are let through: an outage of
+    the limiter must not become an outage of the API.
+    """
+
+    name = "redis"
+
+    def __init__(self, client, *args, prefix: str = "ratelimit:", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.client = client
+        self.prefix = prefix
+        self.errors = 0
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def _acquire(self, key):
+        try:
+            result = await self._script(keys=[self.prefix + key],
+                                        args=[self.rate, self.burst, self.clock()])
+        except Exception as error:  # fail open, see the class docstring
+            self.errors += 1
+            logger.warning("Rate limiter unavailable, allowing request: %s", error)
+            return 0.0
+        return float(result)
+
+    def stats(self):
+        return {**super().stats(), "errors": self.errors}
+
+
+def build_rate_limiter(backend: str = RATE_LIMIT_BACKEND) -> RateLimiter:
+    """Create the limiter selected by RATE_LIMIT_BACKEND"""
+    if backend == "memory":
+        return MemoryRateLimiter()
+    if backend == "redis":
+        import redis.asyncio as redis  # optional dependency
+        return RedisRateLimiter(redis.Redis.from_url(REDIS_URL))
+    return NullRateLimiter()
+
+
+rate_limiter = build_rate_limiter()
+
+
+def get_rate_limiter() -> RateLimiter:
+    return rate_limiter
+
+
+def client_key(scope, header: Optional[str] = None) -> str:
+    """Identify the caller by the configured header, falling back to the peer address"""
+    header = RATE_LIMIT_CLIENT_HEADER if header is None else header
+    if header:
+        name = header.lower().encode("latin-1")
+        for key, value in scope["headers"]:
+            if key == name and value:
+                # X-Forwarded-For lists the original client first
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware answering 429 with Retry-After once a client's bucket is empty"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or exempt(scope):
+            await self.app(scope, receive, send)
+            return
+        retry_after = await get_rate_limiter().acquire(client_key(scope))
+        if retry_after:
+            HTTP_REJECTED.inc("rate_limited")
+            await reject(send, 429, retry_after, "Too many requests")
+            return
+        await self.app(scope, receive, send)
@@ -0,0 +1,112 @@
+"""Readiness and startup state for the health probes"""
+import asyncio
+import math
+import os
+import time
+from typing import Callable, Optional, Tuple
+
+import anyio
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+
+from app.database import engine
+
+READINESS_CACHE_SECONDS = float(os.getenv("READINESS_CACHE_SECONDS", "5"))
+READINESS_TIMEOUT_SECONDS = float(os.getenv("READINESS_TIMEOUT_SECONDS", "2"))
+
+
+def probe_connect_args(url, timeout: float) -> dict:
+    """Driver options bounding how long connecting and `SELECT 1` can block"""
+    backend = make_url(url).get_backend_name()
+    if backend == "postgresql":
+        # libpq's connect_timeout is whole seconds and treats values below 2 as 2
+        return {"connect_timeout": max(2, math.ceil(timeout)),
+                "options": f"-c statement_timeout={int(timeout * 1000)}"}
+    if backend == "sqlite":
+        return {"timeout": timeout}
+    return {}
+
+
+class EnginePing:
+    """
+    SELECT 1 against the database of `engine`, on a fresh connection with the
+    same URL rather than one from its pool: the probe never queues behind
+    request traffic for pool_timeout, and the driver timeouts end a hung check.
+    """
+
+    def __init__(self, engine, timeout: float = READINESS_TIMEOUT_SECONDS):
+        self.engine = engine
+        self.timeout = timeout
+        self._unpooled = None
+
+    def __call__(self) -> None:
+        if self._unpooled is None:
+            url = self.engine.url
+            self._unpooled = create_engine(url, poolclass=NullPool,
+                                           connect_args=probe_connect_args(url, self.timeout))
+        with self._unpooled.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+
+class ReadinessProbe:
+    """
+    Database connectivity check whose result is reused for `ttl` seconds.
+    Concurrent probes share one in-flight check, so heavy polling opens
+    at most one connection per interval, outside the request pool.
+    """
+
+    def __init__(self, ttl: float = READINESS_CACHE_SECONDS,
+                 timeout: float = READINESS_TIMEOUT_SECONDS,
+                 ping: Optional[Callable[[], None]] = None):
+        self.ttl = ttl
+        self.timeout = timeout
+        self.ping = ping or EnginePing(engine, timeout)
+        self._result: Optional[Tuple[bool, str]] = None
+        self._checked_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _fresh(self) -> bool:
+        return self._result is not None and time.monotonic() - self._checked_at < self.ttl
+
+    async def check(self) -> Tuple[bool, str]:
+        if self._fresh():
+            return self._result
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._fresh():
+                self._result = await self._run()
+                self._checked_at = time.monotonic()
+        return self._result
+
+    async def _run(self) -> Tuple[bool, str]:
+        try:
+            with anyio.fail_after(self.timeout):
+                # A blocked thread cannot be interrupted: stop waiting for it instead,
+                # and let the driver timeouts end it
+                await anyio.to_thread.run_sync(self.ping, cancellable=True)
+        except TimeoutError:
+            return False, "Database check timed out"
+        except Exception as exc:
+            return False, f"Database unavailable: {exc.__class__.__name__}"
+        return True, "API is ready to receive requests"
+
+
+class StartupState:
+    """Tracks whether application startup has completed"""
+
+    def __init__(self):
+        self.started = False
+
+    def mark_started(self) -> None:
+        self.started = True
+
+
+readiness_probe = ReadinessProbe()
+startup_state = StartupState()
+
+
+def get_readiness_probe() -> ReadinessProbe:
+    """Get readiness probe dependency for FastAPI"""
+    return readiness_probe
@@ -0,0 +1,261 @@
+"""Read-replica routing with read-your-writes stickiness and lag-based ejection"""
+import asyncio
+import itertools
+import os
+import threading
+from contextvars import ContextVar
+from typing import List, Optional, Sequence
+
+from fastapi import Depends
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy.sql import Select
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.database import (
+    DB_ASYNC, AnySession, engine_options, get_session, ping_idle_connections, to_async_url,
+)
+from app.metrics import REGISTRY, Gauge, TimedAsyncQueuePool, watch_pool
+
+# Comma-separated replica URLs; empty sends every query to the primary
+REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+                if url.strip()]
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", "5"))
+# After a write, the client's reads go to the primary for this long
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+
+STICKY_COOKIE = "db-primary"
+
+DB_REPLICA_HEALTHY = REGISTRY.register(Gauge(
+    "db_replica_healthy", "1 when the replica is receiving reads", ("replica",)))
+DB_REPLICA_LAG = REGISTRY.register(Gauge(
+    "db_replica_lag_seconds", "Replication lag measured by the last health check", ("replica",)))
+
+# Caught up replicas report zero; otherwise the age of the last replayed transaction
+POSTGRES_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+def measure_lag(engine) -> float:
+    """Replication lag in seconds; stand-ins without replication only prove liveness"""
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            return float(conn.execute(POSTGRES_LAG_SQL).scalar() or 0)
+        conn.execute(text("SELECT 1"))
+        return 0.0
+
+
+class Replica:
+    """One read replica with its engines and last health check result"""
+
+    def __init__(self, name: str, engine, async_engine=None):
+        self.name = name
+        self.engine = engine
+        self.async_engine = async_engine
+        self.healthy = True
+        self.lag = 0.0
+        self.error: Optional[str] = None
+
+
+class ReplicaSet:
+    """
+    Round-robin chooser over the replicas that passed their last health check.
+    A replica is ejected while it is unreachable or lags more than `max_lag`
+    seconds, and rejoins on the first check it passes.
+    """
+
+    def __init__(self, replicas: Sequence[Replica] = (),
+                 max_lag: float = REPLICA_MAX_LAG_SECONDS, lag_probe=measure_lag):
+        self.replicas = list(replicas)
+        self.max_lag = max_lag
+        self.lag_probe = lag_probe
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def healthy(self) -> List[Replica]:
+        return [replica for replica in self.replicas if replica.healthy]
+
+    def choose(self) -> Optional[Replica]:
+        """Next healthy replica, or None to read from the primary"""
+        candidates = self.healthy()
+        if not candidates:
+            return None
+        with self._lock:
+            index = next(self._counter)
+        return candidates[index % len(candidates)]
+
+    def refresh(self) -> None:
+        """Re-check every replica; blocking, so call it from a worker thread"""
+        for replica in self.replicas:
+            try:
+                replica.lag = self.lag_probe(replica.engine)
+                replica.error = None if replica.lag <= self.max_lag else "lagging"
+            except Exception as exc:
+                replica.error = exc.__class__.__name__
+            replica.healthy = replica.error is None
+            DB_REPLICA_HEALTHY.set(int(replica.healthy), replica.name)
+            DB_REPLICA_LAG.set(replica.lag, replica.name)
+
+
+def build_replica_set(urls: Sequence[str] = REPLICA_URLS) -> ReplicaSet:
+    replicas = []
+    for index, url in enumerate(urls):
+        name = f"replica-{index}"
+        engine = create_engine(url, **engine_options(url))
+        watch_pool(engine, name)
+        ping_idle_connections(engine)
+        async_engine = None
+        if DB_ASYNC:
+            async_url = to_async_url(url)
+            async_engine = create_async_engine(
+                async_url, **engine_options(async_url, TimedAsyncQueuePool)
+            )
+            watch_pool(async_engine, f"{name}-async")
+            ping_idle_connections(async_engine)
+        replicas.append(Replica(name, engine, async_engine))
+    return ReplicaSet(replicas)
+
+
+replica_set = build_replica_set()
+
+
+def get_replica_set() -> ReplicaSet:
+    """Get replica set dependency for FastAPI"""
+    return replica_set
+
+
+async def monitor_replicas(replicas: ReplicaSet, interval: float = REPLICA_CHECK_INTERVAL):
+    """Background task refreshing replica health until cancelled"""
+    while True:
+        await run_in_threadpool(replicas.refresh)
+        await asyncio.sleep(interval)
+
+
+class RoutingSession(Session):
+    """
+    Session sending SELECTs to `replica_bind` and everything else, including
+    flushes, to its primary bind, so a read handler that writes stays correct.
+    """
+
+    def __init__(self, *args, replica_bind=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica_bind = replica_bind
+
+    def get_bind(self, mapper=None, *, clause=None, **kwargs):
+        if self.replica_bind is not None and not self._flushing and isinstance(clause, Select):
+            return self.replica_bind
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+class RequestRouting:
+    """Per-request routing state shared with worker threads and greenlets"""
+
+    __slots__ = ("sticky", "wrote")
+
+    def __init__(self, sticky: bool):
+        self.sticky = sticky
+        self.wrote = False
+
+
+current_routing: ContextVar[Optional[RequestRouting]] = ContextVar(
+    "current_routing", default=None
+)
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _remember_write(session):
+    routing = current_routing.get()
+    if routing is not None:
+        routing.wrote = True
+
+
+def _has_sticky_cookie(headers) -> bool:
+    for key, value in headers:
+        if key == b"cookie":
+            for part in value.decode("latin-1").split(";"):
+                name, _, _ = part.strip().partition("=")
+                if name == STICKY_COOKIE:
+                    return True
+    return False
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Pure ASGI middleware giving clients read-your-writes consistency.
+    A request that commits gets a short-lived cookie, and while it is present
+    the client's reads skip the replicas.
+    """
+
+    def __init__(self, app, sticky_seconds: int = REPLICA_STICKY_SECONDS):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        routing = RequestRouting(_has_sticky_cookie(scope["headers"]))
+        token = current_routing.set(routing)
+
+        async def send_wrapper(message):
+            if (message["type"] == "http.response.start" and routing.wrote
+                    and self.sticky_seconds > 0 and get_replica_set().enabled):
+                cookie = (f"{STICKY_COOKIE}=1; Max-Age={self.sticky_seconds}; Path=/; "
+                          "HttpOnly; SameSite=Lax")
+                message = {**message, "headers": list(message.get("headers", []))
+                           + [(b"set-cookie", cookie.encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_routing.reset(token)
+
+
+def reads_replica(session: AnySession) -> bool:
+    """
+    Whether `session` reads from a replica. Such reads may be stale, so they
+    must not fill shared caches that clients reading their own writes rely on.
+    """
+    if isinstance(session, AsyncSession):
+        session = session.sync_session
+    return isinstance(session, RoutingSession) and session.replica_bind is not None
+
+
+def _sticky() -> bool:
+    routing = current_routing.get()
+    return routing is not None and (routing.sticky or routing.wrote)
+
+
+async def get_read_session(
+    primary: AnySession = Depends(get_session),
+    replicas: ReplicaSet = Depends(get_replica_set),
+):
+    """
+    Session dependency for read-only handlers.
+    Reads go to the next healthy replica unless the client wrote recently;
+    without replicas this is the primary session itself.
+    """
+    replica = None if _sticky() else replicas.choose()
+    if replica is None or (isinstance(primary, AsyncSession) and replica.async_engine is None):
+        yield primary
+    elif isinstance(primary, AsyncSession):
+        async with AsyncSession(bind=primary.bind, sync_session_class=RoutingSession,
+                                replica_bind=replica.async_engine.sync_engine,
+                                autoflush=False, expire_on_commit=False) as session:
+            yield session
+    else:
+        with RoutingSession(bind=primary.bind, replica_bind=replica.engine,
+                            autoflush=False) as session:
+            yield session
@@ -0,0 +1,117 @@
+"""In-process sampling CPU profiler producing collapsed stacks per route"""
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+MAX_STACK_DEPTH = 128
+
+# ASGI scope of the request being served, set only while a capture runs
+current_scope: ContextVar[Optional[dict]] = ContextVar("current_scope", default=None)
+
+
+def _frame_label(frame) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}"
+
+
+def _route_label(scope: dict) -> str:
+    route = scope.get("route")
+    return f"{scope.get('method', '')} {getattr(route, 'path', None) or scope.get('path', '')}"
+
+
+class SamplingProfiler:
+    """
+    Samples every thread's stack with sys._current_frames() at a fixed interval.
+    A sample is attributed to a request through the ProfilerMiddleware frame on
+    the event loop's stack, or, for threadpool work, through the scope that
+    run_db registered for the thread. Samples of idle threads are dropped.
+    """
+
+    def __init__(self):
+        self.active = False
+        self._lock = threading.Lock()
+        self._thread_scopes: Dict[int, dict] = {}
+
+    def bind(self, fn):
+        """Wrap threadpool work so its samples are attributed to the current request"""
+        scope = current_scope.get()
+        if scope is None:
+            return fn
+
+        def bound(*args, **kwargs):
+            ident = threading.get_ident()
+            self._thread_scopes[ident] = scope
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._thread_scopes.pop(ident, None)
+        return bound
+
+    def _walk(self, frame) -> Tuple[List[str], Optional[dict]]:
+        """Frame labels from root to leaf, cut at the request's middleware frame if any"""
+        labels = []
+        while frame is not None and len(labels) < MAX_STACK_DEPTH:
+            if frame.f_code is _MIDDLEWARE_CODE:
+                scope = frame.f_locals.get("scope")
+                if isinstance(scope, dict):
+                    return labels[::-1], scope
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+        return labels[::-1], None
+
+    def capture(self, seconds: float, interval: float) -> Counter:
+        """Block for `seconds`, sampling every `interval`; returns collapsed stack counts"""
+        with self._lock:
+            if self.active:
+                raise RuntimeError("A capture is already running")
+            self.active = True
+        stacks: Counter = Counter()
+        me = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        try:
+            while time.monotonic() < deadline:
+                for ident, frame in sys._current_frames().items():
+                    if ident == me:
+                        continue
+                    labels, scope = self._walk(frame)
+                    scope = scope or self._thread_scopes.get(ident)
+                    if scope is not None:
+                        stacks[";".join([_route_label(scope)] + labels)] += 1
+                time.sleep(interval)
+        finally:
+            self.active = False
+            self._thread_scopes.clear()
+        return stacks
+
+
+def collapsed(stacks: Counter) -> str:
+    """Brendan Gregg's collapsed format, read by flamegraph.pl, inferno and speedscope"""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+profiler = SamplingProfiler()
+
+
+class ProfilerMiddleware:
+    """
+    Pure ASGI middleware marking requests for the sampler while a capture runs.
+    When the profiler is idle it costs one attribute check per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not profiler.active or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_scope.reset(token)
+
+
+_MIDDLEWARE_CODE = ProfilerMiddleware.__call__.__code__
@@ -0,0 +1,155 @@
+"""Product full-text search: PostgreSQL tsvector/GIN, with an in-memory index fallback"""
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, or_
+from sqlmodel import Session, select
+
+from app.database import DATABASE_URL
+from app.models.models import PRODUCT_SEARCH_VECTOR, SEARCH_CONFIG, Product
+from app.pagination import decode_cursor, encode_cursor
+
+SearchPage = Tuple[List[Tuple[Product, float]], Optional[str]]
+
+# ts_rank_cd's default weights for labels A and B, mirrored by the memory index
+NAME_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(value: str) -> List[str]:
+    return _TOKEN.findall(value.lower())
+
+
+def _decode_rank_cursor(cursor: Optional[str]) -> Optional[Tuple[float, int]]:
+    if not cursor:
+        return None
+    values = decode_cursor(cursor)
+    last_id, rank = values.get("id"), values.get("v")
+    if values.get("s") != "rank" or not isinstance(last_id, int) \
+            or not isinstance(rank, (int, float)) or isinstance(last_id, bool) \
+            or isinstance(rank, bool):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return float(rank), last_id
+
+
+def _next_cursor(hits: List[Tuple[Product, float]], limit: int) -> SearchPage:
+    """Trim the look-ahead hit and encode the (rank, id) of the last one kept"""
+    if len(hits) <= limit:
+        return hits, None
+    hits = hits[:limit]
+    product, rank = hits[-1]
+    return hits, encode_cursor({"id": product.id, "s": "rank", "v": rank})
+
+
+class SearchIndex(ABC):
+    """Ranks products matching every term of `q`, best first, then by id"""
+
+    name = "base"
+
+    @abstractmethod
+    def search(self, session: Session, q: str, limit: int,
+               cursor: Optional[str] = None) -> SearchPage:
+        ...
+
+
+class PostgresSearchIndex(SearchIndex):
+    """
+    websearch_to_tsquery matched against the GIN-indexed weighted tsvector.
+    Pages seek on (rank DESC, id ASC) so deep pages never use OFFSET.
+    """
+
+    name = "postgresql"
+
+    def search(self, session, q, limit, cursor=None):
+        query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+        rank = func.ts_rank_cd(PRODUCT_SEARCH_VECTOR, query)
+        statement = select(Product, rank.label("rank")).where(
+            PRODUCT_SEARCH_VECTOR.op("@@")(query)
+        )
+        after = _decode_rank_cursor(cursor)
+        if after:
+            last_rank, last_id = after
+            statement = statement.where(
+                or_(rank < last_rank, and_(rank == last_rank, Product.id > last_id))
+            )
+        statement = statement.order_by(rank.desc(), Product.id).limit(limit + 1)
+        return _next_cursor([(product, float(score)) for product, score
+                             in session.exec(statement).all()], limit)
+
+
+class MemorySearchIndex(SearchIndex):
+    """
+    Inverted index kept in process, for SQLite and tests.
+    It is rebuilt whenever the products table's row count or latest
+    updated_at changes, so writes need no hooks. Terms are not stemmed.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._postings: Dict[str, Dict[int, float]] = {}
+
+    def _refresh(self, session: Session) -> None:
+        stamp = tuple(session.exec(
+            select(func.count(Product.id), func.max(Product.updated_at))
+        ).one())
+        if stamp == self._stamp:
+            return
+        postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        rows = session.exec(select(Product.id, Product.name, Product.description))
+        for product_id, name, description in rows:
+            for weight, value in ((NAME_WEIGHT, name), (DESCRIPTION_WEIGHT, description)):
+                for term in tokenize(value):
+                    entry = postings[term]
+                    entry[product_id] = entry.get(product_id, 0.0) + weight
+        self._postings, self._stamp = dict(postings), stamp
+
+    def _ranked(self, terms: List[str]) -> List[Tuple[int, float]]:
+        matches = [self._postings.get(term, {}) for term in dict.fromkeys(terms)]
+        if not matches or not all(matches):
+            return []
+        ids = set.intersection(*(set(match) for match in matches))
+        scores = {product_id: sum(match[product_id] for match in matches) for product_id in ids}
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+    def search(self, session, q, limit, cursor=None):
+        after = _decode_rank_cursor(cursor)
+        with self._lock:
+            self._refresh(session)
+            ranked = self._ranked(tokenize(q))
+        if after:
+            last_rank, last_id = after
+            ranked = [(product_id, score) for product_id, score in ranked
+                      if score < last_rank or (score == last_rank and product_id > last_id)]
+        ranked = ranked[:limit + 1]
+        if not ranked:
+            return [], None
+        products = {product.id: product for product in session.exec(
+            select(Product).where(Product.id.in_([product_id for product_id, _ in ranked]))
+        )}
+        hits = [(products[product_id], score) for product_id, score in ranked
+                if product_id in products]
+        return _next_cursor(hits, limit)
+
+
+def build_search_index(url: str = DATABASE_URL) -> SearchIndex:
+    """PostgreSQL full-text search when available, the memory index otherwise"""
+    if url.startswith("postgresql"):
+        return PostgresSearchIndex()
+    return MemorySearchIndex()
+
+
+search_index = build_search_index()
+
+
+def get_search_index() -> SearchIndex:
+    """Get product search index dependency for FastAPI"""
+    return search_index
@@ -0,0 +1,98 @@
+"""JSON serialization helpers: orjson rendering that matches FastAPI's stdlib output"""
+import json
+import math
+from functools import lru_cache
+from typing import Any, Iterable, Tuple
+
+import orjson
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.profiling import timed_serialization
+
+JSON_MEDIA_TYPE = "application/json"
+
+# orjson and json agree on float text only inside this range (json switches to
+# exponent notation outside it, with a different exponent format than orjson)
+_PLAIN_FLOAT_MIN = 1e-4
+_PLAIN_FLOAT_MAX = 1e16
+
+
+def _plain_float(value: float) -> bool:
+    return value == 0 or (math.isfinite(value) and _PLAIN_FLOAT_MIN <= abs(value) < _PLAIN_FLOAT_MAX)
+
+
+def _orjson_safe(value: Any) -> bool:
+    """Whether orjson renders `value` exactly like json.dumps would"""
+    if isinstance(value, float):
+        return _plain_float(value)
+    if isinstance(value, dict):
+        return all(isinstance(key, str) and _orjson_safe(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return all(_orjson_safe(item) for item in value)
+    return True
+
+
+def _stdlib_dumps(content: Any) -> bytes:
+    # Exactly what fastapi.responses.JSONResponse.render produces
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+@timed_serialization
+def dumps(content: Any) -> bytes:
+    """Render JSON-compatible content with orjson, byte-identical to the stdlib encoder"""
+    if _orjson_safe(content):
+        try:
+            return orjson.dumps(content)
+        except (orjson.JSONEncodeError, TypeError):
+            pass  # e.g. lone surrogates or integers beyond 64 bits
+    return _stdlib_dumps(jsonable_encoder(content))
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class rendering with orjson instead of json.dumps"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+@lru_cache(maxsize=None)
+def _schema_layout(schema) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    fields = schema.model_fields
+    return tuple(fields), tuple(name for name, field in fields.items() if field.annotation is float)
+
+
+def row_dict(schema, obj) -> dict:
+    """Read the schema's fields straight off an ORM row, in schema order"""
+    names, _ = _schema_layout(schema)
+    return {name: getattr(obj, name) for name in names}
+
+
+@timed_serialization
+def dump_rows(schema, rows: Iterable[Any]) -> bytes:
+    """
+    Render ORM rows as a JSON array shaped like List[schema] without validating them.
+    Rows loaded from the table already satisfy the read schema, so the
+    response_model round trip only repeats work.
+    """
+    names, float_names = _schema_layout(schema)
+    content = [{name: getattr(row, name) for name in names} for row in rows]
+    if all(_plain_float(item[name]) for item in content for name in float_names):
+        try:
+            return orjson.dumps(content)
+        except (orjson.JSONEncodeError, TypeError):
+            pass
+    return _stdlib_dumps(jsonable_encoder(content))
+
+
+def dump_model(schema, obj) -> bytes:
+    """Render one ORM row as JSON shaped like `schema`"""
+    return dump_rows(schema, [obj])[1:-1]
+
+
+def json_response(body: bytes, status_code: int = 200, headers=None) -> Response:
+    """Wrap pre-rendered JSON bytes in a response"""
+    return Response(body, status_code=status_code, media_type=JSON_MEDIA_TYPE, headers=headers)
@@ -0,0 +1,204 @@
+"""
+Production launcher: gunicorn managing uvicorn workers on uvloop and httptools
+
+    python -m app.server
+
+Runs WEB_CONCURRENCY workers (default: one per usable CPU). Each worker is recycled
+after about WORKER_MAX_REQUESTS requests, and SIGHUP restarts all of them
+gracefully. The database pool of every worker is shrunk so that all workers
+together stay within DB_CONNECTION_BUDGET connections. With more than one
+worker the in-process response cache is replaced by a shared one, or none,
+and per-process rate limit buckets are refused.
+
+This module must not import app.database: the pool settings are handed to the
+workers through the environment and read when each worker imports the app.
+"""
+import logging
+import math
+import os
+from typing import Dict, Optional, Tuple
+
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker
+
+logger = logging.getLogger(__name__)
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+# Recycle workers to cap slow leaks; the jitter keeps them from restarting together
+WORKER_MAX_REQUESTS = int(os.getenv("WORKER_MAX_REQUESTS", "10000"))
+WORKER_MAX_REQUESTS_JITTER = int(os.getenv("WORKER_MAX_REQUESTS_JITTER", "1000"))
+# Seconds a stopping worker gets to finish in-flight requests
+WORKER_GRACEFUL_TIMEOUT = int(os.getenv("WORKER_GRACEFUL_TIMEOUT", "30"))
+WORKER_TIMEOUT = int(os.getenv("WORKER_TIMEOUT", "60"))
+WORKER_KEEPALIVE = int(os.getenv("WORKER_KEEPALIVE", "5"))
+# Connections the app may hold on one database server: PostgreSQL's default
+# max_connections of 100, minus headroom for superusers, migrations and psql
+DB_CONNECTION_BUDGET = int(os.getenv("DB_CONNECTION_BUDGET", "90"))
+# Connections each worker opens outside its pools: the readiness probe's
+PROBE_CONNECTIONS_PER_WORKER = 1
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+
+class ProductionWorker(UvicornWorker):
+    """Uvicorn worker pinned to uvloop and httptools instead of the auto fallbacks"""
+
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "lifespan": "on"}
+
+
+def _read(path: str) -> str:
+    with open(path) as file:
+        return file.read().strip()
+
+
+def cgroup_cpu_quota(root: str = CGROUP_ROOT) -> Optional[float]:
+    """CPUs granted by a cgroup v2 (cpu.max) or v1 (cfs quota) limit; None when unlimited"""
+    try:
+        quota, period = _read(os.path.join(root, "cpu.max")).split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        quota = int(_read(os.path.join(root, "cpu", "cpu.cfs_quota_us")))
+        period = int(_read(os.path.join(root, "cpu", "cpu.cfs_period_us")))
+    except (OSError, ValueError):
+        return None
+    return quota / period if quota > 0 else None
+
+
+def available_cpus(cgroup_root: str = CGROUP_ROOT) -> int:
+    """
+    CPUs this process can actually use: its affinity mask, capped by a container's
+    CPU quota. os.cpu_count() reports every CPU of the host and ignores both.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        cpus = os.cpu_count() or 1
+    quota = cgroup_cpu_quota(cgroup_root)
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return cpus
+
+
+def default_workers() -> int:
+    """WEB_CONCURRENCY when set, otherwise one worker per usable CPU"""
+    return int(os.getenv("WEB_CONCURRENCY", "0")) or available_cpus()
+
+
+def pool_sizing(workers: int, budget: int, pool_size: int, max_overflow: int,
+                engines_per_worker: int = 1,
+                reserved_per_worker: int = PROBE_CONNECTIONS_PER_WORKER) -> Tuple[int, int]:
+    """
+    Per-engine (pool_size, max_overflow) such that
+    workers * (engines_per_worker * (pool_size + max_overflow) + reserved_per_worker)
+    <= budget, where reserved_per_worker counts connections opened outside the pools.
+    Settings already within the share are kept; otherwise overflow is cut first.
+    """
+    share = (budget // workers - reserved_per_worker) // engines_per_worker
+    if share < 1:
+        raise ValueError(f"DB_CONNECTION_BUDGET={budget} cannot give {workers} workers "
+                         f"x {engines_per_worker} engines a connection each, plus "
+                         f"{reserved_per_worker} for the readiness probe")
+    if pool_size + max_overflow <= share:
+        return pool_size, max_overflow
+    pool_size = max(1, min(pool_size, share))
+    return pool_size, share - pool_size
+
+
+def cache_backend(workers: int, environ: Dict[str, str]) -> str:
+    """
+    CACHE_BACKEND for the workers. A memory cache is only invalidated in the
+    worker that handled the write, so several workers would serve stale bodies
+    and ETags: unless configured, they share Redis when REDIS_URL is set and
+    cache nothing otherwise. An explicit memory cache is refused.
+    """
+    backend = environ.get("CACHE_BACKEND")
+    if workers == 1:
+        return backend or "memory"
+    if backend == "memory":
+        raise ValueError(f"CACHE_BACKEND=memory cannot be invalidated across {workers} "
+                         "workers; use redis, none or WEB_CONCURRENCY=1")
+    return backend or ("redis" if environ.get("REDIS_URL") else "none")
+
+
+def rate_limit_backend(workers: int, environ: Dict[str, str]) -> str:
+    """
+    RATE_LIMIT_BACKEND for the workers. Memory buckets are kept per process, so
+    every client would get the configured rate once per worker: refused when
+    there is more than one.
+    """
+    backend = environ.get("RATE_LIMIT_BACKEND") or "none"
+    if workers > 1 and backend == "memory":
+        raise ValueError(f"RATE_LIMIT_BACKEND=memory would allow {workers} times the rate; "
+                         "use redis, none or WEB_CONCURRENCY=1")
+    return backend
+
+
+def worker_environment(workers: int, budget: int = DB_CONNECTION_BUDGET,
+                       environ: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Pool, cache and rate limit settings for the workers, as environment variables"""
+    environ = os.environ if environ is None else environ
+    # Async mode keeps the sync engine too, so each worker owns two pools
+    engines = 2 if environ.get("DB_ASYNC", "False") == "True" else 1
+    pool_size, max_overflow = pool_sizing(
+        workers, budget,
+        int(environ.get("DB_POOL_SIZE", "5")), int(environ.get("DB_MAX_OVERFLOW", "10")),
+        engines,
+    )
+    return {"DB_POOL_SIZE": str(pool_size), "DB_MAX_OVERFLOW": str(max_overflow),
+            "CACHE_BACKEND": cache_backend(workers, environ),
+            "RATE_LIMIT_BACKEND": rate_limit_backend(workers, environ)}
+
+
+def gunicorn_options(workers: int) -> dict:
+    return {
+        "bind": f"{HOST}:{PORT}",
+        "workers": workers,
+        "worker_class": ProductionWorker,
+        "max_requests": WORKER_MAX_REQUESTS,
+        "max_requests_jitter": WORKER_MAX_REQUESTS_JITTER,
+        "graceful_timeout": WORKER_GRACEFUL_TIMEOUT,
+        "timeout": WORKER_TIMEOUT,
+        "keepalive": WORKER_KEEPALIVE,
+        "accesslog": None,
+        "errorlog": "-",
+    }
+
+
+class Server(BaseApplication):
+    """Gunicorn application loading `main:app` inside each worker"""
+
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from main import app
+        return app
+
+
+def main():
+    # Same format as gunicorn's error log, which follows on the same stream
+    logging.basicConfig(level=logging.INFO,
+                        format="[%(asctime)s] [%(process)d] [%(levelname)s] %(message)s",
+                        datefmt="%Y-%m-%d %H:%M:%S %z")
+    workers = default_workers()
+    try:
+        settings = worker_environment(workers)
+    except ValueError as error:
+        raise SystemExit(str(error))
+    os.environ.update(settings)
+    logger.info("Starting %d workers, database pool %s+%s per engine, budget %d, "
+                "response cache %s, rate limit %s", workers, settings["DB_POOL_SIZE"],
+                settings["DB_MAX_OVERFLOW"], DB_CONNECTION_BUDGET,
+                settings["CACHE_BACKEND"], settings["RATE_LIMIT_BACKEND"])
+    Server(gunicorn_options(workers)).run()
+
+
+if __name__ == "__main__":
+    main()
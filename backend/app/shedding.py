@@ -0,0 +1,86 @@
+"""Adaptive load shedding: fast 503s while the process is saturated"""
+import os
+import random
+from typing import Optional
+
+from app.metrics import HTTP_REJECTED, POOL_PRESSURE, PoolPressure
+from app.ratelimit import exempt, reject
+
+# Requests served concurrently by this process before new ones are refused (0 disables)
+SHED_MAX_IN_FLIGHT = int(os.getenv("SHED_MAX_IN_FLIGHT", "200"))
+# Recent average wait for a pooled connection at which shedding starts (0 disables);
+# the refused share grows linearly to its cap at twice this value
+SHED_POOL_WAIT_MS = float(os.getenv("SHED_POOL_WAIT_MS", "100"))
+# Callers queued on the pool at once before new requests are refused (0 disables)
+SHED_MAX_POOL_WAITERS = int(os.getenv("SHED_MAX_POOL_WAITERS", "30"))
+SHED_RETRY_AFTER_SECONDS = float(os.getenv("SHED_RETRY_AFTER_SECONDS", "1"))
+# Always let some requests through so the wait average keeps being refreshed
+SHED_MAX_PROBABILITY = 0.95
+
+# Long-lived streams would otherwise hold in-flight slots for their whole lifetime
+STREAM_SUFFIX = "/stream"
+
+
+class LoadShedder:
+    """
+    Decides whether to admit a request from the number already in flight and
+    the connection pool's recent checkout wait and queue length.
+    """
+
+    def __init__(self, max_in_flight: int = SHED_MAX_IN_FLIGHT,
+                 pool_wait_ms: float = SHED_POOL_WAIT_MS,
+                 max_pool_waiters: int = SHED_MAX_POOL_WAITERS,
+                 pressure: PoolPressure = POOL_PRESSURE,
+                 chance=random.random):
+        self.max_in_flight = max_in_flight
+        self.pool_wait_ms = pool_wait_ms
+        self.max_pool_waiters = max_pool_waiters
+        self.pressure = pressure
+        self.chance = chance
+        self.in_flight = 0
+
+    def reason(self) -> Optional[str]:
+        """Why the next request should be refused, or None to admit it"""
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            return "in_flight"
+        if self.max_pool_waiters and self.pressure.waiting >= self.max_pool_waiters:
+            return "pool_waiters"
+        if self.pool_wait_ms:
+            excess = self.pressure.wait_seconds() * 1000 / self.pool_wait_ms - 1
+            if excess > 0 and self.chance() < min(excess, SHED_MAX_PROBABILITY):
+                return "pool_wait"
+        return None
+
+
+load_shedder = LoadShedder()
+
+
+def get_load_shedder() -> LoadShedder:
+    return load_shedder
+
+
+class LoadSheddingMiddleware:
+    """
+    Pure ASGI middleware refusing requests with 503 and Retry-After while the
+    process is overloaded, so excess load is turned away in microseconds
+    instead of queueing for the pool until every request times out.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or exempt(scope) or scope["path"].endswith(STREAM_SUFFIX):
+            await self.app(scope, receive, send)
+            return
+        shedder = get_load_shedder()
+        reason = shedder.reason()
+        if reason is not None:
+            HTTP_REJECTED.inc(f"shed_{reason}")
+            await reject(send, 503, SHED_RETRY_AFTER_SECONDS, "Server overloaded, retry later")
+            return
+        shedder.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            shedder.in_flight -= 1
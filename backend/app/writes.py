@@ -0,0 +1,58 @@
+"""Single-statement conditional UPDATE / DELETE with RETURNING"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import delete, insert, update
+from sqlmodel import Session
+
+from app.models.models import Tombstone
+
+
+def _precondition_failed(session: Session, model, row_id: int, not_found: str):
+    # Only reached when nothing matched: tell a missing row from a stale version
+    if session.get(model, row_id) is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    raise HTTPException(status_code=412, detail="Precondition Failed")
+
+
+def update_row(session: Session, model, row_id: int, values: Dict[str, Any],
+               versions: Optional[List[datetime]], not_found: str):
+    """
+    UPDATE ... WHERE id = :id [AND updated_at IN (:versions)] RETURNING *, then commit.
+    Bumps updated_at and returns the new row, validated through `model` because
+    RETURNING hands back values before column affinity (SQLite returns 7 for a REAL 7.0);
+    404 if the row is missing, 412 if it exists but no longer carries a version allowed
+    by If-Match.
+    """
+    table = model.__table__
+    statement = update(table).where(table.c.id == row_id)
+    if versions is not None:
+        statement = statement.where(table.c.updated_at.in_(versions))
+    statement = statement.values(**values, updated_at=datetime.utcnow()).returning(*table.c)
+    row = session.execute(statement).first()
+    if row is None:
+        session.rollback()
+        _precondition_failed(session, model, row_id, not_found)
+    session.commit()
+    return model.model_validate(dict(row._mapping))
+
+
+def delete_row(session: Session, model, row_id: int,
+               versions: Optional[List[datetime]], not_found: str) -> None:
+    """
+    DELETE ... WHERE id = :id [AND updated_at IN (:versions)] RETURNING id, then
+    record a tombstone for the change feed and commit both together.
+    """
+    table = model.__table__
+    statement = delete(table).where(table.c.id == row_id)
+    if versions is not None:
+        statement = statement.where(table.c.updated_at.in_(versions))
+    deleted = session.execute(statement.returning(table.c.id)).first()
+    if deleted is None:
+        session.rollback()
+        _precondition_failed(session, model, row_id, not_found)
+    # Committed with the delete, so change feed consumers cannot miss it
+    session.execute(insert(Tombstone.__table__).values(
+        entity=table.name, entity_id=row_id, deleted_at=datetime.utcnow()))
+    session.commit()
@@ -0,0 +1,58 @@
+"""
+Sync vs async engine load benchmark
+
+Starts the API under uvicorn once with the psycopg2/threadpool engine and once
+with DB_ASYNC=True, then keeps --concurrency connections busy on the read
+endpoints and reports throughput and latency percentiles for both modes.
+
+    BENCH_DATABASE_URL=postgresql://... python -m benchmarks.bench_async_engine --concurrency 1000
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+import httpx
+
+from benchmarks.common import (
+    bench_database_url, drive_load, free_port, make_engine, run_server, seed_products,
+)
+
+
+async def _load(base_url: str, paths, concurrency: int, duration: float):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await drive_load(client, paths, concurrency, min(2.0, duration))  # warm-up
+        return await drive_load(client, paths, concurrency, duration)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    url = bench_database_url()
+    engine = make_engine(url)
+    seed_products(engine, args.rows)
+    engine.dispose()
+
+    paths = [f"/api/v1/products/{i}" for i in range(1, min(args.rows, 1000) + 1)]
+    paths.append("/api/v1/products/?limit=50")
+
+    report = {}
+    for mode, db_async in (("sync", "False"), ("async", "True")):
+        port = free_port()
+        argv = [sys.executable, "-m", "uvicorn", "main:app",
+                "--port", str(port), "--log-level", "warning"]
+        env = {"DATABASE_URL": url, "DB_ASYNC": db_async, "TESTING": "true"}
+        with run_server(argv, env, port) as base_url:
+            report[mode] = asyncio.run(_load(base_url, paths, args.concurrency, args.duration))
+        print(f"{mode:>6}: " + ", ".join(f"{k}={v:.1f}" for k, v in report[mode].items()))
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
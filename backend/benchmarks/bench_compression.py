@@ -0,0 +1,51 @@
+"""
+Compression cost benchmark
+
+Compresses representative response bodies (a product list page, a large page
+and an NDJSON export) with gzip and brotli at several levels, and reports CPU
+time per response next to the bytes saved.
+
+    python -m benchmarks.bench_compression --rows 1000
+"""
+import argparse
+
+from app.compression import StreamCompressor
+from app.datagen import generate_products, PRODUCT_COLUMNS
+from app.serialization import dumps
+from benchmarks.common import measure
+
+SETTINGS = [("gzip", 1), ("gzip", 6), ("gzip", 9), ("br", 1), ("br", 4), ("br", 11)]
+
+
+def bodies(rows: int):
+    products = [dict(zip(PRODUCT_COLUMNS, row), id=i + 1)
+                for i, row in enumerate(generate_products(rows))]
+    return {
+        "list page (100)": dumps(products[:100]),
+        f"list page ({rows})": dumps(products),
+        f"ndjson export ({rows})": b"\n".join(dumps(product) for product in products) + b"\n",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'body':<22} {'encoding':<8} {'level':>5} {'bytes in':>10} {'bytes out':>10} "
+          f"{'saved':>6} {'cpu p50 ms':>11} {'MB/s':>7}")
+    for name, body in bodies(args.rows).items():
+        for encoding, level in SETTINGS:
+            def compress():
+                return StreamCompressor(encoding, level, level).compress(body, finish=True)
+
+            size = len(compress())
+            timing = measure(compress, args.repeat)
+            throughput = len(body) / 1e6 / (timing["p50_ms"] / 1000)
+            print(f"{name:<22} {encoding:<8} {level:>5} {len(body):>10} {size:>10} "
+                  f"{1 - size / len(body):>6.0%} {timing['p50_ms']:>11.2f} {throughput:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
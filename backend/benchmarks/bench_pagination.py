@@ -0,0 +1,61 @@
+"""
+Keyset pagination benchmark
+
+Seeds the products table and measures GET /api/v1/products/ latency at
+increasing page depths, next to the equivalent OFFSET query, to show that
+cursor pages cost the same on page 1 and on page 10,000.
+
+    python -m benchmarks.bench_pagination --rows 1000000 --page-size 100
+"""
+import argparse
+
+from sqlalchemy import text
+
+from app.pagination import encode_cursor
+from benchmarks.common import app_client, make_engine, measure, seed_products
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--pages", default="1,10,100,1000,10000")
+    args = parser.parse_args()
+
+    engine = make_engine()
+    print(f"Seeding {args.rows} products...")
+    seed_products(engine, args.rows)
+
+    pages = [int(p) for p in args.pages.split(",")]
+    print(f"{'page':>8} {'keyset p50 ms':>14} {'keyset p95 ms':>14} {'OFFSET SQL p50 ms':>18}")
+    with app_client(engine) as client, engine.connect() as conn:
+        for page in pages:
+            last_id = (page - 1) * args.page_size
+            if last_id + args.page_size > args.rows:
+                print(f"{page:>8} skipped: needs {last_id + args.page_size} rows")
+                continue
+            params = {"limit": args.page_size}
+            if last_id:
+                params["cursor"] = encode_cursor({"id": last_id})
+
+            def fetch_keyset():
+                response = client.get("/api/v1/products/", params=params)
+                assert response.status_code == 200, response.text
+
+            def fetch_offset():
+                conn.execute(
+                    text("SELECT * FROM products ORDER BY id LIMIT :limit OFFSET :offset"),
+                    {"limit": args.page_size, "offset": last_id},
+                ).fetchall()
+
+            keyset = measure(fetch_keyset, args.repeat)
+            offset = measure(fetch_offset, args.repeat)
+            print(
+                f"{page:>8} {keyset['p50_ms']:>14.2f} {keyset['p95_ms']:>14.2f} "
+                f"{offset['p50_ms']:>18.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
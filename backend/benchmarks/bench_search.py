@@ -0,0 +1,104 @@
+"""
+Product search benchmark
+
+Seeds a catalog with a realistic word distribution and measures
+GET /api/v1/products/search next to the ILIKE '%term%' scan it replaces.
+On PostgreSQL the endpoint uses the GIN tsvector index; on SQLite it uses the
+in-memory index, whose one-off build time is reported separately.
+
+    BENCH_DATABASE_URL=postgresql://... python -m benchmarks.bench_search --rows 1000000
+"""
+import argparse
+import random
+import time
+from datetime import datetime
+
+from sqlalchemy import insert, text
+
+from app.models.models import Product
+from app.search import build_search_index, get_search_index
+from benchmarks.common import app_client, bench_database_url, make_engine, measure
+
+ADJECTIVES = ["red", "blue", "steel", "ceramic", "wooden", "compact", "deluxe", "vintage",
+              "portable", "organic", "smart", "classic", "heavy", "mini", "pro", "eco"]
+NOUNS = ["kettle", "mug", "lamp", "chair", "desk", "speaker", "backpack", "blender",
+         "jacket", "watch", "camera", "bottle", "pillow", "router", "drill", "teapot"]
+FILLER = ["with", "for", "and", "durable", "finish", "everyday", "use", "home", "office",
+          "travel", "gift", "warranty", "easy", "clean", "lightweight", "design"]
+
+QUERIES = ["kettle", "red kettle", "vintage camera", "lightweight travel backpack", "zeppelin"]
+
+
+def seed_catalog(engine, count: int, seed: int = 42, batch_size: int = 10_000) -> None:
+    """Insert `count` products whose names and descriptions draw from small vocabularies"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        for start in range(0, count, batch_size):
+            rows = []
+            for _ in range(start, min(start + batch_size, count)):
+                name = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}".title()
+                words = rng.choices(FILLER, k=8) + [rng.choice(NOUNS), rng.choice(ADJECTIVES)]
+                rng.shuffle(words)
+                rows.append({
+                    "name": name,
+                    "description": " ".join(words),
+                    "price": round(rng.uniform(1, 500), 2),
+                    "in_stock": rng.random() > 0.1,
+                    "created_at": now,
+                    "updated_at": now,
+                })
+            conn.execute(insert(Product), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    url = bench_database_url()
+    engine = make_engine(url)
+    print(f"Seeding {args.rows} products...")
+    seed_catalog(engine, args.rows)
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE products"))
+
+    index = build_search_index(url)
+    with app_client(engine) as client:
+        from main import app
+        app.dependency_overrides[get_search_index] = lambda: index
+
+        start = time.perf_counter()
+        client.get("/api/v1/products/search", params={"q": QUERIES[0], "limit": 1})
+        print(f"{index.name} index, first query (includes any build): "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+        print(f"{'query':<30} {'search p50 ms':>14} {'search p95 ms':>14} {'ILIKE p50 ms':>13}")
+        with engine.connect() as conn:
+            for q in QUERIES:
+                params = {"q": q, "limit": args.limit}
+
+                def fetch_search():
+                    response = client.get("/api/v1/products/search", params=params)
+                    assert response.status_code == 200, response.text
+
+                pattern = "%" + q.split()[0] + "%"
+
+                def fetch_ilike():
+                    conn.execute(
+                        text("SELECT * FROM products WHERE lower(name) LIKE lower(:p) "
+                             "OR lower(description) LIKE lower(:p) LIMIT :limit"),
+                        {"p": pattern, "limit": args.limit},
+                    ).fetchall()
+
+                search = measure(fetch_search, args.repeat)
+                ilike = measure(fetch_ilike, args.repeat)
+                print(f"{q:<30} {search['p50_ms']:>14.2f} {search['p95_ms']:>14.2f} "
+                      f"{ilike['p50_ms']:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
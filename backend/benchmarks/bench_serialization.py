@@ -0,0 +1,57 @@
+"""
+Response serialization microbenchmark
+
+Renders a page of --rows products the way FastAPI does for
+response_model=List[ProductRead] (validate, jsonable_encoder, json.dumps) and
+through the orjson path the list endpoints use, and checks the bytes match.
+
+    python -m benchmarks.bench_serialization --rows 10000
+"""
+import argparse
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.models.models import Product, ProductRead
+from app.serialization import dump_rows
+from benchmarks.common import measure
+
+
+def make_products(count: int):
+    now = datetime.utcnow()
+    return [
+        Product(id=i, name=f"Product {i}", description=f"Benchmark product number {i} – «déjà vu»",
+                price=1.0 + (i % 1000) / 7, in_stock=i % 7 != 0, created_at=now, updated_at=now)
+        for i in range(1, count + 1)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    products = make_products(args.rows)
+
+    def response_model_path():
+        validated = [ProductRead.model_validate(product) for product in products]
+        return JSONResponse(jsonable_encoder(validated)).body
+
+    def orjson_path():
+        return dump_rows(ProductRead, products)
+
+    assert response_model_path() == orjson_path(), "serializers disagree"
+    size = len(orjson_path())
+    before = measure(response_model_path, args.repeat)
+    after = measure(orjson_path, args.repeat)
+    print(f"{args.rows} products, {size / 1024:.0f} KiB per response")
+    print(f"{'path':<32} {'p50 ms':>8} {'p95 ms':>8}")
+    print(f"{'response_model + json':<32} {before['p50_ms']:>8.2f} {before['p95_ms']:>8.2f}")
+    print(f"{'dump_rows (orjson)':<32} {after['p50_ms']:>8.2f} {after['p95_ms']:>8.2f}")
+    print(f"speed-up: {before['p50_ms'] / after['p50_ms']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
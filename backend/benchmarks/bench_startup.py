@@ -0,0 +1,96 @@
+"""
+Cold start benchmark
+
+Measures, in fresh processes, how long `import main` takes and how long a
+single uvicorn worker needs from spawn until it answers its first request:
+/health (accepting connections), /startup (schema ready) and a product list
+read. Schema creation runs as it does in production, against a database
+whose tables already exist.
+
+    BENCH_DATABASE_URL=postgresql://... python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.common import BACKEND_DIR, bench_database_url, free_port, make_engine
+
+STAGES = ("health", "startup", "first_read")
+
+
+def time_import(env) -> float:
+    """Seconds for a fresh interpreter to import the application"""
+    code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+                            check=True, capture_output=True, text=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def _wait_for(client, path, began, process, timeout) -> float:
+    while True:
+        if process.poll() is not None:
+            raise RuntimeError(process.stderr.read().decode(errors="replace"))
+        try:
+            if client.get(path).status_code == 200:
+                return time.perf_counter() - began
+        except httpx.TransportError:
+            pass
+        if time.perf_counter() - began > timeout:
+            raise RuntimeError(f"{path} did not answer within {timeout}s")
+        time.sleep(0.005)
+
+
+def time_first_requests(env, timeout: float = 60.0) -> dict:
+    """Seconds from spawning uvicorn until each stage first answers 200"""
+    port = free_port()
+    argv = [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+            "--log-level", "warning"]
+    began = time.perf_counter()
+    process = subprocess.Popen(argv, cwd=BACKEND_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+            return {
+                "health": _wait_for(client, "/health", began, process, timeout),
+                "startup": _wait_for(client, "/startup", began, process, timeout),
+                "first_read": _wait_for(client, "/api/v1/products/?limit=10", began,
+                                        process, timeout),
+            }
+    finally:
+        process.terminate()
+        process.wait(timeout=15)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    url = bench_database_url()
+    make_engine(url).dispose()
+    env = {**os.environ, "DATABASE_URL": url, "TESTING": "false", "DB_INIT_SCHEMA": "True"}
+
+    samples = {"import": []}
+    samples.update({stage: [] for stage in STAGES})
+    for _ in range(args.runs):
+        samples["import"].append(time_import(env))
+        for stage, seconds in time_first_requests(env).items():
+            samples[stage].append(seconds)
+
+    report = {
+        stage: {"median_ms": statistics.median(values) * 1000, "max_ms": max(values) * 1000}
+        for stage, values in samples.items()
+    }
+    for stage, stats in report.items():
+        print(f"{stage:>10}: median={stats['median_ms']:>8.1f} ms  max={stats['max_ms']:>8.1f} ms")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+API load and latency regression suite
+
+Seeds users and products through init_db_script, then drives every router
+endpoint in-process through the ASGI app at each --concurrency level and
+writes throughput and p50/p95/p99 latency as a JSON report. It exits with
+status 1 when every request of a scenario failed, and, given a --baseline
+report from an earlier commit, when any endpoint's p95 latency rises, or its
+throughput drops, by more than --threshold.
+
+    python -m benchmarks.bench_suite --output report.json
+    python -m benchmarks.bench_suite --baseline report.json --threshold 0.25
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+import httpx
+from fastapi.routing import APIRoute
+from sqlmodel import Session
+
+from benchmarks.common import (
+    BACKEND_DIR, bench_database_url, drive_requests, make_engine, seed_products, seed_users,
+)
+
+Request = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+def scenarios(users: int, products: int) -> List[Tuple[str, Request]]:
+    """One request factory per route, keyed "METHOD path" like the router table"""
+    run = str(int(time.time()))  # keeps generated e-mails unique across runs
+
+    def user_id(i):
+        return i % users + 1
+
+    def product_id(i):
+        return i % products + 1
+
+    def product_body(i):
+        return {"name": f"Load product {i}", "description": "Created by the load suite",
+                "price": 1.0 + i % 100}
+
+    def user_body(i, prefix="load"):
+        return {"name": f"Load user {i}", "email": f"{prefix}-{run}-{i}@example.com"}
+
+    return [
+        ("GET /health", lambda c, i: c.get("/health")),
+        ("GET /startup", lambda c, i: c.get("/startup")),
+        ("GET /readiness", lambda c, i: c.get("/readiness")),
+        ("GET /cache/stats", lambda c, i: c.get("/cache/stats")),
+        ("GET /metrics", lambda c, i: c.get("/metrics")),
+        ("GET /", lambda c, i: c.get("/")),
+        ("GET /api/v1/users/", lambda c, i: c.get("/api/v1/users/", params={"limit": 50})),
+        ("GET /api/v1/users/{user_id}", lambda c, i: c.get(f"/api/v1/users/{user_id(i)}")),
+        ("GET /api/v1/users/export", lambda c, i: c.get("/api/v1/users/export")),
+        ("GET /api/v1/users/changes", lambda c, i: c.get("/api/v1/users/changes")),
+        ("POST /api/v1/users/batch-get", lambda c, i: c.post(
+            "/api/v1/users/batch-get", json={"ids": [user_id(i + n) for n in range(50)]})),
+        ("POST /api/v1/users/", lambda c, i: c.post("/api/v1/users/", json=user_body(i))),
+        ("POST /api/v1/users/bulk", lambda c, i: c.post(
+            "/api/v1/users/bulk",
+            json=[user_body(i * 10 + n, "bulk") for n in range(10)])),
+        ("PUT /api/v1/users/{user_id}", lambda c, i: c.put(
+            f"/api/v1/users/{user_id(i)}",
+            json={"name": f"Renamed {i}", "email": f"renamed-{run}-{i}@example.com"})),
+        ("GET /api/v1/products/", lambda c, i: c.get(
+            "/api/v1/products/", params={"limit": 50, "in_stock": True, "sort": "-price"})),
+        ("GET /api/v1/products/{product_id}",
+         lambda c, i: c.get(f"/api/v1/products/{product_id(i)}")),
+        ("GET /api/v1/products/search", lambda c, i: c.get(
+            "/api/v1/products/search", params={"q": ("kettle", "steel lamp", "warranty")[i % 3]})),
+        ("GET /api/v1/products/export", lambda c, i: c.get("/api/v1/products/export")),
+        ("GET /api/v1/products/changes", lambda c, i: c.get("/api/v1/products/changes")),
+        ("POST /api/v1/products/batch-get", lambda c, i: c.post(
+            "/api/v1/products/batch-get", json={"ids": [product_id(i + n) for n in range(50)]})),
+        ("POST /api/v1/products/", lambda c, i: c.post("/api/v1/products/", json=product_body(i))),
+        ("POST /api/v1/products/bulk", lambda c, i: c.post(
+            "/api/v1/products/bulk", json=[product_body(i * 10 + n) for n in range(10)])),
+        ("PUT /api/v1/products/{product_id}", lambda c, i: c.put(
+            f"/api/v1/products/{product_id(i)}", json=product_body(i))),
+        # Deletes run last and walk down from the highest seeded id
+        ("DELETE /api/v1/users/{user_id}",
+         lambda c, i: c.delete(f"/api/v1/users/{users - i % users}")),
+        ("DELETE /api/v1/products/{product_id}",
+         lambda c, i: c.delete(f"/api/v1/products/{products - i % products}")),
+    ]
+
+
+# Endless Server-Sent Event streams and timed captures have no per-request latency to measure
+UNMEASURED_ROUTES = {"GET /api/v1/users/changes/stream", "GET /api/v1/products/changes/stream",
+                     "POST /admin/profile"}
+
+
+def uncovered_routes(app, names) -> List[str]:
+    """Router endpoints the suite has no scenario for"""
+    covered = set(names) | UNMEASURED_ROUTES
+    return [
+        f"{method} {route.path}"
+        for route in app.routes if isinstance(route, APIRoute)
+        for method in sorted(route.methods)
+        if f"{method} {route.path}" not in covered
+    ]
+
+
+async def run_suite(engine, url, users, products, levels, duration) -> Dict[str, dict]:
+    from main import app
+    from app.cache import MemoryCache, get_cache
+    from app.database import get_session
+    from app.readiness import EnginePing, ReadinessProbe, get_readiness_probe
+    from app.search import build_search_index, get_search_index
+
+    def get_session_override():
+        with Session(engine) as session:
+            yield session
+
+    cache = MemoryCache()
+    search_index = build_search_index(url)
+    app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_cache] = lambda: cache
+    app.dependency_overrides[get_search_index] = lambda: search_index
+    probe = ReadinessProbe(ping=EnginePing(engine))
+    app.dependency_overrides[get_readiness_probe] = lambda: probe
+
+    plan = scenarios(users, products)
+    missing = uncovered_routes(app, [name for name, _ in plan])
+    if missing:
+        raise SystemExit("No load scenario for: " + ", ".join(missing))
+
+    results: Dict[str, dict] = {}
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                for name, request in plan:
+                    results[name] = {}
+                    for level in levels:
+                        stats = await drive_requests(client, request, level, duration)
+                        results[name][f"c{level}"] = stats
+                        print(f"{name:<40} c={level:<4} rps={stats['rps']:>8.1f} "
+                              f"p50={stats['p50_ms']:>7.2f} p95={stats['p95_ms']:>7.2f} "
+                              f"p99={stats['p99_ms']:>7.2f} errors={stats['errors']}")
+    finally:
+        app.dependency_overrides.clear()
+    return results
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> List[str]:
+    """Describe every endpoint/concurrency pair that regressed past `threshold`"""
+    regressions = []
+    for name, levels in report["results"].items():
+        for level, stats in levels.items():
+            before = baseline.get("results", {}).get(name, {}).get(level)
+            if not before:
+                continue
+            if before["p95_ms"] and stats["p95_ms"] > before["p95_ms"] * (1 + threshold):
+                regressions.append(f"{name} {level}: p95 {before['p95_ms']:.2f} -> "
+                                   f"{stats['p95_ms']:.2f} ms")
+            if stats["rps"] < before["rps"] * (1 - threshold):
+                regressions.append(f"{name} {level}: rps {before['rps']:.1f} -> "
+                                   f"{stats['rps']:.1f}")
+            if stats["errors"] and not before["errors"]:
+                regressions.append(f"{name} {level}: {stats['errors']} errors")
+    return regressions
+
+
+def broken_scenarios(results: Dict[str, dict]) -> List[str]:
+    """Endpoint/concurrency pairs where every request failed, with or without a baseline"""
+    return [
+        f"{name} {level}: all {stats['errors']} requests failed"
+        for name, levels in results.items()
+        for level, stats in levels.items()
+        if stats["errors"] and not stats["requests"]
+    ]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--concurrency", default="1,10,50",
+                        help="Comma-separated in-flight request levels")
+    parser.add_argument("--duration", type=float, default=3.0,
+                        help="Seconds per endpoint and concurrency level")
+    parser.add_argument("--output", default="bench-report.json")
+    parser.add_argument("--baseline", help="Report from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed relative p95 increase / throughput drop")
+    args = parser.parse_args()
+
+    url = bench_database_url()
+    engine = make_engine(url)
+    print(f"Seeding {args.users} users and {args.products} products...")
+    seed_users(engine, args.users)
+    seed_products(engine, args.products)
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    results = asyncio.run(
+        run_suite(engine, url, args.users, args.products, levels, args.duration)
+    )
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "database": engine.dialect.name,
+            "users": args.users,
+            "products": args.products,
+            "concurrency": levels,
+            "duration": args.duration,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Report written to {args.output}")
+
+    broken = broken_scenarios(results)
+    for line in broken:
+        print(f"BROKEN {line}")
+    if broken:
+        sys.exit(1)
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        for key in ("database", "users", "products", "duration"):
+            if baseline.get("meta", {}).get(key) != report["meta"][key]:
+                print(f"warning: baseline {key} differs, results may not be comparable")
+        regressions = compare(report, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Worker scaling benchmark for the production launcher
+
+Starts `python -m app.server` with 1, 2, ... --max-workers workers and drives the
+read endpoints from --clients load processes, so the load generator is not
+what saturates. Reports total throughput per worker count and the speed-up
+over a single worker. Latency percentiles are the worst seen by any client.
+
+    BENCH_DATABASE_URL=postgresql://... python -m benchmarks.bench_workers --max-workers 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+
+from benchmarks.common import (
+    bench_database_url, drive_load, free_port, make_engine, run_server, seed_products,
+)
+
+
+def _client(base_url: str, paths, concurrency: int, duration: float):
+    async def load():
+        limits = httpx.Limits(max_connections=concurrency,
+                              max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            await drive_load(client, paths, concurrency, min(2.0, duration))  # warm-up
+            return await drive_load(client, paths, concurrency, duration)
+
+    return asyncio.run(load())
+
+
+def drive(base_url: str, paths, clients: int, concurrency: int, duration: float) -> dict:
+    """Run `clients` load processes in parallel and combine their results"""
+    per_client = max(1, concurrency // clients)
+    with ProcessPoolExecutor(clients) as pool:
+        results = list(pool.map(_client, [base_url] * clients, [paths] * clients,
+                                [per_client] * clients, [duration] * clients))
+    return {
+        "requests": sum(result["requests"] for result in results),
+        "errors": sum(result["errors"] for result in results),
+        "rps": sum(result["rps"] for result in results),
+        "p50_ms": max(result["p50_ms"] for result in results),
+        "p95_ms": max(result["p95_ms"] for result in results),
+        "p99_ms": max(result["p99_ms"] for result in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--clients", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Load generator processes")
+    parser.add_argument("--concurrency", type=int, default=200,
+                        help="In-flight requests across all clients")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    url = bench_database_url()
+    engine = make_engine(url)
+    seed_products(engine, args.rows)
+    engine.dispose()
+
+    paths = [f"/api/v1/products/{i}" for i in range(1, min(args.rows, 1000) + 1)]
+    paths.append("/api/v1/products/?limit=50")
+
+    report = {}
+    for workers in range(1, args.max_workers + 1):
+        port = free_port()
+        env = {"DATABASE_URL": url, "TESTING": "true", "PORT": str(port),
+               "HOST": "127.0.0.1", "WEB_CONCURRENCY": str(workers)}
+        with run_server([sys.executable, "-m", "app.server"], env, port) as base_url:
+            stats = drive(base_url, paths, args.clients, args.concurrency, args.duration)
+        stats["speedup"] = stats["rps"] / report[1]["rps"] if report else 1.0
+        report[workers] = stats
+        print(f"workers={workers:<3} rps={stats['rps']:>9.1f} x{stats['speedup']:.2f} "
+              f"p95={stats['p95_ms']:>7.2f} p99={stats['p99_ms']:>7.2f} "
+              f"errors={stats['errors']}")
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Shared helpers for the benchmark scripts"""
+import asyncio
+import itertools
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Benchmarks manage their own schema, never the application's import-time init
+os.environ.setdefault("TESTING", "true")
+# Load generators are a single client; measure the application, not the limiter
+os.environ.setdefault("RATE_LIMIT_BACKEND", "none")
+
+from sqlmodel import SQLModel, Session, create_engine  # noqa: E402
+
+from init_db_script import seed_scale_data  # noqa: E402
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def bench_database_url() -> str:
+    """BENCH_DATABASE_URL when set, otherwise a throwaway SQLite file"""
+    url = os.getenv("BENCH_DATABASE_URL")
+    if not url:
+        path = os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.db")
+        url = f"sqlite:///{path}"
+    return url
+
+
+def make_engine(url: Optional[str] = None):
+    """Create the engine benchmarks run against and make sure the schema exists"""
+    url = url or bench_database_url()
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    engine = create_engine(url, connect_args=connect_args)
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def seed_products(engine, count: int, batch_size: int = 10_000) -> None:
+    """Append `count` generated products"""
+    seed_scale_data(engine, products=count, batch_size=batch_size)
+
+
+def seed_users(engine, count: int, batch_size: int = 10_000) -> None:
+    """Append `count` generated users with unique e-mail addresses"""
+    seed_scale_data(engine, users=count, batch_size=batch_size)
+
+
+@contextmanager
+def app_client(engine):
+    """Yield a TestClient whose session dependency is bound to `engine`"""
+    from fastapi.testclient import TestClient
+    from main import app
+    from app.database import get_session
+
+    def get_session_override():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+
+
+def measure(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Call `fn` `repeat` times and summarise the latencies in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "mean_ms": statistics.fmean(samples),
+    }
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not samples:
+        return 0.0
+    index = max(0, min(len(samples) - 1, int(round(pct / 100 * len(samples))) - 1))
+    return samples[index]
+
+
+def summarize(latencies_ms: List[float], elapsed: float, errors: int = 0) -> Dict[str, float]:
+    """Throughput and latency percentiles for one load run"""
+    latencies_ms = sorted(latencies_ms)
+    return {
+        "requests": len(latencies_ms),
+        "errors": errors,
+        "rps": len(latencies_ms) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies_ms, 50),
+        "p95_ms": percentile(latencies_ms, 95),
+        "p99_ms": percentile(latencies_ms, 99),
+    }
+
+
+async def drive_requests(client, request: Callable[[object, int], Awaitable[object]],
+                         concurrency: int, duration: float) -> Dict[str, float]:
+    """
+    Keep `concurrency` calls of `request(client, i)` in flight for `duration` seconds.
+    `i` counts calls across workers, so requests can pick distinct rows or payloads.
+    Responses with a 5xx status and raised exceptions are counted as errors.
+    """
+    latencies: List[float] = []
+    errors = 0
+    counter = itertools.count()
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await request(client, next(counter))
+                failed = response.status_code >= 500
+            except Exception:
+                failed = True
+            if failed:
+                errors += 1
+            else:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+async def drive_load(client, paths: Sequence[str], concurrency: int,
+                     duration: float) -> Dict[str, float]:
+    """
+    Keep `concurrency` GET requests in flight against `paths` for `duration` seconds.
+    `client` is an httpx.AsyncClient pointed at either a server or an ASGI app.
+    """
+    async def request(client, i):
+        return await client.get(paths[i % len(paths)])
+
+    return await drive_requests(client, request, concurrency, duration)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def run_server(argv: Sequence[str], env: Dict[str, str], port: int, timeout: float = 30.0):
+    """Start an API server process and wait until /health answers"""
+    import httpx
+
+    process = subprocess.Popen(
+        list(argv), cwd=BACKEND_DIR, env={**os.environ, **env},
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(process.stderr.read().decode(errors="replace"))
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("Server did not become healthy in time")
+            time.sleep(0.1)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
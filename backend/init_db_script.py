@@ -2,7 +2,9 @@
 Database Initialization Script
 Creates tables and seeds sample data into PostgreSQL
 """
-from app.database import init_db, SessionLocal
+import argparse
+from app.database import engine, init_db, SessionLocal
+from app.datagen import DEFAULT_CHUNK_SIZE, Distribution, generate
 from app.models.models import User, Product
 from datetime import datetime
 
@@ -93,8 +95,35 @@ def seed_sample_data():
     finally:
         session.close()
 
+def seed_scale_data(bind=engine, users=0, products=0, batch_size=DEFAULT_CHUNK_SIZE,
+                    distribution=None):
+    """Append generated users and products, for staging, load tests and benchmarks"""
+    return generate(bind, users, products, distribution, batch_size)
+
+
 def main():
     """Initialize database"""
+    parser = argparse.ArgumentParser(description="Create tables and seed data")
+    parser.add_argument("--users", type=int, default=0,
+                        help="Generated users to add on top of the sample data")
+    parser.add_argument("--products", type=int, default=0,
+                        help="Generated products to add on top of the sample data")
+    parser.add_argument("--seed", type=int, default=42,
+                        help="Random seed; the same seed and row numbers give the same rows")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Rows per COPY / executemany transaction")
+    parser.add_argument("--active-ratio", type=float, default=0.8)
+    parser.add_argument("--in-stock-ratio", type=float, default=0.9)
+    parser.add_argument("--price-median", type=float, default=40.0,
+                        help="Median of the log-normal price distribution")
+    parser.add_argument("--price-sigma", type=float, default=1.0,
+                        help="Spread of the log-normal price distribution")
+    parser.add_argument("--history-days", type=int, default=730,
+                        help="created_at values spread over this many days")
+    parser.add_argument("--skip-sample", action="store_true",
+                        help="Do not insert the fixed sample users and products")
+    args = parser.parse_args()
+
     print("🗄️  Initializing database...")
     
     try:
@@ -104,8 +133,25 @@ def main():
         print("✓ Tables created successfully!")
         
         # Seed sample data
-        print("Seeding sample data...")
-        seed_sample_data()
+        if not args.skip_sample:
+            print("Seeding sample data...")
+            seed_sample_data()
+
+        if args.users or args.products:
+            print(f"Generating {args.users} users and {args.products} products...")
+            distribution = Distribution(
+                seed=args.seed,
+                active_ratio=args.active_ratio,
+                in_stock_ratio=args.in_stock_ratio,
+                price_median=args.price_median,
+                price_sigma=args.price_sigma,
+                history_days=args.history_days,
+            )
+            report = seed_scale_data(users=args.users, products=args.products,
+                                     batch_size=args.chunk_size, distribution=distribution)
+            for table, stats in report.items():
+                print(f"  - {table}: {stats['rows']} rows in {stats['seconds']:.1f}s "
+                      f"({stats['rows_per_sec']:,.0f} rows/sec)")
         
         print("\n✓ Database initialization complete!")
         
@@ -1,20 +1,67 @@
 """
 FastAPI Application Entry Point with PostgreSQL Integration
 """
+import asyncio
+import logging
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import health, users, products
-from app.database import init_db
+from app.api import admin, health, metrics, users, products
+from app.batch import MISSING_IDS_HEADER
+from app.changes import CHANGES_TOMBSTONE_RETENTION_DAYS, prune_tombstones_periodically
+from app.compression import CompressionMiddleware
+from app.database import DB_INIT_SCHEMA, create_schema
+from app.metrics import MetricsMiddleware
+from app.pagination import NEXT_CURSOR_HEADER
+from app.profiling import ProfilingMiddleware
+from app.ratelimit import RateLimitMiddleware
+from app.readiness import startup_state
+from app.replicas import ReplicaStickinessMiddleware, monitor_replicas, replica_set
+from app.sampling import ProfilerMiddleware
+from app.serialization import FastJSONResponse
+from app.shedding import LoadSheddingMiddleware
 
-# Initialize database tables on startup (skip during tests)
-if os.getenv("TESTING") != "true":
-    init_db()
+logger = logging.getLogger(__name__)
+
+async def initialise():
+    """
+    Create the schema, then flip the startup probe. Errors that retrying cannot fix,
+    such as missing privileges, are logged; /startup then stays 503 until a restart.
+    """
+    try:
+        await create_schema()
+    except Exception:
+        logger.exception("Schema creation failed; the startup probe will keep failing")
+        return
+    startup_state.mark_started()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start background work without blocking the server from accepting connections.
+    Importing the app touches no database; schema creation runs as a task and
+    the startup probe stays 503 until it is done.
+    """
+    tasks = []
+    if replica_set.enabled:
+        tasks.append(asyncio.create_task(monitor_replicas(replica_set)))
+    if CHANGES_TOMBSTONE_RETENTION_DAYS:
+        tasks.append(asyncio.create_task(prune_tombstones_periodically()))
+    if DB_INIT_SCHEMA:
+        tasks.append(asyncio.create_task(initialise()))
+    else:
+        startup_state.mark_started()
+    yield
+    for task in tasks:
+        task.cancel()
 
 app = FastAPI(
     title="Microservice API",
     description="FastAPI backend with PostgreSQL database",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # CORS Middleware - Get allowed origins from environment variable
@@ -23,16 +70,33 @@ cors_origins = os.getenv(
     "http://localhost:3000,http://localhost:8000"
 ).split(",")
 
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(ReplicaStickinessMiddleware)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(ProfilerMiddleware)
+
+# Refuse excess load before it reaches the routes or the connection pool
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(LoadSheddingMiddleware)
+
+# Outside the limiters so browsers can read their 429s and 503s
 app.add_middleware(
     CORSMiddleware,
     allow_origins=cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, MISSING_IDS_HEADER, "ETag", "Server-Timing",
+                    "Retry-After"],
 )
 
+# Outermost middleware, so latency covers everything below it
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(health.router, tags=["Health"])
+app.include_router(metrics.router, tags=["Metrics"])
+app.include_router(admin.router, prefix="/admin", tags=["Admin"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["Users"])
 app.include_router(products.router, prefix="/api/v1/products", tags=["Products"])
 
@@ -47,5 +111,6 @@ def read_root():
     }
 
 if __name__ == "__main__":
+    # Single-process development server; production runs `python -m app.server`
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -8,10 +8,16 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Set testing mode before importing main
 os.environ["TESTING"] = "true"
+# Tests send bursts from one client; rate limiting tests install their own limiter
+os.environ["RATE_LIMIT_BACKEND"] = "none"
 
 from main import app
+from app.cache import MemoryCache, get_cache
 from app.database import get_session, engine
+from app.readiness import ReadinessProbe, get_readiness_probe
+from app.search import MemorySearchIndex, get_search_index
 from sqlmodel import SQLModel, Session, create_engine
+from sqlalchemy import text
 from sqlalchemy.pool import StaticPool
 
 # Create in-memory SQLite database for testing (simpler than PostgreSQL for unit tests)
@@ -27,13 +33,24 @@ def session_fixture():
     with Session(engine) as session:
         yield session
 
+@pytest.fixture(name="cache")
+def cache_fixture():
+    """Provide an empty response cache for each test"""
+    return MemoryCache()
+
 @pytest.fixture(name="client")
-def client_fixture(session: Session):
-    """Provide a test client with database session override"""
+def client_fixture(session: Session, cache: MemoryCache):
+    """Provide a test client with database session and cache overrides"""
     def get_session_override():
         return session
 
     app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_cache] = lambda: cache
+    probe = ReadinessProbe(ping=lambda: session.execute(text("SELECT 1")))
+    app.dependency_overrides[get_readiness_probe] = lambda: probe
+    # SQLite has no tsvector, so search runs on the in-memory index
+    search_index = MemorySearchIndex()
+    app.dependency_overrides[get_search_index] = lambda: search_index
     client = TestClient(app)
     yield client
     app.dependency_overrides.clear()
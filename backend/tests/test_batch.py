@@ -0,0 +1,32 @@
+"""Test batch reads by primary key"""
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from sqlmodel import select
+
+from app.batch import _id_filter, fetch_many
+from app.models.models import Product
+
+
+class _PostgresSession:
+    class _Bind:
+        dialect = postgresql.dialect()
+
+    def get_bind(self):
+        return self._Bind()
+
+
+def test_postgres_uses_one_array_parameter():
+    """Test PostgreSQL gets id = ANY(:ids), whose text does not depend on the batch size"""
+    statement = select(Product).where(_id_filter(_PostgresSession(), Product, [1, 2, 3]))
+    compiled = statement.compile(dialect=postgresql.dialect())
+    assert "products.id = ANY (%(ids)s::BIGINT[])" in str(compiled)
+    assert compiled.params["ids"] == [1, 2, 3]
+
+
+def test_fetch_many_enforces_max_ids(session):
+    """Test the batch limit counts distinct ids"""
+    assert fetch_many(session, Product, [1, 1, 1], max_ids=1) == ([], [1])
+    with pytest.raises(HTTPException) as error:
+        fetch_many(session, Product, [1, 2], max_ids=1)
+    assert error.value.status_code == 400
@@ -0,0 +1,125 @@
+"""Test the response cache backends and read-through behaviour"""
+import asyncio
+
+import fakeredis.aioredis
+import pytest
+
+from app.cache import MemoryCache, RedisCache, ResponseCache
+from app.models.models import Product, User
+
+
+def test_memory_cache_lru_eviction():
+    """Test the least recently used entry is evicted first"""
+    cache = MemoryCache(max_entries=2, ttl=60)
+
+    async def scenario():
+        await cache.set("a", b"1")
+        await cache.set("b", b"2")
+        assert await cache.get("a") == b"1"
+        await cache.set("c", b"3")
+        return await cache.get("b"), await cache.get("a"), await cache.get("c")
+
+    assert asyncio.run(scenario()) == (None, b"1", b"3")
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+
+def test_memory_cache_ttl_expiry():
+    """Test expired entries are dropped on read"""
+    cache = MemoryCache(max_entries=10, ttl=0)
+
+    async def scenario():
+        await cache.set("a", b"1")
+        return await cache.get("a")
+
+    assert asyncio.run(scenario()) is None
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_redis_cache_against_fake():
+    """Test the Redis backend against a local fake server"""
+    cache = RedisCache(fakeredis.aioredis.FakeRedis(), ttl=30)
+
+    async def scenario():
+        await cache.set("product:1", b"{}")
+        first = await cache.get("product:1")
+        await cache.delete("product:1")
+        second = await cache.get("product:1")
+        ttl = await cache.client.pttl("api:product:1")
+        await cache.set("product:2", b"{}")
+        await cache.clear()
+        return first, second, ttl, await cache.client.keys("*")
+
+    first, second, ttl, keys = asyncio.run(scenario())
+    assert first == b"{}"
+    assert second is None
+    assert ttl == -2
+    assert keys == []
+    assert cache.stats() == {"backend": "redis", "hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_cache_backends_must_implement_storage():
+    """Test a backend missing a storage method fails when built, not on first use"""
+    class Incomplete(ResponseCache):
+        async def _get(self, key):
+            return None
+
+    for backend in (ResponseCache, Incomplete):
+        with pytest.raises(TypeError):
+            backend()
+
+
+def test_get_product_served_from_cache(session, client, cache):
+    """Test a second read is a cache hit with an identical body"""
+    session.add(Product(id=1, name="Cached", description="Hot", price=10.0))
+    session.commit()
+
+    first = client.get("/api/v1/products/1")
+    second = client.get("/api/v1/products/1")
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_update_product_invalidates_cache(session, client):
+    """Test an update is visible on the next read"""
+    session.add(Product(id=1, name="Before", description="Hot", price=10.0))
+    session.commit()
+    client.get("/api/v1/products/1")
+
+    response = client.put(
+        "/api/v1/products/1",
+        json={"name": "After", "description": "Hot", "price": 11.0},
+    )
+    assert response.status_code == 200
+    assert client.get("/api/v1/products/1").json()["name"] == "After"
+
+
+def test_delete_user_invalidates_cache(session, client):
+    """Test a deleted user is no longer served from cache"""
+    session.add(User(id=1, name="Gone", email="gone@example.com"))
+    session.commit()
+    assert client.get("/api/v1/users/1").status_code == 200
+
+    assert client.delete("/api/v1/users/1").status_code == 204
+    assert client.get("/api/v1/users/1").status_code == 404
+
+
+def test_bulk_upsert_invalidates_updated_users(session, client):
+    """Test users touched by a bulk upsert are evicted from the cache"""
+    session.add(User(id=1, name="Old", email="bulk@example.com"))
+    session.commit()
+    client.get("/api/v1/users/1")
+
+    client.post("/api/v1/users/bulk", json=[{"name": "New", "email": "bulk@example.com"}])
+    assert client.get("/api/v1/users/1").json()["name"] == "New"
+
+
+def test_cache_stats_endpoint(client):
+    """Test cache counters are exposed"""
+    client.get("/api/v1/products/1")
+    data = client.get("/cache/stats").json()
+    assert data["backend"] == "memory"
+    assert data["misses"] == 1
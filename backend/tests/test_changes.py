@@ -0,0 +1,141 @@
+"""Test the change feeds and their delete tombstones"""
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+from sqlmodel import select
+
+from app import changes
+from app.changes import change_events, encode_since, parse_since, prune_tombstones
+from app.models.models import Product, ProductRead, Tombstone
+
+
+def _seed_products(session, count):
+    stamp = datetime(2024, 1, 1)
+    for i in range(count):
+        session.add(Product(name=f"Item {i}", description="d", price=1.0,
+                            created_at=stamp, updated_at=stamp + timedelta(minutes=i)))
+    session.commit()
+
+
+def test_incremental_sync_sees_updates_and_deletes(session, client, monkeypatch):
+    """Test a consumer catches up with upserts and deletes after its cursor"""
+    monkeypatch.setattr(changes, "CHANGES_SETTLE_SECONDS", 0)
+    _seed_products(session, 3)
+
+    first = client.get("/api/v1/products/changes").json()
+    assert [(change["op"], change["id"]) for change in first["changes"]] == [
+        ("upsert", 1), ("upsert", 2), ("upsert", 3)]
+    assert first["changes"][0]["data"]["name"] == "Item 0"
+    assert first["has_more"] is False
+
+    client.put("/api/v1/products/2", json={"name": "Renamed", "description": "d", "price": 2.0})
+    assert client.delete("/api/v1/products/3").status_code == 204
+    assert len(session.exec(select(Tombstone)).all()) == 1
+
+    second = client.get("/api/v1/products/changes", params={"since": first["cursor"]}).json()
+    assert [(change["op"], change["id"]) for change in second["changes"]] == [
+        ("upsert", 2), ("delete", 3)]
+    assert second["changes"][0]["data"]["name"] == "Renamed"
+
+    idle = client.get("/api/v1/products/changes", params={"since": second["cursor"]}).json()
+    assert idle["changes"] == []
+    assert parse_since(idle["cursor"])[:2] == parse_since(second["cursor"])[:2]
+
+
+def test_changes_pages_with_limit(session, client, monkeypatch):
+    """Test has_more and the cursor walk the backlog page by page"""
+    monkeypatch.setattr(changes, "CHANGES_SETTLE_SECONDS", 0)
+    _seed_products(session, 5)
+
+    seen, since = [], None
+    while True:
+        page = client.get("/api/v1/products/changes",
+                          params={"limit": 2, **({"since": since} if since else {})}).json()
+        seen += [change["id"] for change in page["changes"]]
+        since = page["cursor"]
+        if not page["has_more"]:
+            break
+    assert seen == [1, 2, 3, 4, 5]
+
+
+def test_bulk_upsert_batches_are_not_lost_behind_cursor(session, client, monkeypatch):
+    """Test rows updated in a later bulk batch sort after cursors handed out meanwhile"""
+    monkeypatch.setattr(changes, "CHANGES_SETTLE_SECONDS", 0)
+    client.post("/api/v1/users/", json={"name": "Ada", "email": "ada@example.com"})
+    cursor = client.get("/api/v1/users/changes").json()["cursor"]
+    seen = []
+    commit = session.commit
+
+    def commit_then_poll():
+        nonlocal cursor
+        commit()
+        page = client.get("/api/v1/users/changes", params={"since": cursor}).json()
+        seen.extend((change["id"], change["data"]["name"]) for change in page["changes"])
+        cursor = page["cursor"]
+
+    monkeypatch.setattr(session, "commit", commit_then_poll)
+    response = client.post("/api/v1/users/bulk", params={"batch_size": 1}, json=[
+        {"name": "Grace", "email": "grace@example.com"},
+        {"name": "Ada Lovelace", "email": "ada@example.com"},
+    ])
+    assert response.json()["processed"] == 2
+    assert seen == [(2, "Grace"), (1, "Ada Lovelace")]
+
+
+def test_changes_wait_for_settle_window(client):
+    """Test rows stamped just now are held back until in-flight commits have landed"""
+    client.post("/api/v1/users/", json={"name": "Fresh", "email": "fresh@example.com"})
+    assert client.get("/api/v1/users/changes").json()["changes"] == []
+
+
+def test_changes_reject_invalid_cursor(client):
+    """Test a malformed since cursor is a client error"""
+    assert client.get("/api/v1/products/changes", params={"since": "nope"}).status_code == 400
+    since = encode_since((datetime(2024, 1, 1), True), None)
+    assert client.get("/api/v1/products/changes", params={"since": since}).status_code == 400
+
+
+def test_tombstones_are_pruned_after_retention(session, client, monkeypatch):
+    """Test old tombstones are deleted, and cursors not caught up since then must resync"""
+    monkeypatch.setattr(changes, "CHANGES_SETTLE_SECONDS", 0)
+    monkeypatch.setattr(changes, "CHANGES_TOMBSTONE_RETENTION_DAYS", 30)
+    now = datetime.utcnow()
+    session.add(Tombstone(entity="products", entity_id=1, deleted_at=now - timedelta(days=31)))
+    session.add(Tombstone(entity="products", entity_id=2, deleted_at=now - timedelta(days=1)))
+    session.commit()
+
+    assert prune_tombstones(session) == 1
+    assert [t.entity_id for t in session.exec(select(Tombstone)).all()] == [2]
+
+    fresh = client.get("/api/v1/products/changes").json()
+    assert [change["id"] for change in fresh["changes"]] == [2]
+    assert client.get("/api/v1/products/changes",
+                      params={"since": fresh["cursor"]}).status_code == 200
+
+    stale = encode_since(None, None, now - timedelta(days=31))
+    for path in ("/api/v1/products/changes", "/api/v1/products/changes/stream"):
+        response = client.get(path, params={"since": stale})
+        assert response.status_code == 410
+    legacy = encode_since(None, (now - timedelta(days=31), 1))
+    assert client.get("/api/v1/products/changes", params={"since": legacy}).status_code == 410
+
+
+def test_change_events_stream_batches(session, monkeypatch):
+    """Test the SSE generator emits batches with resumable ids"""
+    monkeypatch.setattr(changes, "CHANGES_SETTLE_SECONDS", 0)
+    _seed_products(session, 2)
+
+    async def first_event():
+        events = change_events(session, Product, ProductRead, None, poll_seconds=0)
+        try:
+            return await events.__anext__()
+        finally:
+            await events.aclose()
+
+    event = asyncio.run(first_event()).decode()
+    lines = event.strip().split("\n")
+    assert lines[0].startswith("id: ") and lines[1] == "event: changes"
+    payload = json.loads(lines[2][len("data: "):])
+    assert [change["id"] for change in payload["changes"]] == [1, 2]
+    assert payload["cursor"] == lines[0][len("id: "):]
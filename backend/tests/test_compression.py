@@ -0,0 +1,127 @@
+"""Test negotiated response compression"""
+import gzip
+import io
+import json
+
+import anyio
+import brotli
+import pytest
+from fastapi.testclient import TestClient
+from starlette.responses import Response, StreamingResponse
+
+from app.compression import CompressionMiddleware, negotiate
+from app.models.models import Product
+
+
+def _seed(session, count=40):
+    session.add_all([
+        Product(name=f"Product {i}", description="A fairly long description " * 4, price=9.5)
+        for i in range(count)
+    ])
+    session.commit()
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0.5, gzip;q=0.9", "gzip"),
+    ("br;q=0, gzip;q=0", None),
+    ("*", "br"),
+    ("identity", None),
+])
+def test_negotiate(header, expected):
+    """Test Accept-Encoding parsing honours q-values and prefers brotli on ties"""
+    assert negotiate(header) == expected
+
+
+def test_large_list_is_compressed(session, client):
+    """Test a list response above the threshold is gzip encoded with a weak ETag"""
+    _seed(session)
+    response = client.get("/api/v1/products/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"].startswith('W/"')
+    assert len(response.json()) == 40
+
+    etag = response.headers["etag"]
+    revalidated = client.get(
+        "/api/v1/products/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+    )
+    assert revalidated.status_code == 304
+    assert "content-encoding" not in revalidated.headers
+
+
+def test_small_response_is_not_compressed(client):
+    """Test bodies below the minimum size are sent as is"""
+    response = client.get("/health", headers={"Accept-Encoding": "gzip, br"})
+    assert "content-encoding" not in response.headers
+
+
+def test_export_stream_is_compressed_per_chunk(session, client):
+    """Test a streamed export is brotli encoded and decodes to the full stream"""
+    _seed(session, 5)
+    response = client.get("/api/v1/products/export", headers={"Accept-Encoding": "br"})
+    assert response.headers["content-encoding"] == "br"
+    assert "content-length" not in response.headers
+    lines = response.text.strip().split("\n")
+    assert [json.loads(line)["name"] for line in lines] == [f"Product {i}" for i in range(5)]
+
+
+def _app(response):
+    async def app(scope, receive, send):
+        await response(scope, receive, send)
+    return CompressionMiddleware(app, minimum_size=10)
+
+
+def test_stream_chunks_are_flushed_without_buffering():
+    """Test every streamed chunk is emitted as soon as it is compressed"""
+    sent = []
+
+    async def body():
+        for i in range(3):
+            yield f"chunk {i}\n".encode() * 50
+
+    app = _app(StreamingResponse(body(), media_type="text/plain"))
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "headers": [(b"accept-encoding", b"gzip")]}
+    anyio.run(app, scope, receive, send)
+
+    chunks = [m["body"] for m in sent if m["type"] == "http.response.body" and m["body"]]
+    assert len(chunks) >= 3
+    # Each sync-flushed prefix is decodable before the stream ends
+    partial = gzip.GzipFile(fileobj=io.BytesIO(b"".join(chunks[:1])))
+    assert partial.read1(1000).startswith(b"chunk 0")
+    assert gzip.decompress(b"".join(chunks)) == b"".join(
+        f"chunk {i}\n".encode() * 50 for i in range(3)
+    )
+
+
+def test_already_encoded_response_passes_through():
+    """Test a response with its own Content-Encoding is left alone"""
+    payload = brotli.compress(b"x" * 100)
+    app = _app(Response(payload, headers={"Content-Encoding": "br"}))
+    response = TestClient(app).get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.content == b"x" * 100
+
+
+def test_compressed_etag_satisfies_if_match(session, client):
+    """Test the weak ETag of a gzip response can be sent back in If-Match"""
+    session.add(Product(name="Large", description="x" * 2000, price=1.0))
+    session.commit()
+    response = client.get("/api/v1/products/1", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"1-')
+
+    body = {"name": "Large", "description": "y" * 2000, "price": 2.0}
+    updated = client.put("/api/v1/products/1", json=body, headers={"If-Match": etag})
+    assert updated.status_code == 200
+    stale = client.put("/api/v1/products/1", json=body, headers={"If-Match": etag})
+    assert stale.status_code == 412
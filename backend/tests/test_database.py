@@ -1,5 +1,18 @@
 """Test database utilities"""
-from app.database import get_session
+import asyncio
+import sqlite3
+import time
+
+from sqlalchemy import create_engine, event, exc, inspect, text
+from sqlalchemy.pool import QueuePool, StaticPool
+from sqlmodel import Session, SQLModel
+
+from app import database
+from app.database import get_session, ping_idle_connections
+from app.models.models import Product
+from app.readiness import startup_state
+import main
+from main import app
 
 
 def test_get_session():
@@ -12,3 +25,146 @@ def test_get_session():
         next(session_gen)
     except StopIteration:
         pass  # Expected behavior
+
+
+def _counting_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool)
+    SQLModel.metadata.create_all(engine)
+    checkouts = []
+    event.listen(engine, "checkout", lambda *args: checkouts.append(1))
+    return engine, checkouts
+
+
+def test_idle_ping_only_after_idle_threshold(tmp_path, monkeypatch):
+    """Test connections are pinged on checkout only once they sat idle long enough"""
+    engine, _ = _counting_engine(tmp_path)
+    pings = []
+    monkeypatch.setattr(engine.dialect, "do_ping", lambda conn: pings.append(conn) or True)
+    ping_idle_connections(engine, idle_seconds=30)
+
+    clock = [1000.0]
+    monkeypatch.setattr(database.time, "monotonic", lambda: clock[0])
+    for _ in range(3):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    assert pings == []
+
+    clock[0] += 31
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert len(pings) == 1
+
+
+def test_failed_idle_ping_replaces_connection(tmp_path, monkeypatch):
+    """Test a stale connection is discarded and a fresh one handed out"""
+    engine, _ = _counting_engine(tmp_path)
+    ping_idle_connections(engine, idle_seconds=0)
+    with engine.connect() as conn:
+        stale = conn.connection.dbapi_connection
+
+    def broken_ping(dbapi_connection):
+        if dbapi_connection is stale:
+            raise sqlite3.OperationalError("server closed the connection")
+        return True
+
+    monkeypatch.setattr(engine.dialect, "do_ping", broken_ping)
+    time.sleep(0.01)
+    with engine.connect() as conn:
+        assert conn.connection.dbapi_connection is not stale
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_requests_without_sql_take_no_connection(tmp_path, session, client):
+    """Test cached reads and rejected requests never check out a pooled connection"""
+    engine, checkouts = _counting_engine(tmp_path)
+
+    def lazy_session():
+        with Session(engine) as lazy:
+            yield lazy
+
+    session.add(Product(name="Cached", description="d", price=1.0))
+    session.commit()
+    assert client.get("/api/v1/products/1").status_code == 200  # fills the cache
+
+    app.dependency_overrides[get_session] = lazy_session
+    assert client.get("/api/v1/products/1").status_code == 200
+    assert client.post("/api/v1/products/", json={"name": "No price"}).status_code == 422
+    assert client.get("/api/v1/products/", params={"limit": 0}).status_code == 422
+    assert checkouts == []
+
+
+def test_init_db_is_idempotent(tmp_path):
+    """Test schema creation can run repeatedly, as every worker start does"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    database.init_db(engine)
+    database.init_db(engine)
+    with engine.connect() as conn:
+        tables = {row[0] for row in conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'table'"))}
+    assert {"users", "products"} <= tables
+
+
+def test_init_db_adds_indexes_missing_from_existing_tables():
+    """Test indexes added to a model after its table exists are created on the next init"""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    database.init_db(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_products_price_id"))
+        conn.execute(text("DROP INDEX ix_tombstones_entity_deleted_at_id"))
+
+    database.init_db(engine)
+    names = {index["name"] for table in ("products", "tombstones")
+             for index in inspect(engine).get_indexes(table)}
+    assert {"ix_products_price_id", "ix_tombstones_entity_deleted_at_id"} <= names
+
+
+def test_create_schema_retries_until_database_is_reachable(monkeypatch):
+    """Test an unreachable database delays schema creation instead of failing startup"""
+    attempts = []
+
+    def flaky_init_db(bind=None):
+        attempts.append(bind)
+        if len(attempts) < 3:
+            raise exc.OperationalError("connect", {}, ConnectionRefusedError())
+
+    monkeypatch.setattr(database, "init_db", flaky_init_db)
+    asyncio.run(database.create_schema(retry_seconds=0))
+    assert len(attempts) == 3
+
+
+def test_lifespan_creates_schema_before_reporting_started(monkeypatch):
+    """Test import does no DDL and the startup probe waits for the schema task"""
+    created = asyncio.Event()
+    release = None
+
+    async def fake_create_schema():
+        await release.wait()
+        created.set()
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        async with app.router.lifespan_context(app):
+            started_early = startup_state.started
+            release.set()
+            await asyncio.wait_for(created.wait(), 1)
+            await asyncio.sleep(0)
+            return started_early, startup_state.started
+
+    monkeypatch.setattr(main, "DB_INIT_SCHEMA", True)
+    monkeypatch.setattr(main, "create_schema", fake_create_schema)
+    monkeypatch.setattr(startup_state, "started", False)
+    assert asyncio.run(scenario()) == (False, True)
+
+
+def test_schema_task_logs_unrecoverable_errors(monkeypatch, caplog):
+    """Test an error create_schema does not retry is logged and startup stays pending"""
+    def forbidden(bind=None):
+        raise exc.ProgrammingError("CREATE TABLE", {}, PermissionError("permission denied"))
+
+    monkeypatch.setattr(database, "init_db", forbidden)
+    monkeypatch.setattr(startup_state, "started", False)
+    asyncio.run(main.initialise())
+    assert startup_state.started is False
+    assert "Schema creation failed" in caplog.text
+    assert "ProgrammingError" in caplog.text
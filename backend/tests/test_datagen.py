@@ -0,0 +1,54 @@
+"""Test the synthetic data generator"""
+import csv
+
+from sqlmodel import SQLModel, create_engine, select, Session
+
+from app.datagen import (
+    Distribution, csv_chunk, generate, generate_products, generate_users,
+)
+from app.models.models import Product, User
+
+
+def test_generation_is_deterministic():
+    """Test the same seed and start row always produce the same rows"""
+    first = list(generate_products(50, 0, Distribution(seed=7)))
+    assert first == list(generate_products(50, 0, Distribution(seed=7)))
+    assert first != list(generate_products(50, 0, Distribution(seed=8)))
+
+
+def test_distribution_ratios_and_unique_emails():
+    """Test configured ratios are respected and e-mails never repeat"""
+    users = list(generate_users(2000, 0, Distribution(active_ratio=0.25)))
+    assert len({user[1] for user in users}) == 2000
+    active = sum(user[2] for user in users) / len(users)
+    assert 0.2 < active < 0.3
+
+    products = list(generate_products(2000, 0, Distribution(in_stock_ratio=1.0)))
+    assert all(product[3] for product in products)
+    assert all(product[2] > 0 for product in products)
+
+
+def test_csv_chunk_matches_copy_format():
+    """Test rows are rendered as quoted CSV with ISO timestamps"""
+    rows = list(generate_products(3))
+    parsed = list(csv.reader(csv_chunk(rows)))
+    assert len(parsed) == 3
+    assert parsed[0][0] == rows[0][0]
+    assert parsed[0][4] == rows[0][4].isoformat(sep=" ")
+
+
+def test_generate_appends_with_executemany_fallback(tmp_path):
+    """Test SQLite loads in chunks and repeated runs keep e-mails unique"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'gen.db'}")
+    SQLModel.metadata.create_all(engine)
+
+    report = generate(engine, users=25, products=10, chunk_size=7)
+    assert report["users"]["rows"] == 25
+    assert report["products"]["rows"] == 10
+    assert report["users"]["rows_per_sec"] > 0
+    generate(engine, users=25, chunk_size=7)
+
+    with Session(engine) as session:
+        emails = session.exec(select(User.email)).all()
+        assert len(emails) == len(set(emails)) == 50
+        assert len(session.exec(select(Product)).all()) == 10
@@ -0,0 +1,106 @@
+"""Test ETag generation and conditional GET handling"""
+import asyncio
+from datetime import datetime
+
+from app.etag import etag_matches, if_match_versions, row_etag
+from app.models.models import Product, User
+
+
+def test_row_etag_tracks_updated_at():
+    """Test the row ETag changes with updated_at only"""
+    stamp = datetime(2024, 1, 1, 12, 0, 0, 1)
+    assert row_etag(1, stamp) == row_etag(1, stamp)
+    assert row_etag(1, stamp) != row_etag(1, datetime(2024, 1, 1, 12, 0, 0, 2))
+    assert row_etag(1, stamp) != row_etag(2, stamp)
+
+
+def test_etag_matches_header_forms():
+    """Test list, wildcard and weak forms of If-None-Match"""
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert etag_matches('W/"b"', '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+
+def test_get_product_not_modified(session, client):
+    """Test a matching If-None-Match returns 304 on both cache miss and hit"""
+    session.add(Product(id=1, name="Tagged", description="ETag", price=3.0))
+    session.commit()
+
+    etag = client.get("/api/v1/products/1").headers["ETag"]
+    cached = client.get("/api/v1/products/1", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+
+def test_get_user_not_modified_without_cache(session, client, cache):
+    """Test 304 is answered straight from the row when nothing is cached"""
+    session.add(User(id=1, name="Tagged", email="tagged@example.com"))
+    session.commit()
+    etag = client.get("/api/v1/users/1").headers["ETag"]
+    asyncio.run(cache.clear())
+
+    response = client.get("/api/v1/users/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert cache.stats()["size"] == 0
+
+
+def test_update_product_bumps_updated_at_and_etag(session, client):
+    """Test an update changes updated_at and therefore the ETag"""
+    session.add(Product(id=1, name="Before", description="ETag", price=3.0,
+                        updated_at=datetime(2020, 1, 1)))
+    session.commit()
+    before = client.get("/api/v1/products/1")
+
+    updated = client.put(
+        "/api/v1/products/1",
+        json={"name": "After", "description": "ETag", "price": 4.0},
+    ).json()
+    assert updated["updated_at"] > before.json()["updated_at"]
+
+    response = client.get(
+        "/api/v1/products/1", headers={"If-None-Match": before.headers["ETag"]}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != before.headers["ETag"]
+
+
+def test_update_user_bumps_updated_at(session, client):
+    """Test updating a user refreshes updated_at"""
+    session.add(User(id=1, name="Old", email="old@example.com",
+                     updated_at=datetime(2020, 1, 1)))
+    session.commit()
+
+    response = client.put("/api/v1/users/1", json={"name": "New", "email": "new@example.com"})
+    assert response.json()["updated_at"] > "2020-01-01T00:00:00"
+
+
+def test_list_products_not_modified(session, client):
+    """Test list pages validate against ETags and change when rows change"""
+    session.add(Product(name="One", description="List", price=1.0))
+    session.commit()
+
+    etag = client.get("/api/v1/products/").headers["ETag"]
+    response = client.get("/api/v1/products/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    session.add(Product(name="Two", description="List", price=2.0))
+    session.commit()
+    response = client.get("/api/v1/products/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert response.headers["ETag"] != etag
+
+
+def test_if_match_versions():
+    """Test If-Match parsing into the updated_at values a write may replace"""
+    updated_at = datetime(2024, 5, 1, 12, 30, 15, 250)
+    etag = row_etag(7, updated_at)
+    assert if_match_versions(None, 7) is None
+    assert if_match_versions("*", 7) is None
+    assert if_match_versions(f'"x", {etag}', 7) == [updated_at]
+    assert if_match_versions(f"W/{etag}", 7) == [updated_at]  # weakened by compression
+    assert if_match_versions('W/"abc"', 7) == []
+    assert if_match_versions(etag, 8) == []
@@ -1,4 +1,13 @@
 """Test health endpoints"""
+import asyncio
+import time
+from fastapi.testclient import TestClient
+from main import app
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+from app.readiness import (
+    EnginePing, ReadinessProbe, get_readiness_probe, probe_connect_args, startup_state
+)
 
 def test_health_check(client):
     """Test health check endpoint"""
@@ -19,3 +28,62 @@ def test_root_endpoint(client):
     data = response.json()
     assert "message" in data
     assert "version" in data
+
+def test_readiness_database_unavailable(client):
+    """Test readiness reports 503 when the database check fails"""
+    def broken():
+        raise ConnectionError("database is down")
+
+    probe = ReadinessProbe(ttl=5, ping=broken)
+    client.app.dependency_overrides[get_readiness_probe] = lambda: probe
+    response = client.get("/readiness")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
+    assert "ConnectionError" in response.json()["message"]
+
+def test_readiness_timeout(client):
+    """Test readiness answers within its timeout even though the check blocks a thread"""
+    probe = ReadinessProbe(ttl=5, timeout=0.05, ping=lambda: time.sleep(1))
+    client.app.dependency_overrides[get_readiness_probe] = lambda: probe
+    start = time.perf_counter()
+    response = client.get("/readiness")
+    assert time.perf_counter() - start < 0.5
+    assert response.status_code == 503
+    assert response.json()["message"] == "Database check timed out"
+
+def test_readiness_result_is_cached(client):
+    """Test repeated probes within the interval reuse one database check"""
+    calls = []
+    probe = ReadinessProbe(ttl=5, ping=lambda: calls.append(1))
+    client.app.dependency_overrides[get_readiness_probe] = lambda: probe
+    for _ in range(5):
+        assert client.get("/readiness").status_code == 200
+    assert len(calls) == 1
+
+def test_engine_ping_uses_the_engines_database(tmp_path):
+    """Test the default ping reaches the database the given engine points at"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'probe.db'}")
+    ping = EnginePing(engine, timeout=1)
+    ping()
+    assert ping._unpooled.url == engine.url
+    assert isinstance(ping._unpooled.pool, NullPool)
+
+    missing = create_engine(f"sqlite:///{tmp_path / 'no' / 'such.db'}")
+    probe = ReadinessProbe(ttl=5, ping=EnginePing(missing, timeout=1))
+    assert asyncio.run(probe.check())[0] is False
+
+def test_probe_connection_is_bounded_by_driver_timeouts():
+    """Test the probe's own connection carries connect and statement timeouts"""
+    assert probe_connect_args("postgresql://db/app", 2.5) == {
+        "connect_timeout": 3, "options": "-c statement_timeout=2500"}
+    assert probe_connect_args("postgresql://db/app", 0.5)["connect_timeout"] == 2
+    assert probe_connect_args("sqlite:///app.db", 2) == {"timeout": 2}
+
+def test_startup_check():
+    """Test the startup probe flips once the lifespan has run"""
+    startup_state.started = False
+    assert TestClient(app).get("/startup").status_code == 503
+    with TestClient(app) as client:
+        response = client.get("/startup")
+    assert response.status_code == 200
+    assert response.json()["started"] is True
@@ -0,0 +1,67 @@
+"""Test metrics collection and the /metrics endpoint"""
+from sqlalchemy import create_engine, text
+
+from app.metrics import (
+    DB_POOL_WAIT, DB_QUERIES_PER_REQUEST, DB_TIME_PER_REQUEST, HTTP_REQUESTS, REGISTRY, Histogram,
+    TimedQueuePool, watch_pool,
+)
+from app.models.models import Product
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test histogram buckets are cumulative and end with +Inf"""
+    histogram = Histogram("test_latency_seconds", "Test", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, "/x")
+    lines = histogram.render()
+    assert 'test_latency_seconds_bucket{route="/x",le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{route="/x",le="1.0"} 2' in lines
+    assert 'test_latency_seconds_bucket{route="/x",le="+Inf"} 3' in lines
+    assert 'test_latency_seconds_count{route="/x"} 3' in lines
+
+
+def test_middleware_records_route_and_sql(session, client):
+    """Test requests are labelled by route template and count their SQL"""
+    session.add(Product(id=1, name="Metered", description="Metrics", price=1.0))
+    session.commit()
+    route = "/api/v1/products/{product_id}"
+    before_requests = HTTP_REQUESTS.value("GET", route, "200")
+    before_observations = DB_QUERIES_PER_REQUEST.count("GET", route)
+    before_sql = DB_QUERIES_PER_REQUEST.total("GET", route)
+    before_sql_time = DB_TIME_PER_REQUEST.total("GET", route)
+
+    client.get("/api/v1/products/1")
+
+    assert HTTP_REQUESTS.value("GET", route, "200") == before_requests + 1
+    assert DB_QUERIES_PER_REQUEST.count("GET", route) == before_observations + 1
+    # The cache is cold, so the engine events must have counted the SELECT for this request
+    assert DB_QUERIES_PER_REQUEST.total("GET", route) >= before_sql + 1
+    assert DB_TIME_PER_REQUEST.total("GET", route) > before_sql_time
+    body = client.get("/metrics").text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/products/{product_id}"}' in body
+    assert "http_requests_in_flight" in body
+    assert 'response_cache_events_total{event="hits"}' in body
+
+
+def test_unmatched_paths_share_a_label(client):
+    """Test unknown URLs do not create one series per path"""
+    client.get("/no/such/path/123")
+    assert HTTP_REQUESTS.value("GET", "<unmatched>", "404") >= 1
+
+
+def test_pool_checkout_wait_and_gauges(tmp_path):
+    """Test the timed pool records waits and exposes checked-out connections"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=TimedQueuePool, pool_size=2
+    )
+    watch_pool(engine, "test")
+    before = DB_POOL_WAIT.count("test")
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        body = REGISTRY.render()
+        assert 'db_pool_checked_out{engine="test"} 1' in body
+        assert 'db_pool_size{engine="test"} 2' in body
+
+    assert DB_POOL_WAIT.count("test") == before + 1
+    engine.dispose()
@@ -0,0 +1,80 @@
+"""Test keyset pagination helpers"""
+import pytest
+from fastapi import HTTPException
+from sqlmodel import select
+
+from app.models.models import Product
+from app.api.products import product_filters
+from app.pagination import decode_cursor, encode_cursor, keyset_page
+
+
+def test_cursor_round_trip():
+    """Test a cursor decodes back to the values it was built from"""
+    cursor = encode_cursor({"id": 42})
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == {"id": 42}
+
+
+@pytest.mark.parametrize("cursor", [
+    "%%%", "bm90IGpzb24", encode_cursor({"id": "1"}), encode_cursor({"id": True}),
+])
+def test_keyset_page_rejects_bad_cursor(cursor):
+    """Test tampered or malformed cursors are rejected with 400"""
+    with pytest.raises(HTTPException) as exc:
+        keyset_page(select(Product), Product.id, 10, cursor)
+    assert exc.value.status_code == 400
+
+
+def test_keyset_page_seeks_instead_of_offset():
+    """Test the generated SQL seeks on id and never uses OFFSET"""
+    statement = keyset_page(select(Product), Product.id, 10, encode_cursor({"id": 7}))
+    sql = str(statement.compile(compile_kwargs={"literal_binds": True}))
+    assert "products.id > 7" in sql
+    assert "ORDER BY products.id" in sql
+    assert "OFFSET" not in sql.upper()
+
+
+def test_keyset_page_sorted_seek():
+    """Test a sorted cursor seeks on (sort key, id) in the requested direction"""
+    cursor = encode_cursor({"id": 3, "s": "price", "v": 9.5})
+    statement = keyset_page(select(Product), Product.id, 10, cursor, Product.price, True)
+    sql = str(statement.compile(compile_kwargs={"literal_binds": True}))
+    assert "(products.price, products.id) < (9.5, 3)" in sql
+    assert "ORDER BY products.price DESC, products.id DESC" in sql
+
+
+@pytest.mark.parametrize("column, value", [
+    (Product.price, "abc"), (Product.price, True), (Product.name, 5), (Product.id, 1.5),
+    (Product.in_stock, 1), (Product.created_at, 5),
+])
+def test_keyset_page_rejects_cursor_value_of_wrong_type(column, value):
+    """Test a sort value that does not fit its column is a 400, not a bind error"""
+    cursor = encode_cursor({"id": 3, "s": column.key, "v": value})
+    with pytest.raises(HTTPException) as exc:
+        keyset_page(select(Product), Product.id, 10, cursor, column)
+    assert exc.value.status_code == 400
+
+
+def test_sorted_cursor_of_wrong_type_is_400(client):
+    """Test a tampered price cursor is refused by the list endpoint"""
+    cursor = encode_cursor({"id": 1, "s": "price", "v": "abc"})
+    response = client.get("/api/v1/products/", params={"sort": "price", "cursor": cursor})
+    assert response.status_code == 400
+
+
+def test_keyset_page_rejects_cursor_for_other_sort():
+    """Test a cursor issued for one sort order cannot be replayed on another"""
+    cursor = encode_cursor({"id": 3, "s": "price", "v": 9.5})
+    with pytest.raises(HTTPException) as exc:
+        keyset_page(select(Product), Product.id, 10, cursor, Product.name)
+    assert exc.value.status_code == 400
+
+
+def test_product_filters_compile_to_predicates():
+    """Test list filters become WHERE predicates rather than in-memory filtering"""
+    apply = product_filters(in_stock=True, price_min=5, price_max=20, name="Wid")
+    sql = str(apply(select(Product)).compile(compile_kwargs={"literal_binds": True}))
+    assert "products.in_stock = 1" in sql or "products.in_stock = true" in sql
+    assert "products.price >= 5" in sql
+    assert "products.price <= 20" in sql
+    assert "products.name LIKE 'Wid' || '%'" in sql
@@ -1,5 +1,16 @@
 """Test product endpoints"""
-from app.models.models import Product
+import asyncio
+import csv
+import io
+import json
+
+from sqlalchemy import event
+from sqlmodel import func, select
+from starlette.requests import Request
+
+from app import bulk
+from app.bulk import bulk_import, iter_bulk_items
+from app.models.models import Product, ProductCreate
 
 
 def test_list_products(session, client):
@@ -117,3 +128,327 @@ def test_delete_product_not_found(client):
     response = client.delete("/api/v1/products/999")
     assert response.status_code == 404
     assert response.json()["detail"] == "Product not found"
+
+
+def test_list_products_pagination(session, client):
+    """Test walking products page by page with the cursor header"""
+    for i in range(5):
+        session.add(Product(name=f"Product {i}", description="Paged", price=10.0 + i))
+    session.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/products/", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 2
+        seen.extend(p["id"] for p in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen == sorted(seen)
+    assert len(seen) == 5
+
+
+def test_list_products_invalid_cursor(client):
+    """Test list products with a malformed cursor"""
+    response = client.get("/api/v1/products/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_list_products_limit_cap(client):
+    """Test list products rejects limits above the cap"""
+    response = client.get("/api/v1/products/", params={"limit": 100000})
+    assert response.status_code == 422
+
+
+def test_export_products_ndjson(session, client):
+    """Test streaming products as NDJSON"""
+    for i in range(3):
+        session.add(Product(name=f"Export {i}", description="Exported", price=5.0 + i))
+    session.commit()
+
+    response = client.get("/api/v1/products/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = response.text.splitlines()
+    assert len(lines) == 3
+    first = json.loads(lines[0])
+    assert first["name"] == "Export 0"
+    assert list(first) == list(client.get(f"/api/v1/products/{first['id']}").json())
+
+
+def test_export_products_csv(session, client):
+    """Test streaming products as CSV with a header row"""
+    session.add(Product(name="Csv, Product", description="Quoted", price=12.5))
+    session.commit()
+
+    response = client.get("/api/v1/products/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0][:3] == ["name", "description", "price"]
+    assert rows[1][0] == "Csv, Product"
+    assert len(rows) == 2
+
+
+def test_export_products_invalid_format(client):
+    """Test export rejects unknown formats"""
+    response = client.get("/api/v1/products/export", params={"format": "xml"})
+    assert response.status_code == 422
+
+
+def test_bulk_create_products(session, client):
+    """Test bulk creating products with per-row errors"""
+    payload = [
+        {"name": "Bulk 1", "description": "First", "price": 1.5},
+        {"name": "Bulk 2", "description": "Second"},
+        {"name": "Bulk 3", "description": "Third", "price": 3.5},
+    ]
+    response = client.post("/api/v1/products/bulk", params={"batch_size": 2}, json=payload)
+    assert response.status_code == 200
+    result = response.json()
+    assert result["processed"] == 2
+    assert result["failed"] == 1
+    assert result["errors"][0]["index"] == 1
+    assert result["errors"][0]["detail"][0]["loc"] == ["price"]
+
+    names = [p["name"] for p in client.get("/api/v1/products/").json()]
+    assert names == ["Bulk 1", "Bulk 3"]
+
+
+def test_bulk_create_products_ndjson(client):
+    """Test bulk creating products from an NDJSON stream"""
+    body = "\n".join([
+        json.dumps({"name": "Line 1", "description": "ndjson", "price": 2.0}),
+        "{not json",
+        json.dumps({"name": "Line 3", "description": "ndjson", "price": 4.0}),
+    ])
+    response = client.post(
+        "/api/v1/products/bulk",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["processed"] == 2
+    assert result["errors"] == [{"index": 1, "detail": "Invalid JSON"}]
+
+
+def test_bulk_create_products_rejects_non_array(client):
+    """Test bulk create requires a JSON array body"""
+    response = client.post("/api/v1/products/bulk", json={"name": "Not a list"})
+    assert response.status_code == 400
+
+
+def test_bulk_ndjson_is_written_while_it_streams(session):
+    """Test NDJSON batches are written as lines arrive, with lines split across chunks"""
+    lines = b"".join(
+        json.dumps({"name": f"Row {i}", "description": "d", "price": 1.0}).encode() + b"\n"
+        for i in range(5)
+    )
+    chunks = [lines[:30], lines[30:130], lines[130:]]
+    stored_before_chunk = []
+
+    async def receive():
+        stored_before_chunk.append(session.exec(select(func.count(Product.id))).one())
+        chunk = chunks.pop(0)
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    scope = {"type": "http", "method": "POST", "path": "/",
+             "headers": [(b"content-type", b"application/x-ndjson")]}
+    request = Request(scope, receive)
+    result = asyncio.run(
+        bulk_import(session, iter_bulk_items(request), ProductCreate, Product, batch_size=2)
+    )
+    assert result.processed == 5
+    assert stored_before_chunk == [0, 0, 2]
+    assert [p.name for p in session.exec(select(Product))] == [f"Row {i}" for i in range(5)]
+
+
+def test_bulk_body_limits(client, monkeypatch):
+    """Test buffered JSON arrays and single NDJSON lines are capped with 413"""
+    monkeypatch.setattr(bulk, "BULK_MAX_BODY_BYTES", 100)
+    payload = [{"name": f"Bulk {i}", "description": "d", "price": 1.0} for i in range(5)]
+    assert client.post("/api/v1/products/bulk", json=payload).status_code == 413
+
+    ndjson = "\n".join(json.dumps(item) for item in payload)
+    response = client.post("/api/v1/products/bulk", content=ndjson,
+                           headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.json()["processed"] == 5
+
+    long_line = json.dumps({"name": "x" * 200, "description": "d", "price": 1.0})
+    response = client.post("/api/v1/products/bulk", content=long_line,
+                           headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 413
+
+
+def test_list_products_filter_and_sort(session, client):
+    """Test filtering by stock and price range, sorted by price descending"""
+    session.add_all([
+        Product(name="Cheap", description="d", price=2.0),
+        Product(name="Mid", description="d", price=10.0),
+        Product(name="Dear", description="d", price=50.0),
+        Product(name="Gone", description="d", price=12.0, in_stock=False),
+    ])
+    session.commit()
+
+    response = client.get(
+        "/api/v1/products/",
+        params={"in_stock": True, "price_min": 5, "sort": "-price", "limit": 1},
+    )
+    assert response.status_code == 200
+    assert [p["name"] for p in response.json()] == ["Dear"]
+
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(
+        "/api/v1/products/",
+        params={"in_stock": True, "price_min": 5, "sort": "-price", "cursor": cursor},
+    )
+    assert [p["name"] for p in response.json()] == ["Mid"]
+    assert "X-Next-Cursor" not in response.headers
+
+    response = client.get("/api/v1/products/", params={"sort": "name", "cursor": cursor})
+    assert response.status_code == 400
+
+
+def test_list_products_name_prefix(session, client):
+    """Test the name filter matches prefixes and treats wildcards literally"""
+    session.add_all([
+        Product(name="Widget", description="d", price=1.0),
+        Product(name="Wid%get", description="d", price=1.0),
+        Product(name="Gadget", description="d", price=1.0),
+    ])
+    session.commit()
+
+    names = [p["name"] for p in client.get("/api/v1/products/", params={"name": "Wid"}).json()]
+    assert names == ["Widget", "Wid%get"]
+    names = [p["name"] for p in client.get("/api/v1/products/", params={"name": "Wid%"}).json()]
+    assert names == ["Wid%get"]
+
+
+def test_list_products_fields_projection(session, client):
+    """Test fields= returns only the requested keys"""
+    session.add(Product(name="Slim", description="d", price=3.0))
+    session.commit()
+
+    response = client.get("/api/v1/products/", params={"fields": "price,name"})
+    assert response.status_code == 200
+    assert response.json() == [{"name": "Slim", "price": 3.0}]
+    etag = response.headers["ETag"]
+
+    response = client.get(
+        "/api/v1/products/", params={"fields": "price,name"}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+
+def test_list_products_invalid_sort_and_fields(client):
+    """Test unknown sort keys and fields are rejected"""
+    assert client.get("/api/v1/products/", params={"sort": "description"}).status_code == 422
+    response = client.get("/api/v1/products/", params={"fields": "name,secret"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown field(s): secret"
+
+
+def test_update_product_single_statement_with_if_match(session, client):
+    """Test PUT is one UPDATE ... RETURNING honouring If-Match"""
+    session.add(Product(name="Versioned", description="v1", price=5.0))
+    session.commit()
+    etag = client.get("/api/v1/products/1").headers["ETag"]
+    body = {"name": "Versioned", "description": "v2", "price": 6.0}
+
+    statements = []
+    engine = session.get_bind()
+    record = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.put("/api/v1/products/1", json=body, headers={"If-Match": etag})
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert response.status_code == 200
+    assert response.json()["description"] == "v2"
+    assert response.headers["ETag"] != etag
+    assert len(statements) == 1
+    assert statements[0].startswith("UPDATE products") and "RETURNING" in statements[0]
+
+    # The old ETag is now stale: a second writer must not clobber the update
+    stale = client.put("/api/v1/products/1", json={**body, "description": "v3"},
+                       headers={"If-Match": etag})
+    assert stale.status_code == 412
+    assert client.get("/api/v1/products/1").json()["description"] == "v2"
+
+    missing = client.put("/api/v1/products/2", json=body, headers={"If-Match": etag})
+    assert missing.status_code == 404
+
+
+def test_update_product_responds_with_the_stored_row(session, client):
+    """Test the PUT body is byte-identical to a following GET, whole-number prices included"""
+    session.add(Product(name="Whole", description="d", price=5.0))
+    session.commit()
+
+    updated = client.put("/api/v1/products/1",
+                         json={"name": "Whole", "description": "d", "price": 7})
+    assert updated.status_code == 200
+    assert updated.content == client.get("/api/v1/products/1").content
+    assert b'"price":7.0' in updated.content
+
+
+def test_delete_product_if_match(session, client):
+    """Test DELETE honours If-Match and reports stale versions with 412"""
+    session.add(Product(name="Doomed", description="d", price=5.0))
+    session.commit()
+    etag = client.get("/api/v1/products/1").headers["ETag"]
+
+    assert client.delete("/api/v1/products/1", headers={"If-Match": '"1-0"'}).status_code == 412
+    assert client.delete("/api/v1/products/1", headers={"If-Match": etag}).status_code == 204
+    assert client.get("/api/v1/products/1").status_code == 404
+
+
+def test_batch_get_products_by_ids(session, client):
+    """Test ?ids= returns the rows in request order with one query"""
+    for i in range(5):
+        session.add(Product(name=f"Batch {i}", description="b", price=1.0 + i))
+    session.commit()
+
+    statements = []
+    engine = session.get_bind()
+    record = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/api/v1/products/", params={"ids": "4,99,2,4,1"})
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert response.status_code == 200
+    assert [product["id"] for product in response.json()] == [4, 2, 1]
+    assert response.headers["X-Missing-Ids"] == "99"
+    assert len(statements) == 1
+
+    response = client.post("/api/v1/products/batch-get", json={"ids": [3, 7, 5]})
+    assert response.status_code == 200
+    body = response.json()
+    assert [product["name"] for product in body["items"]] == ["Batch 2", "Batch 4"]
+    assert body["missing"] == [7]
+
+
+def test_batch_get_products_rejects_bad_requests(client):
+    """Test malformed ids and oversized batches are refused"""
+    assert client.get("/api/v1/products/", params={"ids": "1,x"}).status_code == 400
+    for ids in ("1,99999999999999999999", "0", "-3"):
+        assert client.get("/api/v1/products/", params={"ids": ids}).status_code == 400
+    for ids in ([99999999999999999999], [2**63], [0]):
+        response = client.post("/api/v1/products/batch-get", json={"ids": ids})
+        assert response.status_code == 422
+    assert client.post("/api/v1/products/batch-get", json={"ids": [2**63 - 1]}).json() == {
+        "items": [], "missing": [2**63 - 1]}
+    response = client.post("/api/v1/products/batch-get", json={"ids": list(range(1, 1002))})
+    assert response.status_code == 400
+    assert client.post("/api/v1/products/batch-get", json={"ids": []}).json() == {
+        "items": [], "missing": []}
@@ -0,0 +1,103 @@
+"""Test opt-in SQL profiling"""
+import logging
+
+from sqlalchemy import event
+from sqlmodel import select
+
+from app import profiling
+from app.models.models import Product
+from app.profiling import SqlProfile, current_profile, report
+
+
+def _profiled(session, profile, fn):
+    token = current_profile.set(profile)
+    try:
+        fn()
+    finally:
+        current_profile.reset(token)
+    return profile
+
+
+def test_profiling_is_off_without_token(client, monkeypatch):
+    """Test the header is ignored unless it carries the configured token"""
+    assert "server-timing" not in client.get("/api/v1/products/").headers
+    monkeypatch.setattr(profiling, "SQL_PROFILE_TOKEN", "secret")
+    response = client.get("/api/v1/products/", headers={"X-SQL-Profile": "guess"})
+    assert "server-timing" not in response.headers
+
+
+def test_profiled_request_returns_server_timing(session, client, monkeypatch):
+    """Test a profiled request reports the db/serialize/total split"""
+    monkeypatch.setattr(profiling, "SQL_PROFILE_TOKEN", "secret")
+    session.add(Product(name="Timed", description="t", price=1.0))
+    session.commit()
+
+    response = client.get("/api/v1/products/", headers={"X-SQL-Profile": "secret"})
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    assert timing.startswith('db;dur=') and 'desc="1 queries"' in timing
+    assert "serialize;dur=" in timing and "total;dur=" in timing
+
+
+def test_sampled_requests_are_profiled(client, monkeypatch):
+    """Test SQL_PROFILE_SAMPLE_RATE profiles requests without any header"""
+    monkeypatch.setattr(profiling, "SQL_PROFILE_SAMPLE_RATE", 1.0)
+    assert "server-timing" in client.get("/api/v1/users/").headers
+
+
+def test_repeated_statements_are_flagged_as_n_plus_one(session, caplog):
+    """Test one statement per row in a loop is reported as N+1"""
+    for i in range(4):
+        session.add(Product(name=f"N{i}", description="n", price=1.0))
+    session.commit()
+    session.expire_all()
+
+    def lazy_loop():
+        for product_id in range(1, 5):
+            session.get(Product, product_id)
+
+    profile = _profiled(session, SqlProfile(n_plus_one_threshold=3), lazy_loop)
+    assert len(profile.queries) == 4
+    assert profile.queries[0].parameters == ["int"]
+    [pattern] = profile.n_plus_one()
+    assert pattern["count"] == 4 and pattern["statement"].startswith("SELECT products.")
+
+    with caplog.at_level(logging.INFO, logger="app.profiling"):
+        report(profile, "GET", "/loop", 1.0)
+    assert any("Possible N+1 in GET /loop: 4 x SELECT" in message for message in caplog.messages)
+
+
+def test_failed_explain_rolls_back_to_a_savepoint(session):
+    """Test a failing EXPLAIN leaves the request's transaction and its writes intact"""
+    statements = []
+
+    def fail_explain(conn, cursor, statement, *args):
+        statements.append(statement)
+        if statement.startswith("EXPLAIN"):
+            raise RuntimeError("no plan")
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", fail_explain)
+    try:
+        def write():
+            session.add(Product(name="Kept", description="k", price=1.0))
+            session.flush()
+        profile = _profiled(session, SqlProfile(slow_query_ms=0), write)
+        session.commit()
+    finally:
+        event.remove(engine, "before_cursor_execute", fail_explain)
+
+    [query] = profile.queries
+    assert query.statement.startswith("INSERT") and query.plan == "EXPLAIN failed: RuntimeError"
+    assert [statement.split()[0] for statement in statements[1:]] == [
+        "SAVEPOINT", "EXPLAIN", "ROLLBACK"]
+    assert session.exec(select(Product.name)).all() == ["Kept"]
+
+
+def test_slow_queries_are_explained(session):
+    """Test statements over the threshold carry their query plan"""
+    profile = _profiled(session, SqlProfile(slow_query_ms=0),
+                        lambda: session.exec(Product.__table__.select().where(
+                            Product.__table__.c.price > 1)).all())
+    [query] = profile.slow_queries()
+    assert "SCAN" in query.plan or "SEARCH" in query.plan
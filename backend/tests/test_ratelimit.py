@@ -0,0 +1,119 @@
+"""Test token-bucket rate limiting backends and middleware"""
+import asyncio
+
+import fakeredis.aioredis
+
+from app import ratelimit
+from app.metrics import HTTP_REJECTED
+from app.ratelimit import MemoryRateLimiter, RedisRateLimiter, client_key
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _drain(limiter, key, count):
+    async def scenario():
+        return [await limiter.acquire(key) for _ in range(count)]
+    return asyncio.run(scenario())
+
+
+def test_memory_bucket_allows_burst_then_refills():
+    """Test a full bucket admits `burst` requests, then one per 1/rate seconds"""
+    clock = FakeClock()
+    limiter = MemoryRateLimiter(rate=10, burst=3, clock=clock)
+
+    assert _drain(limiter, "a", 4) == [0, 0, 0, 0.1]
+    assert _drain(limiter, "b", 1) == [0]  # buckets are per client
+    clock.now += 0.1
+    assert _drain(limiter, "a", 2)[0] == 0
+    assert limiter.stats()["limited"] == 2
+
+
+def test_memory_bucket_forgets_least_recent_clients():
+    """Test the number of tracked clients stays bounded"""
+    limiter = MemoryRateLimiter(rate=1, burst=1, max_clients=2, clock=FakeClock())
+    _drain(limiter, "a", 1)
+    _drain(limiter, "b", 1)
+    _drain(limiter, "c", 1)
+    assert limiter.stats()["clients"] == 2
+    assert _drain(limiter, "a", 1) == [0]
+
+
+def test_redis_bucket_against_fake():
+    """Test the Lua token bucket shared through a Redis-compatible server"""
+    clock = FakeClock()
+    client = fakeredis.aioredis.FakeRedis()
+    first = RedisRateLimiter(client, rate=10, burst=2, clock=clock)
+    second = RedisRateLimiter(client, rate=10, burst=2, clock=clock)
+
+    async def scenario():
+        results = [await first.acquire("a"), await second.acquire("a"), await first.acquire("a")]
+        clock.now += 0.1
+        results.append(await second.acquire("a"))
+        return results, await client.pttl("ratelimit:a")
+
+    results, ttl = asyncio.run(scenario())
+    assert results[:2] == [0, 0]
+    assert abs(results[2] - 0.1) < 1e-9  # the second worker spent the shared bucket
+    assert results[3] == 0
+    assert 0 < ttl <= 1200
+
+
+def test_redis_bucket_fails_open():
+    """Test requests are allowed when the server cannot be reached"""
+    class BrokenScript:
+        async def __call__(self, keys, args):
+            raise ConnectionError("refused")
+
+    class BrokenClient:
+        def register_script(self, script):
+            return BrokenScript()
+
+    limiter = RedisRateLimiter(BrokenClient(), rate=1, burst=1)
+    assert _drain(limiter, "a", 3) == [0, 0, 0]
+    assert limiter.stats()["errors"] == 3
+
+
+def test_client_key_prefers_configured_header():
+    """Test clients are keyed by the first X-Forwarded-For entry, else the peer address"""
+    scope = {"headers": [(b"x-forwarded-for", b"203.0.113.7, 10.0.0.1")],
+             "client": ("10.0.0.1", 5000)}
+    assert client_key(scope, "X-Forwarded-For") == "203.0.113.7"
+    assert client_key(scope, "") == "10.0.0.1"
+
+
+def test_middleware_returns_429_with_retry_after(client, monkeypatch):
+    """Test an empty bucket is answered before the route runs, probes stay exempt"""
+    limiter = MemoryRateLimiter(rate=0.5, burst=2)
+    monkeypatch.setattr(ratelimit, "rate_limiter", limiter)
+    before = HTTP_REJECTED.value("rate_limited")
+
+    statuses = [client.get("/api/v1/products/").status_code for _ in range(3)]
+    limited = client.get("/api/v1/products/")
+
+    assert statuses == [200, 200, 429]
+    assert limited.headers["retry-after"] == "2"
+    assert limited.json() == {"detail": "Too many requests"}
+    assert client.get("/health").status_code == 200
+    assert HTTP_REJECTED.value("rate_limited") == before + 2
+
+
+def test_rejections_carry_cors_headers_and_preflights_are_free(client, monkeypatch):
+    """Test browsers can read a 429's Retry-After, and preflights never spend tokens"""
+    monkeypatch.setattr(ratelimit, "rate_limiter", MemoryRateLimiter(rate=0.5, burst=2))
+    origin = {"Origin": "http://localhost:3000"}
+    preflight = {**origin, "Access-Control-Request-Method": "PUT"}
+    for _ in range(3):
+        assert client.options("/api/v1/products/1", headers=preflight).status_code == 200
+
+    assert client.get("/api/v1/products/", headers=origin).status_code == 200
+    assert client.get("/api/v1/products/", headers=origin).status_code == 200
+    limited = client.get("/api/v1/products/", headers=origin)
+    assert limited.status_code == 429
+    assert limited.headers["access-control-allow-origin"] == "http://localhost:3000"
+    assert "retry-after" in limited.headers["access-control-expose-headers"].lower()
@@ -0,0 +1,105 @@
+"""Test read-replica routing against SQLite stand-ins"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, select
+
+from app import replicas
+from app.models.models import Product
+from main import app
+from app.replicas import STICKY_COOKIE, Replica, ReplicaSet, RoutingSession
+
+
+def _stand_in(label):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False},
+                           poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Product(name=label, description="stand-in", price=1.0))
+        session.commit()
+    return engine
+
+
+@pytest.fixture(name="replica_set")
+def replica_set_fixture(session, monkeypatch):
+    session.add(Product(name="primary", description="source of truth", price=1.0))
+    session.commit()
+    lags = {}
+    replica_set = ReplicaSet(
+        [Replica(f"replica-{i}", _stand_in(f"replica-{i}")) for i in range(2)],
+        max_lag=5,
+        lag_probe=lambda engine: lags.get(engine, 0.0),
+    )
+    replica_set.lags = lags
+    monkeypatch.setattr(replicas, "replica_set", replica_set)
+    return replica_set
+
+
+def _served_by(client):
+    return client.get("/api/v1/products/").json()[0]["name"]
+
+
+def test_reads_round_robin_across_replicas(replica_set, client):
+    """Test list reads alternate between replicas and never hit the primary"""
+    assert [_served_by(client) for _ in range(4)] == [
+        "replica-0", "replica-1", "replica-0", "replica-1"
+    ]
+
+
+def test_write_makes_client_sticky_to_primary(replica_set, client):
+    """Test a client reads its own writes from the primary after writing"""
+    response = client.post(
+        "/api/v1/products/", json={"name": "new", "description": "d", "price": 2.0}
+    )
+    assert response.status_code == 201
+    assert STICKY_COOKIE in response.headers["set-cookie"]
+    assert "Max-Age=" in response.headers["set-cookie"]
+    assert _served_by(client) == "primary"
+
+    client.cookies.clear()
+    assert _served_by(client).startswith("replica-")
+
+
+def test_replica_reads_do_not_fill_the_cache(replica_set, client, cache):
+    """Test a stale replica read after a write cannot be cached and served to the writer"""
+    response = client.put(
+        "/api/v1/products/1", json={"name": "updated", "description": "d", "price": 2.0}
+    )
+    assert response.status_code == 200
+
+    other = TestClient(app)  # no sticky cookie: reads the stale replica row
+    assert other.get("/api/v1/products/1").json()["name"].startswith("replica-")
+    assert client.get("/api/v1/products/1").json()["name"] == "updated"
+    assert other.get("/api/v1/products/1").json()["name"] == "updated"  # cached by the writer
+
+
+def test_lagging_or_failing_replicas_are_ejected(replica_set, client):
+    """Test health checks remove lagging or broken replicas and restore them later"""
+    first, second = replica_set.replicas
+    replica_set.lags[first.engine] = 30.0
+    replica_set.refresh()
+    assert not first.healthy and first.error == "lagging"
+    assert {_served_by(client) for _ in range(3)} == {"replica-1"}
+
+    def broken(engine):
+        raise ConnectionError("replica down")
+
+    replica_set.lag_probe = broken
+    replica_set.refresh()
+    assert replica_set.healthy() == []
+    assert _served_by(client) == "primary"
+
+    replica_set.lag_probe = lambda engine: 0.0
+    replica_set.refresh()
+    assert len(replica_set.healthy()) == 2
+
+
+def test_routing_session_writes_to_primary(session):
+    """Test SELECTs use the replica while flushes go to the primary bind"""
+    replica = _stand_in("replica")
+    with RoutingSession(bind=session.get_bind(), replica_bind=replica) as routed:
+        routed.add(Product(name="written", description="d", price=3.0))
+        routed.commit()
+        assert [p.name for p in routed.exec(select(Product))] == ["replica"]
+    assert [p.name for p in session.exec(select(Product))] == ["written"]
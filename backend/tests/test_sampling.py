@@ -0,0 +1,69 @@
+"""Test the sampling CPU profiler and its admin endpoint"""
+import threading
+import time
+
+from app.api import admin
+from app.api import products as products_api
+from app.models.models import Product
+from app.sampling import SamplingProfiler, collapsed, profiler
+
+
+def test_profile_endpoint_requires_admin_token(client, monkeypatch):
+    """Test the capture endpoint is hidden without a token and refuses bad ones"""
+    assert client.post("/admin/profile", params={"seconds": 0.01}).status_code == 404
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "s3cret")
+    response = client.post("/admin/profile", params={"seconds": 0.01},
+                           headers={"Authorization": "Bearer wrong"})
+    assert response.status_code == 401
+
+
+def test_capture_contains_products_handler_frames(client, session, monkeypatch):
+    """Test samples taken while the products router serves requests land under its route"""
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "s3cret")
+    session.add(Product(name="Sampled", description="s", price=1.0))
+    session.commit()
+
+    render = products_api.dump_rows
+
+    def slow_dump_rows(*args):
+        time.sleep(0.005)  # long enough to be sampled on the event loop thread
+        return render(*args)
+
+    monkeypatch.setattr(products_api, "dump_rows", slow_dump_rows)
+    captured = {}
+
+    def capture():
+        captured["response"] = client.post(
+            "/admin/profile", params={"seconds": 0.5, "interval_ms": 1},
+            headers={"Authorization": "Bearer s3cret"},
+        )
+
+    thread = threading.Thread(target=capture)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not profiler.active and time.monotonic() < deadline:
+        time.sleep(0.001)
+    while thread.is_alive():
+        assert client.get("/api/v1/products/").status_code == 200
+    thread.join()
+
+    response = captured["response"]
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    route_lines = [line for line in lines if line.startswith("GET /api/v1/products/;")]
+    assert any("app.api.products:list_products" in line for line in route_lines)
+    assert any("slow_dump_rows" in line for line in route_lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert not profiler.active
+
+
+def test_capture_drops_idle_threads():
+    """Test threads not serving a request contribute no samples"""
+    idle = threading.Event()
+    worker = threading.Thread(target=idle.wait, args=(1,))
+    worker.start()
+    try:
+        assert collapsed(SamplingProfiler().capture(0.05, 0.005)) == ""
+    finally:
+        idle.set()
+        worker.join()
@@ -0,0 +1,83 @@
+"""Test product search"""
+from sqlalchemy.dialects import postgresql
+from sqlmodel import Session
+
+from app.models.models import Product
+from app.pagination import encode_cursor
+from app.search import PostgresSearchIndex
+
+
+def _seed(session):
+    session.add_all([
+        Product(name="Red Kettle", description="Steel kettle for the stove", price=20.0),
+        Product(name="Blue Mug", description="Goes well with a red kettle", price=5.0),
+        Product(name="Kettle Descaler", description="Cleans any kettle", price=4.0),
+        Product(name="Teapot", description="Ceramic", price=15.0),
+    ])
+    session.commit()
+
+
+def test_search_ranks_name_matches_first(session, client):
+    """Test every term must match and name hits outrank description hits"""
+    _seed(session)
+    response = client.get("/api/v1/products/search", params={"q": "red kettle"})
+    assert response.status_code == 200
+    hits = response.json()
+    assert [hit["name"] for hit in hits] == ["Red Kettle", "Blue Mug"]
+    assert hits[0]["rank"] > hits[1]["rank"]
+
+
+def test_search_pagination(session, client):
+    """Test search pages follow the relevance order through the cursor"""
+    _seed(session)
+    first = client.get("/api/v1/products/search", params={"q": "kettle", "limit": 2})
+    assert len(first.json()) == 2
+    cursor = first.headers["X-Next-Cursor"]
+
+    rest = client.get("/api/v1/products/search", params={"q": "kettle", "cursor": cursor})
+    assert "X-Next-Cursor" not in rest.headers
+    names = [hit["name"] for hit in first.json() + rest.json()]
+    assert sorted(names) == ["Blue Mug", "Kettle Descaler", "Red Kettle"]
+    assert len(set(names)) == 3
+
+
+def test_search_sees_new_and_updated_products(session, client):
+    """Test the in-memory index follows writes made through the API"""
+    _seed(session)
+    assert client.get("/api/v1/products/search", params={"q": "teapot"}).json()[0]["id"] == 4
+
+    client.put("/api/v1/products/4", json={"name": "Pot", "description": "Clay", "price": 9.0})
+    client.post("/api/v1/products/", json={"name": "Teapot XL", "description": "Big", "price": 30.0})
+    hits = client.get("/api/v1/products/search", params={"q": "teapot"}).json()
+    assert [hit["name"] for hit in hits] == ["Teapot XL"]
+
+
+def test_search_validation(client):
+    """Test a query is required and cursors are checked"""
+    assert client.get("/api/v1/products/search").status_code == 422
+    response = client.get("/api/v1/products/search", params={"q": "x", "cursor": "%%%"})
+    assert response.status_code == 400
+    for values in ({"id": True, "s": "rank", "v": 1.4}, {"id": 1, "s": "rank", "v": False}):
+        response = client.get("/api/v1/products/search",
+                              params={"q": "x", "cursor": encode_cursor(values)})
+        assert response.status_code == 400
+
+
+def test_postgres_search_uses_indexed_tsvector():
+    """Test the PostgreSQL query matches the GIN expression index and ranks by ts_rank_cd"""
+    captured = {}
+
+    class Recorder(Session):
+        def exec(self, statement, *args, **kwargs):
+            captured["sql"] = str(statement.compile(dialect=postgresql.dialect()))
+            raise LookupError
+
+    try:
+        PostgresSearchIndex().search(Recorder(), "red kettle", 10)
+    except LookupError:
+        pass
+    sql = captured["sql"]
+    vector = ("setweight(to_tsvector('english'::regconfig, products.name), 'A') || "
+              "setweight(to_tsvector('english'::regconfig, products.description), 'B')")
+    assert f"({vector}) @@ websearch_to_tsquery('english'::regconfig" in sql
+    assert "ORDER BY ts_rank_cd(" in sql and "DESC, products.id" in sql
@@ -0,0 +1,56 @@
+"""Test the orjson response path stays byte-for-byte compatible with FastAPI's encoder"""
+from datetime import datetime
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlmodel import select
+
+from app.models.models import Product, ProductRead
+from app.serialization import FastJSONResponse, dump_model, dump_rows, dumps
+
+
+def _stdlib(schema, rows):
+    """What response_model=List[schema] plus JSONResponse used to produce"""
+    return JSONResponse(jsonable_encoder([schema.model_validate(row) for row in rows])).body
+
+
+def _product(**overrides):
+    values = dict(id=1, name="Kettle", description="Steel", price=19.99, in_stock=True,
+                  created_at=datetime(2024, 1, 2, 3, 4, 5, 678),
+                  updated_at=datetime(2024, 1, 2, 3, 4, 5))
+    values.update(overrides)
+    return Product(**values)
+
+
+@pytest.mark.parametrize("overrides", [
+    {},
+    {"name": "Thé vert — 緑茶   \"quoted\" \\ </script>"},
+    {"price": 1e-05},
+    {"price": 12345678901234567.0},
+    {"price": 1e16},
+    {"price": 0.1 + 0.2},
+])
+def test_dump_rows_matches_stdlib_encoder(overrides):
+    """Test unicode, escapes, datetimes and float formatting render identically"""
+    rows = [_product(**overrides), _product(id=2, in_stock=False)]
+    assert dump_rows(ProductRead, rows) == _stdlib(ProductRead, rows)
+    assert dump_model(ProductRead, rows[0]) == _stdlib(ProductRead, rows[:1])[1:-1]
+
+
+def test_default_response_class_matches_stdlib():
+    """Test the default response class renders like JSONResponse"""
+    content = {"status": "ok", "nested": [1, 2.5, None, True, {"é": 1e20}], "big": 2 ** 70}
+    assert FastJSONResponse(content).body == JSONResponse(content).body
+    assert dumps(content) == JSONResponse(content).body
+
+
+def test_list_endpoint_body_matches_response_model(session, client):
+    """Test list responses are unchanged by skipping response_model validation"""
+    rows = [_product(id=None, name=f"Item {i}", price=i + 0.5) for i in range(5)]
+    session.add_all(rows)
+    session.commit()
+    response = client.get("/api/v1/products/")
+    assert response.headers["content-type"] == "application/json"
+    stored = session.exec(select(Product).order_by(Product.id)).all()
+    assert response.content == _stdlib(ProductRead, stored)
@@ -0,0 +1,99 @@
+"""Test the production launcher's worker and pool sizing"""
+import os
+
+import pytest
+
+from app.server import (
+    ProductionWorker, available_cpus, cache_backend, cgroup_cpu_quota, gunicorn_options,
+    pool_sizing, rate_limit_backend, worker_environment
+)
+
+
+def test_pool_sizing_keeps_settings_within_budget():
+    """Test pools that already fit the budget are left alone"""
+    assert pool_sizing(workers=4, budget=90, pool_size=5, max_overflow=10) == (5, 10)
+
+
+def test_pool_sizing_cuts_overflow_then_pool():
+    """Test shrinking trims overflow first and never exceeds the budget"""
+    assert pool_sizing(workers=8, budget=90, pool_size=5, max_overflow=10) == (5, 5)
+    assert pool_sizing(workers=32, budget=90, pool_size=5, max_overflow=10) == (1, 0)
+    for workers in range(1, 30):
+        pool_size, max_overflow = pool_sizing(workers, 90, 5, 10, engines_per_worker=2)
+        assert pool_size >= 1
+        assert workers * (2 * (pool_size + max_overflow) + 1) <= 90
+
+
+def test_pool_sizing_rejects_impossible_budget():
+    """Test a budget below one connection per worker fails loudly"""
+    with pytest.raises(ValueError):
+        pool_sizing(workers=16, budget=10, pool_size=5, max_overflow=10)
+    # Each worker's readiness probe takes a connection of its own
+    assert pool_sizing(workers=45, budget=90, pool_size=5, max_overflow=10) == (1, 0)
+    with pytest.raises(ValueError):
+        pool_sizing(workers=46, budget=90, pool_size=5, max_overflow=10)
+
+
+def test_worker_environment_counts_async_engines():
+    """Test async mode budgets two pools per worker"""
+    environ = {"DB_POOL_SIZE": "10", "DB_MAX_OVERFLOW": "20"}
+    assert worker_environment(3, 90, environ) == {
+        "DB_POOL_SIZE": "10", "DB_MAX_OVERFLOW": "19", "CACHE_BACKEND": "none",
+        "RATE_LIMIT_BACKEND": "none"}
+    assert worker_environment(3, 90, {**environ, "DB_ASYNC": "True"}) == {
+        "DB_POOL_SIZE": "10", "DB_MAX_OVERFLOW": "4", "CACHE_BACKEND": "none",
+        "RATE_LIMIT_BACKEND": "none"}
+
+
+def test_cgroup_cpu_quota(tmp_path):
+    """Test v2 and v1 quotas are read, and unlimited or missing ones ignored"""
+    assert cgroup_cpu_quota(str(tmp_path)) is None
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("-1\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    assert cgroup_cpu_quota(str(tmp_path)) is None
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("300000\n")
+    assert cgroup_cpu_quota(str(tmp_path)) == 3
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert cgroup_cpu_quota(str(tmp_path)) is None
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+    assert cgroup_cpu_quota(str(tmp_path)) == 1.5
+
+
+def test_available_cpus_honours_affinity_and_quota(tmp_path, monkeypatch):
+    """Test workers default to the CPUs the container may use, not the host's"""
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {0, 1, 2, 3}, raising=False)
+    assert available_cpus(str(tmp_path)) == 4
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+    assert available_cpus(str(tmp_path)) == 2
+    (tmp_path / "cpu.max").write_text("10000 100000\n")
+    assert available_cpus(str(tmp_path)) == 1
+
+
+def test_cache_backend_is_shared_across_workers():
+    """Test several workers never get per-process caches that writes cannot invalidate"""
+    assert cache_backend(1, {}) == "memory"
+    assert cache_backend(4, {}) == "none"
+    assert cache_backend(4, {"REDIS_URL": "redis://cache:6379/0"}) == "redis"
+    assert cache_backend(4, {"CACHE_BACKEND": "none", "REDIS_URL": "redis://c"}) == "none"
+    with pytest.raises(ValueError):
+        cache_backend(4, {"CACHE_BACKEND": "memory"})
+
+
+def test_rate_limit_backend_is_shared_across_workers():
+    """Test per-process buckets are refused when they would multiply the limit"""
+    assert rate_limit_backend(4, {}) == "none"
+    assert rate_limit_backend(1, {"RATE_LIMIT_BACKEND": "memory"}) == "memory"
+    assert rate_limit_backend(4, {"RATE_LIMIT_BACKEND": "redis"}) == "redis"
+    with pytest.raises(ValueError):
+        rate_limit_backend(4, {"RATE_LIMIT_BACKEND": "memory"})
+
+
+def test_gunicorn_options_use_tuned_worker():
+    """Test workers run uvloop/httptools and are recycled with jitter"""
+    options = gunicorn_options(4)
+    assert options["workers"] == 4
+    assert options["worker_class"] is ProductionWorker
+    assert options["max_requests"] > 0 and options["max_requests_jitter"] > 0
+    assert ProductionWorker.CONFIG_KWARGS["loop"] == "uvloop"
+    assert ProductionWorker.CONFIG_KWARGS["http"] == "httptools"
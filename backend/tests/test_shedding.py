@@ -0,0 +1,60 @@
+"""Test adaptive load shedding"""
+import time
+
+from app import shedding
+from app.metrics import PoolPressure
+from app.shedding import LoadShedder
+
+
+def test_sheds_on_in_flight_and_pool_waiters():
+    """Test hard limits on concurrent requests and callers queued for a connection"""
+    pressure = PoolPressure()
+    shedder = LoadShedder(max_in_flight=2, pool_wait_ms=0, max_pool_waiters=1, pressure=pressure)
+    assert shedder.reason() is None
+    shedder.in_flight = 2
+    assert shedder.reason() == "in_flight"
+    shedder.in_flight = 0
+    pressure.begin()
+    assert shedder.reason() == "pool_waiters"
+    pressure.end(0.0)
+    assert shedder.reason() is None
+
+
+def test_pool_wait_sheds_proportionally():
+    """Test the refused share grows with the wait above the threshold"""
+    pressure = PoolPressure(alpha=1.0, half_life=3600)
+    pressure.end(0.15)  # 1.5 x the 100 ms threshold
+    pressure.waiting = 0
+    shedder = LoadShedder(max_in_flight=0, pool_wait_ms=100, max_pool_waiters=0,
+                          pressure=pressure, chance=lambda: 0.45)
+    assert shedder.reason() == "pool_wait"
+    shedder.chance = lambda: 0.55
+    assert shedder.reason() is None
+
+
+def test_pool_wait_decays_only_while_pool_is_idle():
+    """Test the average recovers once checkouts stop, but not while callers still queue"""
+    pressure = PoolPressure(alpha=1.0, half_life=0.01)
+    pressure.begin()
+    pressure.end(1.0)
+    pressure.begin()
+    time.sleep(0.05)
+    assert pressure.wait_seconds() == 1.0
+    pressure.waiting -= 1
+    assert pressure.wait_seconds() < 0.1
+
+
+def test_middleware_returns_503_with_retry_after(client, monkeypatch):
+    """Test an overloaded process answers 503 while health probes still pass"""
+    shedder = LoadShedder(max_in_flight=1, pool_wait_ms=0, max_pool_waiters=0)
+    shedder.in_flight = 1
+    monkeypatch.setattr(shedding, "load_shedder", shedder)
+
+    response = client.get("/api/v1/products/")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert client.get("/health").status_code == 200
+
+    shedder.in_flight = 0
+    assert client.get("/api/v1/products/").status_code == 200
+    assert shedder.in_flight == 0
@@ -1,4 +1,12 @@
 """Test user endpoints"""
+import asyncio
+import json
+
+import httpx
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from main import app
+from app.database import get_session
 from app.models.models import User
 
 def test_list_users(client, session):
@@ -110,3 +118,130 @@ def test_delete_user_not_found(client):
     response = client.delete("/api/v1/users/999")
     assert response.status_code == 404
     assert response.json()["detail"] == "User not found"
+
+
+def test_list_users_pagination(client, session):
+    """Test list users returns a cursor only when more pages exist"""
+    for i in range(3):
+        session.add(User(name=f"Paged User {i}", email=f"paged{i}@example.com"))
+    session.commit()
+
+    response = client.get("/api/v1/users/", params={"limit": 2})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get("/api/v1/users/", params={"limit": 2, "cursor": cursor})
+    assert response.status_code == 200
+    assert [u["email"] for u in response.json()] == ["paged2@example.com"]
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_export_users_ndjson(client, session):
+    """Test streaming users as NDJSON"""
+    session.add(User(name="Exported User", email="export@example.com"))
+    session.commit()
+
+    response = client.get("/api/v1/users/export", params={"format": "ndjson"})
+    assert response.status_code == 200
+    assert [json.loads(line)["email"] for line in response.text.splitlines()] == [
+        "export@example.com"
+    ]
+
+
+def test_bulk_upsert_users(client, session):
+    """Test bulk upsert updates existing emails instead of failing"""
+    session.add(User(name="Old Name", email="existing@example.com"))
+    session.commit()
+
+    payload = [
+        {"name": "New Name", "email": "existing@example.com"},
+        {"name": "Fresh User", "email": "fresh@example.com"},
+        {"name": "Fresh User Again", "email": "fresh@example.com"},
+        {"name": "No Email"},
+    ]
+    response = client.post("/api/v1/users/bulk", json=payload)
+    assert response.status_code == 200
+    result = response.json()
+    assert result["processed"] == 3
+    assert [e["index"] for e in result["errors"]] == [3]
+
+    users = {u["email"]: u["name"] for u in client.get("/api/v1/users/").json()}
+    assert users == {
+        "existing@example.com": "New Name",
+        "fresh@example.com": "Fresh User Again",
+    }
+
+
+def test_list_users_filter_sort_and_fields(client, session):
+    """Test filtering users by active flag, sorting by email and projecting fields"""
+    session.add_all([
+        User(name="Zed", email="a@example.com"),
+        User(name="Amy", email="c@example.com"),
+        User(name="Bob", email="b@example.com", active=False),
+    ])
+    session.commit()
+
+    response = client.get(
+        "/api/v1/users/", params={"active": True, "sort": "-email", "fields": "email"}
+    )
+    assert response.status_code == 200
+    assert response.json() == [{"email": "c@example.com"}, {"email": "a@example.com"}]
+
+
+def test_update_user_duplicate_email(client, session):
+    """Test moving a user onto a taken email is refused by the unique index"""
+    session.add(User(name="First", email="first@example.com"))
+    session.add(User(name="Second", email="second@example.com"))
+    session.commit()
+
+    response = client.put("/api/v1/users/2", json={"name": "Second", "email": "first@example.com"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email already registered"
+    assert client.get("/api/v1/users/2").json()["email"] == "second@example.com"
+
+
+def test_parallel_duplicate_signups_have_one_winner(tmp_path):
+    """Test racing signups for one email: one 201, the rest 400, never a 500"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'signup.db'}",
+                           connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+
+    def get_session_override():
+        with Session(engine) as session:
+            yield session
+
+    async def signups(count):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(
+                client.post("/api/v1/users/", json={"name": f"Racer {i}", "email": "race@example.com"})
+                for i in range(count)
+            ))
+
+    app.dependency_overrides[get_session] = get_session_override
+    try:
+        responses = asyncio.run(signups(20))
+    finally:
+        app.dependency_overrides.clear()
+
+    statuses = sorted(response.status_code for response in responses)
+    assert statuses == [201] + [400] * 19
+    with Session(engine) as session:
+        assert len(session.exec(select(User)).all()) == 1
+
+
+def test_batch_get_users(client, session):
+    """Test users are resolved in request order, with unknown ids reported"""
+    session.add(User(name="A", email="a@example.com"))
+    session.add(User(name="B", email="b@example.com"))
+    session.commit()
+
+    response = client.post("/api/v1/users/batch-get", json={"ids": [2, 3, 1]})
+    assert response.status_code == 200
+    assert [user["email"] for user in response.json()["items"]] == ["b@example.com", "a@example.com"]
+    assert response.json()["missing"] == [3]
+
+    response = client.get("/api/v1/users/", params={"ids": "2"})
+    assert [user["id"] for user in response.json()] == [2]
+    assert "X-Missing-Ids" not in response.headers
@@ -1,5 +1,5 @@
 import axios from 'axios'
-import { User, Product, HealthResponse, ReadinessResponse } from '../types'
+import { User, Product, BatchResult, HealthResponse, ReadinessResponse } from '../types'
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
 
@@ -20,6 +20,10 @@ export const usersApi = {
     const response = await apiClient.get(`/api/v1/users/${id}`)
     return response.data
   },
+  getMany: async (ids: number[]): Promise<BatchResult<User>> => {
+    const response = await apiClient.post('/api/v1/users/batch-get', { ids })
+    return response.data
+  },
   create: async (user: Omit<User, 'id'>): Promise<User> => {
     const response = await apiClient.post('/api/v1/users/', user)
     return response.data
@@ -43,6 +47,10 @@ export const productsApi = {
     const response = await apiClient.get(`/api/v1/products/${id}`)
     return response.data
   },
+  getMany: async (ids: number[]): Promise<BatchResult<Product>> => {
+    const response = await apiClient.post('/api/v1/products/batch-get', { ids })
+    return response.data
+  },
   create: async (product: Omit<Product, 'id'>): Promise<Product> => {
     const response = await apiClient.post('/api/v1/products/', product)
     return response.data
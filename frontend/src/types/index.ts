@@ -13,6 +13,11 @@ export interface Product {
   in_stock: boolean
 }
 
+export interface BatchResult<T> {
+  items: T[]
+  missing: number[]
+}
+
 export interface ApiResponse<T> {
   data?: T
   error?: string